@@ -112,7 +112,10 @@ class PlaceResource(Resource):
             tuple: Updated place data or error, and HTTP status code.
         """
         data = api.payload
-        place = facade.update_place(place_id, data)
+        try:
+            place = facade.update_place(place_id, data)
+        except ValueError as e:
+            return {"error": str(e)}, 400
         if not place:
             return {"error": "Place not found"}, 404
         return place.to_dict(), 200
@@ -7,10 +7,7 @@ All business logic is handled by the HBnBFacade.
 
 
 from flask_restx import Namespace, Resource, fields
-from hbnb.app.services import HBnBFacade
-
-# Create an instance of the business logic facade
-facade = HBnBFacade()
+from hbnb.app.services import facade
 
 # Define the users namespace for the API
 api = Namespace('users', description='User operations')
@@ -119,5 +116,8 @@ class UserResource(Resource):
             return {'error': 'User not found'}, 404
 
         # Update user data and return the updated user
-        updated_user = facade.update_user(user_id, api.payload)
+        try:
+            updated_user = facade.update_user(user_id, api.payload)
+        except ValueError as e:
+            return {"error": str(e)}, 400
         return updated_user.to_dict(), 200
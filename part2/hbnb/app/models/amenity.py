@@ -21,6 +21,8 @@ class Amenity(BaseModel):
         name (str): The name of the amenity, e.g. "WiFi" or "Pool".
     """
 
+    __slots__ = ('name',)
+
     def __init__(self, name):
         """
         Initialize a new Amenity instance.
@@ -3,11 +3,20 @@ Defines the BaseModel class for HBnB, providing core attributes and methods.
 
 BaseModel supplies a unique ID, creation and update timestamps, and
 utility methods for saving, updating attributes, and serializing to dict.
+
+Models declare their attributes in `__slots__` rather than keeping a
+per-instance `__dict__`, and timestamps are stored as epoch seconds, so
+millions of them fit in memory. Slots starting with an underscore back
+a property of the same name without it (e.g. `_created_at` backs
+`created_at`); together with the plain slots they form the public
+fields listed in `fields`.
 """
 
+import time
 import uuid
 from datetime import datetime
 
+
 class BaseModel:
     """
     Core model class with common attributes and methods.
@@ -16,17 +25,64 @@ class BaseModel:
         id (str): Unique identifier (UUID4).
         created_at (datetime): Timestamp of creation.
         updated_at (datetime): Timestamp of last update.
+        fields (tuple): Names of the public fields, in declaration order.
+        references (tuple): Public fields holding another model, or a
+            list of them; snapshots store them by ID.
     """
 
+    __slots__ = ('id', '_created_at', '_updated_at')
+
+    fields = ('id', 'created_at', 'updated_at')
+
+    references = ()
+
+    # Every slot, base classes first; the pickled state
+    _state = __slots__
+
+    def __init_subclass__(cls, **kwargs):
+        """Extend `fields` with the slots declared by a subclass."""
+        super().__init_subclass__(**kwargs)
+        slots = cls.__dict__.get('__slots__', ())
+        cls.fields = cls.fields + tuple(name.lstrip('_') for name in slots)
+        cls._state = cls._state + tuple(slots)
+
+    def __getstate__(self):
+        """Return the slot values, for pickling."""
+        return {name: getattr(self, name) for name in self._state
+                if hasattr(self, name)}
+
+    def __setstate__(self, state):
+        """Restore the slot values of a pickled object."""
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def __init__(self):
         """
         Initialize a new BaseModel instance.
 
-        Sets id to a new UUID4 string and timestamps to current datetime.
+        Sets id to a new UUID4 string and timestamps to the current time.
         """
         self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        # Both timestamps share one float until the first update
+        self._created_at = self._updated_at = time.time()
+
+    @property
+    def created_at(self):
+        """datetime: Timestamp of creation, in local time."""
+        return datetime.fromtimestamp(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = value.timestamp()
+
+    @property
+    def updated_at(self):
+        """datetime: Timestamp of last update, in local time."""
+        return datetime.fromtimestamp(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = value.timestamp()
 
     def save(self):
         """
@@ -34,7 +90,7 @@ class BaseModel:
 
         Should be called whenever the object is changed.
         """
-        self.updated_at = datetime.now()
+        self._updated_at = time.time()
 
     def update(self, data):
         """
@@ -43,10 +99,13 @@ class BaseModel:
         Args:
             data (dict): Keys and values to set on this object.
 
-        Only existing attributes are updated; others are ignored.
+        Only public fields are updated; other keys are ignored. Fields are
+        assigned one by one, so only call this on an object no other thread
+        reads yet: stored objects are updated through the repository, which
+        applies the changes to a copy and publishes it whole.
         """
         for key, value in data.items():
-            if hasattr(self, key):
+            if key in self.fields:
                 setattr(self, key, value)
         self.save()
 
@@ -55,10 +114,11 @@ class BaseModel:
         Serialize this object to a dictionary, converting nested models.
 
         Returns:
-            dict: A mapping of attribute names to their JSON-serializable values.
+            dict: A mapping of field names to their JSON-serializable values.
         """
         result = {}
-        for key, value in self.__dict__.items():
+        for key in self.fields:
+            value = getattr(self, key)
             if isinstance(value, datetime):
                 result[key] = value.isoformat()
             elif hasattr(value, 'to_dict'):
@@ -5,10 +5,35 @@ A Place represents a rental property and includes details such as title,
 description, price, geographic coordinates, owner, reviews, and amenities.
 """
 
+import weakref
 from hbnb.app.models.base_model import BaseModel
 from hbnb.app.models.user import User
 from hbnb.app.models.amenity import Amenity
 
+# Amenity sets shared by every place holding the same amenities; there
+# are far fewer distinct combinations than places. An entry goes away
+# with the last place using it, so deleted amenities are not kept alive.
+_amenity_sets = weakref.WeakValueDictionary()
+
+
+class _AmenitySet:
+    """Amenities of a place, in order, with the set of their IDs."""
+
+    __slots__ = ('items', 'ids', '__weakref__')
+
+    def __init__(self, items):
+        self.items = items
+        self.ids = frozenset(amenity.id for amenity in items)
+
+
+def _intern_amenities(amenities):
+    """Return the shared _AmenitySet holding these amenities, in this order."""
+    amenities = tuple(amenities)
+    shared = _amenity_sets.get(amenities)
+    if shared is None:
+        shared = _amenity_sets[amenities] = _AmenitySet(amenities)
+    return shared
+
 
 class Place(BaseModel):
     """
@@ -26,8 +51,19 @@ class Place(BaseModel):
         owner (User): The User who owns this place.
         reviews (list): List of Review instances.
         amenities (list): List of Amenity instances.
+        amenity_ids (frozenset): IDs of the amenities.
+
+    Reviews are kept in a tuple. Amenities are kept in a tuple along with
+    the set of their IDs, both shared with the other places holding the
+    same amenities. They are replaced rather than mutated, so a concurrent
+    reader never iterates a changing container.
     """
 
+    __slots__ = ('title', 'description', 'price', 'latitude', 'longitude',
+                 'owner', '_reviews', '_amenities')
+
+    references = ('owner', 'reviews', 'amenities')
+
     def __init__(
         self,
         title,
@@ -83,8 +119,54 @@ class Place(BaseModel):
             raise TypeError("Owner must be an instance of User")
         self.owner = owner
 
-        self.reviews = []
-        self.amenities = []
+        self._reviews = ()
+        self._amenities = _intern_amenities(())
+
+    def __getstate__(self):
+        """Return the slot values, with the amenities as a tuple."""
+        state = super().__getstate__()
+        state['_amenities'] = self._amenities.items
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled place, sharing its amenity set again."""
+        super().__setstate__(state)
+        self.amenities = self._amenities
+
+    @property
+    def reviews(self):
+        """list: Review instances of this place."""
+        return list(self._reviews)
+
+    @reviews.setter
+    def reviews(self, reviews):
+        self._reviews = tuple(reviews)
+
+    @property
+    def amenities(self):
+        """list: Amenity instances of this place."""
+        return list(self._amenities.items)
+
+    @amenities.setter
+    def amenities(self, amenities):
+        self._amenities = _intern_amenities(amenities)
+
+    @property
+    def amenity_ids(self):
+        """frozenset: IDs of the amenities of this place."""
+        return self._amenities.ids
+
+    def has_amenity(self, amenity):
+        """
+        Tell whether an amenity is attached to this place.
+
+        Args:
+            amenity (Amenity): The amenity to look for.
+
+        Returns:
+            bool: True if attached.
+        """
+        return amenity.id in self._amenities.ids
 
     def add_review(self, review):
         """
@@ -99,7 +181,7 @@ class Place(BaseModel):
         from review import Review
         if not isinstance(review, Review):
             raise TypeError("Review must be an instance of the Review class.")
-        self.reviews.append(review)
+        self._reviews = self._reviews + (review,)
 
     def add_amenity(self, amenity):
         """
@@ -113,5 +195,16 @@ class Place(BaseModel):
         """
         if not isinstance(amenity, Amenity):
             raise TypeError("Amenity must be an instance of the Amenity class.")
-        if amenity not in self.amenities:
-            self.amenities.append(amenity)
+        if not self.has_amenity(amenity):
+            self.amenities = self._amenities.items + (amenity,)
+
+    def remove_amenity(self, amenity):
+        """
+        Remove an Amenity instance from this place, if attached.
+
+        Args:
+            amenity (Amenity): An instance of the Amenity class.
+        """
+        if self.has_amenity(amenity):
+            self.amenities = [item for item in self._amenities.items
+                              if item.id != amenity.id]
@@ -24,6 +24,10 @@ class Review(BaseModel):
         user (User): The User instance who wrote the review.
     """
 
+    __slots__ = ('text', 'rating', 'place', 'user')
+
+    references = ('place', 'user')
+
     def __init__(self, text, rating, place, user):
         """
         Initialize a new Review instance with validation.
@@ -22,6 +22,8 @@ class User(BaseModel):
         is_admin (bool): Flag indicating admin privileges.
     """
 
+    __slots__ = ('first_name', 'last_name', 'email', 'is_admin')
+
     def __init__(self, first_name, last_name, email, is_admin=False):
         """
         Initialize a new User instance with validation.
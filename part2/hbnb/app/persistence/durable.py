@@ -0,0 +1,608 @@
+"""
+Durable storage for the in-memory repositories.
+
+Every write of an InMemoryRepository attached to an OperationLog is
+appended to the log before it becomes visible, and a DurableStore
+periodically compacts the repositories into a binary snapshot file, so
+the log only has to hold the writes made since. On startup the snapshot
+is memory-mapped, the log tail replayed over it, and the repositories
+bulk-loaded with the result.
+
+Files in the data directory:
+    snapshot.bin            Header (magic, LSN covered) then one frame
+                            per object.
+    log-<first LSN>.bin     Log segments; a new one is started by every
+                            compaction and older ones are then deleted.
+
+Both use the same frame: body length and CRC32, log sequence number
+(LSN), operation, name and ID lengths, then the repository name, the
+object ID and the payload. Log records hold one pickled object.
+Snapshot frames are COLUMNS records holding up to BATCH_SIZE objects of
+one class, one list per slot: loading builds the objects and sets each
+slot with a few C-level loops instead of unpickling them one by one.
+(Snapshots written before that hold BATCH records, a pickled list of
+objects, and are still read.) Objects referencing other models (a
+place's owner, a review's place) store those references by ID, and
+they are linked back to the loaded objects after recovery.
+
+The data directory is trusted: its files are unpickled on startup.
+"""
+
+import gc
+import io
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from itertools import repeat
+from operator import attrgetter
+from hbnb.app.models.base_model import BaseModel
+
+PUT = 0
+DELETE = 1
+BATCH = 2
+COLUMNS = 3
+
+# Objects per snapshot record
+BATCH_SIZE = 65536
+
+SNAPSHOT_MAGIC = b'HBNBSNP1'
+SNAPSHOT_FILE = 'snapshot.bin'
+
+# Body length and CRC32 of what follows them
+_PREFIX = struct.Struct('<II')
+# LSN, operation, repository name length, object ID length
+_TAIL = struct.Struct('<QBBB')
+_FRAME_HEADER_SIZE = _PREFIX.size + _TAIL.size
+# Magic and LSN covered by the snapshot
+_SNAPSHOT_HEADER = struct.Struct('<8sQ')
+
+# Placeholder for a model referenced by another one, until linking
+Ref = namedtuple('Ref', 'id')
+
+
+class _Pickler(pickle.Pickler):
+    """Pickler storing the models referenced by the root objects by ID."""
+
+    # id() of the objects being encoded
+    roots = frozenset()
+
+    def persistent_id(self, obj):
+        if isinstance(obj, BaseModel) and id(obj) not in self.roots:
+            return obj.id
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Unpickler resolving stored references through a dict of objects."""
+
+    def __init__(self, file, objects):
+        super().__init__(file)
+        self.objects = objects
+        self.resolved = True
+
+    def persistent_load(self, pid):
+        obj = self.objects.get(pid)
+        if obj is None:
+            self.resolved = False
+            return Ref(pid)
+        return obj
+
+
+def encode(obj):
+    """
+    Pickle one model, keeping references to other models as IDs.
+
+    Args:
+        obj (BaseModel): The object to encode.
+
+    Returns:
+        bytes: The pickled object.
+    """
+    return _dump(obj, (obj,))
+
+
+def encode_columns(objs):
+    """
+    Pickle models of one class column by column.
+
+    Each slot is stored as one list of values, except the `references`
+    fields, stored as lists of IDs (or of ID tuples).
+
+    Args:
+        objs (list): The objects to encode, all of the same class.
+
+    Returns:
+        bytes: The pickled columns.
+    """
+    cls = type(objs[0])
+    slots = [name for name in cls._state if name.lstrip('_') not in cls.references]
+    columns = [list(map(attrgetter(name), objs)) for name in slots]
+    refs = [[_reference_ids(getattr(obj, field)) for obj in objs]
+            for field in cls.references]
+    return pickle.dumps((cls, slots, columns, refs), pickle.HIGHEST_PROTOCOL)
+
+
+def _reference_ids(value):
+    """Return the ID of a referenced model, or the IDs of a list of them."""
+    if value is None or isinstance(value, BaseModel):
+        return getattr(value, 'id', None)
+    return tuple(item.id for item in value)
+
+
+def decode_columns(payload):
+    """
+    Build the models of an `encode_columns` payload.
+
+    The slots are set straight through their descriptors; references are
+    left unset, to be set by `link_columns` once every object is loaded.
+
+    Args:
+        payload (bytes-like): Output of `encode_columns`.
+
+    Returns:
+        tuple: (list of objects, list of (field, IDs of each object)).
+    """
+    cls, slots, columns, refs = pickle.loads(payload)
+    count = len(columns[0])
+    objs = list(map(cls.__new__, repeat(cls, count)))
+    for name, column in zip(slots, columns):
+        deque(map(getattr(cls, name).__set__, objs, column), maxlen=0)
+    return objs, list(zip(cls.references, refs))
+
+
+def link_columns(objs, refs, objects):
+    """
+    Set the reference fields of objects built by `decode_columns`.
+
+    Missing objects become None, or are dropped from lists, like `link`
+    does. Fields are set through their public name.
+
+    Args:
+        objs (list): Decoded objects.
+        refs (list): (field, IDs of each object) pairs.
+        objects (dict): Every loaded object, keyed by ID.
+    """
+    for field, column in refs:
+        if column and isinstance(column[0], tuple):
+            # Few distinct lists (e.g. amenity combinations): resolve each once
+            resolved = {}
+            values = []
+            for ids in column:
+                value = resolved.get(ids)
+                if value is None:
+                    value = resolved[ids] = [objects[item] for item in ids
+                                             if item in objects]
+                values.append(value)
+        else:
+            values = list(map(objects.get, column))
+        deque(map(setattr, objs, repeat(field), values), maxlen=0)
+
+
+def _dump(value, roots):
+    buffer = io.BytesIO()
+    pickler = _Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.roots = frozenset(map(id, roots))
+    pickler.dump(value)
+    return buffer.getvalue()
+
+
+def decode(payload, objects=None):
+    """
+    Unpickle models, resolving their references to other models.
+
+    Args:
+        payload (bytes-like): Output of `encode`, or a pickled list of
+            objects (BATCH record).
+        objects (dict, optional): Already loaded objects, keyed by ID.
+            References to other IDs are left as Ref placeholders.
+
+    Returns:
+        tuple: (object or list of objects, False if placeholders were
+            left, in which case the objects must be passed to `link`).
+    """
+    unpickler = _Unpickler(io.BytesIO(payload), objects or {})
+    return unpickler.load(), unpickler.resolved
+
+
+def link(obj, objects):
+    """
+    Replace the Ref placeholders of a decoded object by the objects.
+
+    References to objects that no longer exist become None, or are
+    dropped from lists. Fields are set through their public name, so
+    properties (e.g. Place.amenities) see the linked value.
+
+    Args:
+        obj (BaseModel): A decoded object.
+        objects (dict): Every loaded object, keyed by ID.
+    """
+    for key in obj.fields:
+        value = getattr(obj, key)
+        kind = type(value)
+        if kind is Ref:
+            setattr(obj, key, objects.get(value.id))
+        elif kind in (list, tuple) and any(type(item) is Ref for item in value):
+            setattr(obj, key, [
+                objects[item.id] if type(item) is Ref else item
+                for item in value
+                if type(item) is not Ref or item.id in objects
+            ])
+
+
+def frame(lsn, op, name, obj_id, payload=b''):
+    """
+    Build one log or snapshot record.
+
+    Args:
+        lsn (int): Log sequence number of the write.
+        op (int): PUT or DELETE.
+        name (str): Name of the repository.
+        obj_id (str): ID of the object.
+        payload (bytes): Encoded object, empty for DELETE.
+
+    Returns:
+        bytes: The framed record.
+    """
+    name, obj_id = name.encode(), obj_id.encode()
+    tail = _TAIL.pack(lsn, op, len(name), len(obj_id))
+    body = name + obj_id + payload
+    return _PREFIX.pack(len(body), zlib.crc32(body, zlib.crc32(tail))) + tail + body
+
+
+def read_frames(buffer, offset=0):
+    """
+    Iterate over the valid records of a buffer.
+
+    Iteration stops at the end of the buffer or at the first truncated
+    or corrupted record; the end offset of each record tells the caller
+    where the valid data stops. Payloads are memoryview slices, so
+    nothing is copied out of a memory-mapped file.
+
+    Args:
+        buffer (bytes-like): Log segment or snapshot contents.
+        offset (int): Position of the first record.
+
+    Yields:
+        tuple: (end offset, lsn, op, name, obj_id, payload).
+    """
+    view = memoryview(buffer)
+    size = len(view)
+    while offset + _FRAME_HEADER_SIZE <= size:
+        length, crc = _PREFIX.unpack_from(view, offset)
+        start = offset + _FRAME_HEADER_SIZE
+        end = start + length
+        if end > size:
+            return
+        tail = view[offset + _PREFIX.size:start]
+        body = view[start:end]
+        if zlib.crc32(body, zlib.crc32(tail)) != crc:
+            return
+        lsn, op, name_size, id_size = _TAIL.unpack(tail)
+        name = str(body[:name_size], 'utf-8')
+        obj_id = str(body[name_size:name_size + id_size], 'utf-8')
+        yield end, lsn, op, name, obj_id, body[name_size + id_size:]
+        offset = end
+
+
+class OperationLog:
+    """
+    Append-only, segmented log of repository writes.
+
+    Attributes:
+        directory (str): Directory holding the segments.
+        lsn (int): Sequence number of the last write.
+        lock (threading.Lock): Held while a write is appended and
+            published; holding it freezes every attached repository.
+    """
+
+    def __init__(self, directory, fsync=False):
+        """
+        Args:
+            directory (str): Directory holding the segments.
+            fsync (bool): Flush every write to disk before returning; when
+                False a write survives a process crash but not a power loss.
+        """
+        self.directory = directory
+        self.fsync = fsync
+        self.lsn = 0
+        self.lock = threading.Lock()
+        self._file = None
+
+    def segments(self):
+        """Return the paths of the existing segments, oldest first."""
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith('log-') and name.endswith('.bin'))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def open(self):
+        """Start a new segment for the writes following `lsn`."""
+        path = os.path.join(self.directory, f'log-{self.lsn + 1:020d}.bin')
+        self._file = open(path, 'ab', buffering=0)
+
+    def rotate(self):
+        """
+        Start a new segment; call with `lock` held.
+
+        Returns:
+            list: Paths of the previous segments.
+        """
+        previous = self.segments()
+        self.close()
+        self.open()
+        return [path for path in previous if path != self._file.name]
+
+    @contextmanager
+    def append(self, name, op, obj_id, obj=None):
+        """
+        Log one write, then let the caller publish it.
+
+        The record is encoded first, then written with `lock` held for
+        the duration of the block, so a compaction sees each write either
+        both logged and published or neither. If writing fails the block
+        is not run and the write is not published: the repository has
+        only changed a copy of the object, which nobody else sees yet.
+
+        Args:
+            name (str): Name of the repository.
+            op (int): PUT or DELETE.
+            obj_id (str): ID of the object.
+            obj (BaseModel, optional): New state of the object, for PUT.
+        """
+        payload = encode(obj) if obj is not None else b''
+        with self.lock:
+            self._file.write(frame(self.lsn + 1, op, name, obj_id, payload))
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.lsn += 1
+            yield
+
+    def close(self):
+        """Close the current segment."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class DurableStore:
+    """
+    Snapshot and operation log of a set of named repositories.
+
+    Usage:
+        store = DurableStore('data', {'users': user_repo, ...}).open()
+        ...
+        store.close()
+
+    Attributes:
+        repositories (dict): Repository name mapped to InMemoryRepository.
+        log (OperationLog): Log the repositories append to.
+        snapshot_lsn (int): LSN covered by the snapshot file.
+    """
+
+    def __init__(self, directory, repositories, fsync=False, compact_interval=60):
+        """
+        Args:
+            directory (str): Data directory; created if missing.
+            repositories (dict): Repository name mapped to repository.
+            fsync (bool): See OperationLog.
+            compact_interval (float): Seconds between compactions; 0
+                disables the background compaction.
+        """
+        self.directory = directory
+        self.repositories = repositories
+        self.log = OperationLog(directory, fsync)
+        self.snapshot_lsn = 0
+        self.compact_interval = compact_interval
+        self._compact_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    def open(self):
+        """
+        Recover the repositories, attach the log and start compacting.
+
+        Returns:
+            DurableStore: self.
+
+        Raises:
+            ValueError: If the snapshot is corrupted or names an unknown
+                repository.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.recover()
+        self.log.open()
+        for name, repo in self.repositories.items():
+            repo.attach_log(self.log, name)
+        if self.compact_interval:
+            self._thread = threading.Thread(target=self._compact_periodically,
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def recover(self):
+        """
+        Load the snapshot and the log tail into the repositories.
+
+        The log tail is read first, so that only the newest version of
+        each object is unpickled. The snapshot is then memory-mapped and
+        decoded record by record; references to other models are set once
+        every object exists. A torn record at the end of a log segment (a
+        crash during a write) is cut off.
+
+        Raises:
+            ValueError: If the snapshot is corrupted or names an unknown
+                repository.
+        """
+        # Millions of new objects would trigger repeated full collections
+        # that find nothing to free
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for name, objs in self._recover().items():
+                self.repositories[name].load(objs)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _recover(self):
+        """Return {repository name: [objects]} from the data files."""
+        mapped = self._map_snapshot()
+        tail = self._read_log()
+        objects = {}
+        loaded = {name: [] for name in self.repositories}
+        # Pickled objects left with Ref placeholders, and decoded columns
+        unlinked, columns = [], []
+        if mapped is not None:
+            self._read_snapshot(mapped, tail, objects, loaded, unlinked, columns)
+            mapped.close()
+        for name, payloads in tail.items():
+            for obj_id, payload in payloads.items():
+                if payload is None:
+                    continue
+                obj, resolved = decode(payload, objects)
+                objects[obj_id] = obj
+                loaded[name].append(obj)
+                if not resolved:
+                    unlinked.append(obj)
+        for objs, refs in columns:
+            link_columns(objs, refs, objects)
+        for obj in unlinked:
+            link(obj, objects)
+        return loaded
+
+    def _map_snapshot(self):
+        """Memory-map the snapshot file and read its LSN; None if absent."""
+        self.snapshot_lsn = 0
+        if not os.path.exists(self.snapshot_path) or not os.path.getsize(self.snapshot_path):
+            return None
+        with open(self.snapshot_path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.snapshot_lsn = _SNAPSHOT_HEADER.unpack_from(mapped)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{self.snapshot_path} is not a snapshot")
+        return mapped
+
+    def _read_log(self):
+        """
+        Collect the writes logged after the snapshot.
+
+        Returns:
+            dict: Repository name mapped to {ID: payload of the last PUT,
+                or None if the object was deleted}.
+        """
+        tail = {name: {} for name in self.repositories}
+        self.log.lsn = self.snapshot_lsn
+        for path in self.log.segments():
+            with open(path, 'rb') as file:
+                data = file.read()
+            end = 0
+            for end, lsn, op, name, obj_id, payload in read_frames(data):
+                if lsn <= self.snapshot_lsn:
+                    continue
+                self._objects(tail, name)[obj_id] = payload if op == PUT else None
+                self.log.lsn = lsn
+            if end < len(data):
+                os.truncate(path, end)
+        return tail
+
+    def _read_snapshot(self, mapped, tail, objects, loaded, unlinked, columns):
+        """Decode the snapshot records, skipping objects the log replaces."""
+        end = _SNAPSHOT_HEADER.size
+        for end, _, op, name, _, payload in read_frames(mapped, end):
+            replaced = self._objects(tail, name)
+            if op == COLUMNS:
+                objs, refs = decode_columns(payload)
+                columns.append((objs, refs))
+                ids = list(map(attrgetter('id'), objs))
+                if replaced:
+                    kept = [index for index, obj_id in enumerate(ids) if obj_id not in replaced]
+                    ids = [ids[index] for index in kept]
+                    objs = [objs[index] for index in kept]
+                objects.update(zip(ids, objs))
+                loaded[name].extend(objs)
+                continue
+            batch, resolved = decode(payload, objects)
+            for obj in batch:
+                if obj.id not in replaced:
+                    objects[obj.id] = obj
+                    loaded[name].append(obj)
+                    if not resolved:
+                        unlinked.append(obj)
+        if end != len(mapped):
+            raise ValueError(f"{self.snapshot_path} is corrupted at byte {end}")
+
+    def _objects(self, records, name):
+        """Return records[name], rejecting unknown repository names."""
+        if name not in records:
+            raise ValueError(f"Unknown repository in data files: {name}")
+        return records[name]
+
+    def compact(self):
+        """
+        Write a snapshot of every repository and drop the covered log.
+
+        The repositories are only frozen while their current snapshots
+        are taken and the log switches segment; encoding and writing the
+        snapshot file happen while writes go on. Stored objects are never
+        modified, so the file holds exactly the state at the LSN covered.
+
+        Returns:
+            bool: False if nothing was written since the last snapshot.
+        """
+        with self._compact_lock:
+            with self.log.lock:
+                lsn = self.log.lsn
+                if lsn == self.snapshot_lsn:
+                    return False
+                cut = {name: repo.snapshot() for name, repo in self.repositories.items()}
+                old_segments = self.log.rotate()
+
+            temp_path = self.snapshot_path + '.tmp'
+            with open(temp_path, 'wb') as file:
+                file.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, lsn))
+                for name, snapshot in cut.items():
+                    by_class = {}
+                    for obj in snapshot.get_all():
+                        by_class.setdefault(type(obj), []).append(obj)
+                    for objs in by_class.values():
+                        for start in range(0, len(objs), BATCH_SIZE):
+                            batch = objs[start:start + BATCH_SIZE]
+                            file.write(frame(lsn, COLUMNS, name, '', encode_columns(batch)))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            self._sync_directory()
+            for path in old_segments:
+                os.remove(path)
+            self.snapshot_lsn = lsn
+            return True
+
+    def _sync_directory(self):
+        """Make the snapshot rename durable where the OS supports it."""
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _compact_periodically(self):
+        while not self._stop.wait(self.compact_interval):
+            self.compact()
+
+    def close(self):
+        """Stop compacting and close the log; the repositories stay usable."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        for repo in self.repositories.values():
+            repo.attach_log(None, None)
+        self.log.close()
@@ -2,10 +2,18 @@
 Defines the repository interface and an in-memory implementation for HBnB.
 
 The Repository ABC declares CRUD and lookup methods. InMemoryRepository
-implements these using a simple dict for storage.
+implements these on copy-on-write snapshots (see snapshot.py), plus
+optional hash indexes on chosen attributes so lookups by value do not
+scan every object. Attached to an OperationLog (see durable.py), it logs
+every write before publishing it.
 """
 
+import copy
+import threading
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from hbnb.app.persistence.durable import DELETE, PUT
+from hbnb.app.persistence.snapshot import Snapshot
 
 
 class Repository(ABC):
@@ -81,17 +89,97 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """
+        Retrieve every object having a specific attribute value.
+
+        Args:
+            attr_name (str): Property name to filter on.
+            attr_value: Value that the property must match.
+
+        Returns:
+            list: The matching objects.
+        """
+        pass
+
 
 class InMemoryRepository(Repository):
     """
-    In-memory repository implementation using a dict for storage.
+    In-memory repository with lock-free snapshot reads.
+
+    The objects and their indexes live in an immutable Snapshot. Reads use
+    the current snapshot without locking; writes are serialized by a lock
+    and publish a new snapshot with a single reference assignment, so a
+    reader never sees a half-applied write nor a collection changing
+    while it iterates. Call `snapshot()` to run several reads against the
+    same version.
+
+    Stored objects are never modified: `update` and `replace` publish a
+    changed copy instead, so an object read from a snapshot always agrees
+    with that snapshot's indexes.
+
+    Attributes listed as indexes are looked up in a hash map kept in sync
+    by add/update/delete, so get_by_attribute on them is O(1). An index
+    name may be a dotted path such as 'owner.id', which turns it into a
+    reverse relationship map.
+
+    Once `attach_log` is called, each write is appended to the operation
+    log before the new snapshot is published.
     """
 
-    def __init__(self):
+    def __init__(self, unique_indexes=(), indexes=()):
         """
-        Initialize the in-memory storage dict.
+        Initialize the empty snapshot and the writer lock.
+
+        Args:
+            unique_indexes (iterable): Attributes whose value identifies at
+                most one object, e.g. ('email',).
+            indexes (iterable): Attributes whose value several objects
+                may share.
         """
-        self._storage = {}
+        self._snapshot = Snapshot.empty(unique_indexes, indexes)
+        self._write_lock = threading.Lock()
+        self._log = None
+        self._log_name = None
+
+    def attach_log(self, log, name):
+        """
+        Log the following writes, or stop logging them.
+
+        Args:
+            log (OperationLog or None): Log to append to; None detaches.
+            name (str or None): Name of this repository in the log.
+        """
+        with self._write_lock:
+            self._log = log
+            self._log_name = name
+
+    def _logged(self, op, obj_id, obj=None):
+        """Context in which a write is published, after logging it."""
+        if self._log is None:
+            return nullcontext()
+        return self._log.append(self._log_name, op, obj_id, obj)
+
+    def load(self, objs):
+        """
+        Replace the whole content of the repository, without logging.
+
+        Args:
+            objs (iterable): The objects to hold, e.g. after recovery.
+        """
+        with self._write_lock:
+            self._snapshot = self._snapshot.load(objs)
+
+    def snapshot(self):
+        """
+        Return the current version of the repository.
+
+        Returns:
+            Snapshot: Read-only view offering get, get_all,
+                get_by_attribute and get_all_by_attribute.
+        """
+        return self._snapshot
 
     def add(self, obj):
         """
@@ -99,8 +187,16 @@ class InMemoryRepository(Repository):
 
         Args:
             obj: The object to store; must have `id` attribute.
+
+        Raises:
+            ValueError: If a uniquely indexed value is already in use.
         """
-        self._storage[obj.id] = obj
+        with self._write_lock:
+            snapshot = self._snapshot
+            snapshot.check_unique(obj.id, snapshot.unique_values(obj))
+            snapshot = snapshot.put(obj)
+            with self._logged(PUT, obj.id, obj):
+                self._snapshot = snapshot
 
     def get(self, obj_id):
         """
@@ -112,7 +208,7 @@ class InMemoryRepository(Repository):
         Returns:
             The stored object or None.
         """
-        return self._storage.get(obj_id)
+        return self._snapshot.get(obj_id)
 
     def get_all(self):
         """
@@ -121,7 +217,7 @@ class InMemoryRepository(Repository):
         Returns:
             List of all objects in storage.
         """
-        return list(self._storage.values())
+        return self._snapshot.get_all()
 
     def update(self, obj_id, data):
         """
@@ -131,12 +227,47 @@ class InMemoryRepository(Repository):
             obj_id (str): ID of the object to update.
             data (dict): New attribute values.
 
+        Returns:
+            The updated copy of the object, or None if not found.
+
+        Raises:
+            ValueError: If a uniquely indexed value is already in use.
+
         Note:
-            Calls the object's own update method for attribute logic.
+            Calls the copy's own update method for attribute logic.
+        """
+        return self.replace(obj_id, lambda obj: obj.update(data))
+
+    def replace(self, obj_id, change):
+        """
+        Replace an object by a changed copy of it.
+
+        The copy is taken and changed under the writer lock, so `change`
+        works on the latest version and concurrent changes of the same
+        object are not lost.
+
+        Args:
+            obj_id (str): ID of the object to replace.
+            change (callable): Called with the copy before it is stored.
+
+        Returns:
+            The new version of the object, or None if not found.
+
+        Raises:
+            ValueError: If a uniquely indexed value is already in use.
         """
-        obj = self.get(obj_id)
-        if obj:
-            obj.update(data)
+        with self._write_lock:
+            snapshot = self._snapshot
+            obj = snapshot.get(obj_id)
+            if obj is None:
+                return None
+            obj = copy.copy(obj)
+            change(obj)
+            snapshot.check_unique(obj_id, snapshot.unique_values(obj))
+            snapshot = snapshot.put(obj)
+            with self._logged(PUT, obj_id, obj):
+                self._snapshot = snapshot
+            return obj
 
     def delete(self, obj_id):
         """
@@ -145,8 +276,12 @@ class InMemoryRepository(Repository):
         Args:
             obj_id (str): ID of the object to remove.
         """
-        if obj_id in self._storage:
-            del self._storage[obj_id]
+        with self._write_lock:
+            snapshot = self._snapshot.remove(obj_id)
+            if snapshot is self._snapshot:
+                return
+            with self._logged(DELETE, obj_id):
+                self._snapshot = snapshot
 
     def get_by_attribute(self, attr_name, attr_value):
         """
@@ -159,8 +294,18 @@ class InMemoryRepository(Repository):
         Returns:
             The first matching object or None.
         """
-        return next(
-            (obj for obj in self._storage.values()
-             if getattr(obj, attr_name) == attr_value),
-            None
-        )
+        return self._snapshot.get_by_attribute(attr_name, attr_value)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """
+        Find every object matching a given attribute value.
+
+        Args:
+            attr_name (str): Name or dotted path of the attribute.
+            attr_value: Desired value of the attribute, or one element of
+                it for multi-valued indexed attributes.
+
+        Returns:
+            list: The matching objects.
+        """
+        return self._snapshot.get_all_by_attribute(attr_name, attr_value)
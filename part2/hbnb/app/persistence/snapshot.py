@@ -0,0 +1,348 @@
+"""
+Immutable, versioned storage used by InMemoryRepository.
+
+A Snapshot holds the objects of a repository and its secondary indexes
+at one version. It is never modified: a write builds a new Snapshot that
+shares everything it did not change with the previous one, so readers
+holding a snapshot see a consistent state without taking any lock.
+
+CowDict is the copy-on-write mapping underneath. It is split in shards,
+and a write copies only the shard holding the key, so the cost of a
+write stays bounded however many objects are stored.
+"""
+
+from collections import defaultdict, deque
+from functools import lru_cache
+from itertools import chain, repeat
+from operator import and_, attrgetter, setitem
+
+# Attribute values holding several keys (e.g. a set of amenity ids) are
+# indexed under each of their elements
+MULTI_VALUED = (set, frozenset, list, tuple)
+
+
+def _expand(value):
+    """Return the index keys of an attribute value (see MULTI_VALUED)."""
+    return value if isinstance(value, MULTI_VALUED) else (value,)
+
+
+@lru_cache(maxsize=None)
+def getter(attr_name):
+    """Return the (cached) attrgetter of an attribute name or dotted path."""
+    return attrgetter(attr_name)
+
+
+class CowDict:
+    """
+    Immutable mapping whose writes return a new mapping.
+
+    Entries are spread over a power-of-two number of shards (plain dicts
+    that are never mutated once published). The number of shards doubles
+    when the average shard exceeds SHARD_SIZE entries. Iteration goes
+    shard by shard, so it does not follow insertion order.
+    """
+
+    __slots__ = ('_shards', '_size')
+
+    # Entries per shard before the mapping is split further; bounds the
+    # number of entries a single write copies
+    SHARD_SIZE = 1024
+
+    def __init__(self, shards=({},), size=0):
+        self._shards = shards
+        self._size = size
+
+    def _shard(self, key):
+        return hash(key) & (len(self._shards) - 1)
+
+    def get(self, key, default=None):
+        return self._shards[self._shard(key)].get(key, default)
+
+    def __contains__(self, key):
+        return key in self._shards[self._shard(key)]
+
+    def __len__(self):
+        return self._size
+
+    def values(self):
+        """Iterate over the values, shard by shard."""
+        for shard in self._shards:
+            yield from shard.values()
+
+    def items(self):
+        """Iterate over the (key, value) pairs, shard by shard."""
+        for shard in self._shards:
+            yield from shard.items()
+
+    def set(self, key, value):
+        """
+        Return a copy of this mapping with key set to value.
+
+        Args:
+            key: Hashable key.
+            value: Value to store.
+
+        Returns:
+            CowDict: The new mapping; this one is unchanged.
+        """
+        position = self._shard(key)
+        shard = dict(self._shards[position])
+        size = self._size + (key not in shard)
+        shard[key] = value
+        shards = self._shards[:position] + (shard,) + self._shards[position + 1:]
+        if size > len(shards) * self.SHARD_SIZE:
+            return self._split(shards, size)
+        return CowDict(shards, size)
+
+    def delete(self, key):
+        """
+        Return a copy of this mapping without key.
+
+        Args:
+            key: Key to remove; missing keys are ignored.
+
+        Returns:
+            CowDict: The new mapping (this one if key was absent).
+        """
+        position = self._shard(key)
+        if key not in self._shards[position]:
+            return self
+        shard = dict(self._shards[position])
+        del shard[key]
+        shards = self._shards[:position] + (shard,) + self._shards[position + 1:]
+        return CowDict(shards, self._size - 1)
+
+    @classmethod
+    def from_dict(cls, mapping):
+        """
+        Build a mapping holding the entries of a dict in one pass.
+
+        Args:
+            mapping (dict): Entries to store. It becomes the only shard
+                when small enough, so it must not be modified afterwards.
+
+        Returns:
+            CowDict: The new mapping.
+        """
+        if len(mapping) <= cls.SHARD_SIZE:
+            return cls((mapping,), len(mapping))
+        return cls.from_items(list(mapping), list(mapping.values()))
+
+    @classmethod
+    def from_items(cls, keys, values):
+        """
+        Build a mapping from a list of keys and the list of their values.
+
+        Args:
+            keys (list): Keys to store; a repeated key keeps its last value.
+            values (list): Value of each key.
+
+        Returns:
+            CowDict: The new mapping.
+        """
+        count = 1
+        while len(keys) > count * cls.SHARD_SIZE:
+            count *= 2
+        shards = tuple({} for _ in range(count))
+        # shards[hash(key) & (count - 1)][key] = value, looping in C
+        positions = map(and_, map(hash, keys), repeat(count - 1))
+        deque(map(setitem, map(shards.__getitem__, positions), keys, values), maxlen=0)
+        return cls(shards, sum(map(len, shards)))
+
+    @staticmethod
+    def _split(shards, size):
+        """Redistribute the entries over twice as many shards."""
+        count = len(shards) * 2
+        new_shards = tuple({} for _ in range(count))
+        for shard in shards:
+            for key, value in shard.items():
+                new_shards[hash(key) & (count - 1)][key] = value
+        return CowDict(new_shards, size)
+
+
+EMPTY = CowDict()
+
+
+class Snapshot:
+    """
+    Read-only state of a repository at one version.
+
+    Attributes:
+        version (int): Incremented by every write.
+    """
+
+    __slots__ = ('version', '_objects', '_unique_indexes', '_indexes')
+
+    def __init__(self, version, objects, unique_indexes, indexes):
+        self.version = version
+        self._objects = objects
+        # attribute -> CowDict {value: object}
+        self._unique_indexes = unique_indexes
+        # attribute -> CowDict {value: CowDict {id: object}}
+        self._indexes = indexes
+
+    @classmethod
+    def empty(cls, unique_indexes=(), indexes=()):
+        """
+        Build the initial, empty snapshot.
+
+        Args:
+            unique_indexes (iterable): Uniquely indexed attributes.
+            indexes (iterable): Attributes indexed with several objects
+                per value.
+
+        Returns:
+            Snapshot: Version 0.
+        """
+        return cls(0, EMPTY, {name: EMPTY for name in unique_indexes},
+                   {name: EMPTY for name in indexes})
+
+    def is_indexed(self, attr_name):
+        """Tell whether lookups on an attribute are served by an index."""
+        return attr_name in self._unique_indexes or attr_name in self._indexes
+
+    def check_unique(self, obj_id, values):
+        """
+        Reject values already used by another object in a unique index.
+
+        Args:
+            obj_id (str): ID of the object receiving the values.
+            values (dict): Attribute names mapped to their new values.
+
+        Raises:
+            ValueError: If a unique value belongs to another object.
+        """
+        for name, value in values.items():
+            index = self._unique_indexes.get(name)
+            if index is None:
+                continue
+            owner = index.get(value)
+            if owner is not None and owner.id != obj_id:
+                raise ValueError(f"{name} '{value}' is already in use")
+
+    def unique_values(self, obj):
+        """Return the uniquely indexed attribute values of an object."""
+        return {name: getter(name)(obj) for name in self._unique_indexes}
+
+    def put(self, obj):
+        """
+        Return the next snapshot, with obj stored and (re)indexed.
+
+        Args:
+            obj: Object with an `id` attribute.
+
+        Returns:
+            Snapshot: The new version.
+        """
+        base = self.remove(obj.id)
+        unique_indexes = {
+            name: index.set(getter(name)(obj), obj)
+            for name, index in base._unique_indexes.items()
+        }
+        indexes = {}
+        for name, index in base._indexes.items():
+            for value in _expand(getter(name)(obj)):
+                index = index.set(value, index.get(value, EMPTY).set(obj.id, obj))
+            indexes[name] = index
+        return Snapshot(self.version + 1, base._objects.set(obj.id, obj),
+                        unique_indexes, indexes)
+
+    def load(self, objs):
+        """
+        Return the next snapshot, holding exactly the given objects.
+
+        Builds the maps and indexes in one pass per index instead of one
+        put() per object; used to restore a repository in bulk.
+
+        Args:
+            objs (iterable): Objects with an `id` attribute.
+
+        Returns:
+            Snapshot: The new version.
+        """
+        objs = list(objs)
+        ids = list(map(getter('id'), objs))
+        unique_indexes = {
+            name: CowDict.from_dict(dict(zip(map(getter(name), objs), objs)))
+            for name in self._unique_indexes
+        }
+        indexes = {}
+        for name in self._indexes:
+            keys = list(map(_expand, map(getter(name), objs)))
+            counts = list(map(len, keys))
+            # buckets[key][obj.id] = obj for each key of each object, looping in C
+            buckets = defaultdict(dict)
+            deque(map(setitem,
+                      map(buckets.__getitem__, chain.from_iterable(keys)),
+                      chain.from_iterable(map(repeat, ids, counts)),
+                      chain.from_iterable(map(repeat, objs, counts))),
+                  maxlen=0)
+            indexes[name] = CowDict.from_dict(
+                {key: CowDict.from_dict(bucket) for key, bucket in buckets.items()})
+        return Snapshot(self.version + 1, CowDict.from_items(ids, objs),
+                        unique_indexes, indexes)
+
+    def remove(self, obj_id):
+        """
+        Return the next snapshot, without the object and its index entries.
+
+        Stored objects are never modified, so the entries to drop are
+        found from the object's own attribute values.
+
+        Args:
+            obj_id (str): ID of the object to drop.
+
+        Returns:
+            Snapshot: The new version (this one if the object is absent).
+        """
+        obj = self._objects.get(obj_id)
+        if obj is None:
+            return self
+        unique_indexes = {}
+        for name, index in self._unique_indexes.items():
+            value = getter(name)(obj)
+            if getattr(index.get(value), 'id', None) == obj_id:
+                index = index.delete(value)
+            unique_indexes[name] = index
+        indexes = {}
+        for name, index in self._indexes.items():
+            for value in _expand(getter(name)(obj)):
+                bucket = index.get(value)
+                if bucket is None:
+                    continue
+                bucket = bucket.delete(obj_id)
+                index = index.set(value, bucket) if len(bucket) else index.delete(value)
+            indexes[name] = index
+        return Snapshot(self.version + 1, self._objects.delete(obj_id),
+                        unique_indexes, indexes)
+
+    def get(self, obj_id):
+        """Return the object stored under an ID, or None."""
+        return self._objects.get(obj_id)
+
+    def get_all(self):
+        """Return every stored object."""
+        return list(self._objects.values())
+
+    def get_by_attribute(self, attr_name, attr_value):
+        """Return one object having the attribute value, or None."""
+        if attr_name in self._unique_indexes:
+            return self._unique_indexes[attr_name].get(attr_value)
+        if attr_name in self._indexes:
+            bucket = self._indexes[attr_name].get(attr_value, EMPTY)
+            return next(bucket.values(), None)
+        return next(
+            (obj for obj in self._objects.values()
+             if getter(attr_name)(obj) == attr_value),
+            None
+        )
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Return every object having the attribute value."""
+        if attr_name in self._unique_indexes:
+            obj = self._unique_indexes[attr_name].get(attr_value)
+            return [obj] if obj is not None else []
+        if attr_name in self._indexes:
+            return list(self._indexes[attr_name].get(attr_value, EMPTY).values())
+        return [obj for obj in self._objects.values()
+                if getter(attr_name)(obj) == attr_value]
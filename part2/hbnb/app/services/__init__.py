@@ -6,7 +6,9 @@ facade object that can be used across the application to perform
 user, place, review, and amenity operations.
 """
 
+import os
 from hbnb.app.services.facade import HBnBFacade
 
-# Single facade instance for the HBnB business logic layer
-facade = HBnBFacade()
+# Single facade instance for the HBnB business logic layer; set
+# HBNB_DATA_DIR to keep its data across restarts
+facade = HBnBFacade(data_dir=os.getenv('HBNB_DATA_DIR'))
@@ -5,6 +5,8 @@ The facade provides methods to create, retrieve, update, and delete users,
 places, reviews, and amenities via in-memory repositories.
 """
 
+from operator import attrgetter
+from hbnb.app.persistence.durable import DurableStore
 from hbnb.app.persistence.repository import InMemoryRepository
 from hbnb.app.models.user import User
 from hbnb.app.models.amenity import Amenity
@@ -21,16 +23,35 @@ class HBnBFacade:
         place_repo (InMemoryRepository): Storage for Place objects.
         review_repo (InMemoryRepository): Storage for Review objects.
         amenity_repo (InMemoryRepository): Storage for Amenity objects.
+        store (DurableStore or None): Snapshot and operation log of the
+            repositories, when a data directory is given.
     """
 
-    def __init__(self):
+    def __init__(self, data_dir=None):
         """
         Initialize all repositories for each entity type.
-        """
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+
+        Args:
+            data_dir (str, optional): Directory to persist the repositories
+                in. Their content is recovered from it on startup; without
+                it, data only lives as long as the process.
+        """
+        # Emails are looked up on every signup, amenity names when
+        # resolving a place's amenities. The relationship indexes are the
+        # reverse adjacency maps: user -> places, amenity -> places,
+        # place -> reviews and user -> reviews.
+        self.user_repo = InMemoryRepository(unique_indexes=('email',))
+        self.place_repo = InMemoryRepository(indexes=('owner.id', 'amenity_ids'))
+        self.review_repo = InMemoryRepository(indexes=('place.id', 'user.id'))
+        self.amenity_repo = InMemoryRepository(indexes=('name',))
+        self.store = None
+        if data_dir:
+            self.store = DurableStore(data_dir, {
+                'users': self.user_repo,
+                'amenities': self.amenity_repo,
+                'places': self.place_repo,
+                'reviews': self.review_repo
+            }).open()
 
     def create_user(self, user_data):
         """
@@ -41,6 +62,9 @@ class HBnBFacade:
 
         Returns:
             User: The newly created User object.
+
+        Raises:
+            ValueError: If the email is already registered.
         """
         user = User(**user_data)
         self.user_repo.add(user)
@@ -89,13 +113,19 @@ class HBnBFacade:
 
         Returns:
             User or None: Updated User or None if not found.
+
+        Raises:
+            ValueError: If the new email belongs to another user.
         """
-        user = self.user_repo.get(user_id)
+        user = self.user_repo.update(user_id, new_data)
         if not user:
             return None
-        for key, value in new_data.items():
-            if hasattr(user, key):
-                setattr(user, key, value)
+        # Places and reviews hold the user object: point them to the
+        # current version, which a concurrent update may have replaced
+        for place in self.place_repo.get_all_by_attribute('owner.id', user_id):
+            self._replace_place(place.id, lambda place: setattr(
+                place, 'owner', self._current(self.user_repo, place.owner)))
+        self._relink_reviews('user', self.user_repo, user_id)
         return user
 
     def create_amenity(self, amenity_data):
@@ -144,32 +174,58 @@ class HBnBFacade:
         Returns:
             Amenity or None: Updated Amenity or None if not found.
         """
-        amenity = self.amenity_repo.get(amenity_id)
+        amenity = self.amenity_repo.update(amenity_id, amenity_data)
         if not amenity:
             return None
-        for key, value in amenity_data.items():
-            if hasattr(amenity, key):
-                setattr(amenity, key, value)
+        for place in self.get_places_by_amenity(amenity_id):
+            self._replace_place(place.id, lambda place: setattr(place, 'amenities', [
+                self._current(self.amenity_repo, item) if item.id == amenity_id else item
+                for item in place.amenities]))
         return amenity
 
+    def _get_amenities(self, amenity_ids):
+        """
+        Resolve a list of amenity IDs.
+
+        Args:
+            amenity_ids (list): IDs of existing amenities.
+
+        Returns:
+            list: The Amenity objects, in the given order.
+
+        Raises:
+            ValueError: If an amenity is not found.
+        """
+        amenities = []
+        for amenity_id in amenity_ids:
+            amenity = self.amenity_repo.get(amenity_id)
+            if not amenity:
+                raise ValueError(f"Amenity {amenity_id} not found")
+            amenities.append(amenity)
+        return amenities
+
     def create_place(self, place_data):
         """
         Create and store a new Place linked to an existing User.
 
         Args:
-            place_data (dict): Attributes, including 'owner' user ID.
+            place_data (dict): Attributes, including 'owner' user ID and
+                optionally 'amenities', a list of amenity IDs.
 
         Returns:
             Place: The newly created Place.
 
         Raises:
-            ValueError: If specified owner is not found.
+            ValueError: If specified owner or an amenity is not found.
         """
         owner_id = place_data.pop('owner')
+        amenity_ids = place_data.pop('amenities', [])
         owner = self.get_user(owner_id)
         if not owner:
             raise ValueError("Owner not found")
+        amenities = self._get_amenities(amenity_ids)
         place = Place(owner=owner, **place_data)
+        place.amenities = amenities
         self.place_repo.add(place)
         return place
 
@@ -204,15 +260,129 @@ class HBnBFacade:
 
         Returns:
             Place or None: Updated Place or None if not found.
+
+        Raises:
+            ValueError: If one of the new amenities is not found.
         """
-        place = self.place_repo.get(place_id)
-        if not place:
+        if not self.place_repo.get(place_id):
             return None
-        for key, value in place_data.items():
-            if hasattr(place, key):
-                setattr(place, key, value)
+        place_data = dict(place_data)
+        if 'amenities' in place_data:
+            place_data['amenities'] = self._get_amenities(place_data['amenities'])
+        # One repository write, which also refreshes the amenity index
+        return self._replace_place(place_id, lambda place: place.update(place_data))
+
+    def _replace_place(self, place_id, change):
+        """
+        Replace a Place by a changed copy, and relink its reviews to it.
+
+        Args:
+            place_id (str): ID of the place.
+            change (callable): Called with the copy before it is stored.
+
+        Returns:
+            Place or None: The new version, or None if not found.
+        """
+        place = self.place_repo.replace(place_id, change)
+        if place:
+            self._relink_reviews('place', self.place_repo, place_id)
         return place
 
+    def _relink_reviews(self, attr_name, repo, obj_id):
+        """
+        Point the reviews referencing an object to its current version.
+
+        Args:
+            attr_name (str): 'place' or 'user'.
+            repo (InMemoryRepository): Repository holding the object.
+            obj_id (str): ID of the referenced object.
+        """
+        for review in self.review_repo.get_all_by_attribute(f'{attr_name}.id', obj_id):
+            self.review_repo.replace(review.id, lambda review: setattr(
+                review, attr_name, self._current(repo, getattr(review, attr_name))))
+
+    @staticmethod
+    def _current(repo, obj):
+        """
+        Latest stored version of a referenced object.
+
+        Read while the referencing object is changed under its own
+        repository's writer lock, so when updates of the same object
+        race, the last relink runs after the last update and points to
+        its version.
+
+        Args:
+            repo (InMemoryRepository): Repository holding the object.
+            obj (BaseModel): Version currently referenced.
+
+        Returns:
+            BaseModel: The stored version, or `obj` if it was deleted.
+        """
+        return repo.get(obj.id) or obj
+
+    def add_amenity_to_place(self, place_id, amenity_id):
+        """
+        Attach an existing Amenity to a Place.
+
+        Args:
+            place_id (str): ID of the place.
+            amenity_id (str): ID of the amenity.
+
+        Returns:
+            Place or None: The updated Place or None if not found.
+
+        Raises:
+            ValueError: If the amenity is not found.
+        """
+        if not self.place_repo.get(place_id):
+            return None
+        amenity, = self._get_amenities([amenity_id])
+        return self._replace_place(place_id, lambda place: place.add_amenity(amenity))
+
+    def remove_amenity_from_place(self, place_id, amenity_id):
+        """
+        Detach an Amenity from a Place.
+
+        Args:
+            place_id (str): ID of the place.
+            amenity_id (str): ID of the amenity.
+
+        Returns:
+            Place or None: The updated Place or None if not found.
+
+        Raises:
+            ValueError: If the amenity is not found.
+        """
+        if not self.place_repo.get(place_id):
+            return None
+        amenity, = self._get_amenities([amenity_id])
+        return self._replace_place(place_id, lambda place: place.remove_amenity(amenity))
+
+    def get_places_by_owner(self, user_id):
+        """
+        Retrieve the places owned by a user.
+
+        Args:
+            user_id (str): ID of the owner.
+
+        Returns:
+            list: Places of the owner, in creation order.
+        """
+        places = self.place_repo.get_all_by_attribute('owner.id', user_id)
+        return sorted(places, key=attrgetter('created_at'))
+
+    def get_places_by_amenity(self, amenity_id):
+        """
+        Retrieve the places offering an amenity.
+
+        Args:
+            amenity_id (str): ID of the amenity.
+
+        Returns:
+            list: Places having the amenity.
+        """
+        return self.place_repo.get_all_by_attribute('amenity_ids', amenity_id)
+
     def create_review(self, review_data):
         """
         Create and store a new Review linked to User and Place.
@@ -269,9 +439,19 @@ class HBnBFacade:
         Returns:
             list: Reviews linked to the given place.
         """
-        all_review = self.review_repo.get_all()
-        return [review for review in all_review
-                if review.place.id == place_id]
+        return self.review_repo.get_all_by_attribute('place.id', place_id)
+
+    def get_reviews_by_user(self, user_id):
+        """
+        Retrieve all reviews written by a user.
+
+        Args:
+            user_id (str): ID of the user.
+
+        Returns:
+            list: Reviews written by the given user.
+        """
+        return self.review_repo.get_all_by_attribute('user.id', user_id)
 
     def update_review(self, review_id, review_data):
         """
@@ -284,13 +464,7 @@ class HBnBFacade:
         Returns:
             Review or None: Updated Review or None if not found.
         """
-        review = self.review_repo.get(review_id)
-        if not review:
-            return None
-        for key, value in review_data.items():
-            if hasattr(review, key):
-                setattr(review, key, value)
-        return review
+        return self.review_repo.update(review_id, review_data)
 
     def delete_review(self, review_id):
         """
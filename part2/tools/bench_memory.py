@@ -0,0 +1,58 @@
+"""
+Memory benchmark for the in-memory models and repository.
+
+Builds places (each with an owner among N/10 users and two of 50
+amenities) and reports the bytes allocated per place, first for the
+model objects alone, then including the repository maps and indexes.
+
+Usage (from part2/):
+    python -m tools.bench_memory [--places 1000000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from hbnb.app.models.amenity import Amenity
+from hbnb.app.models.place import Place
+from hbnb.app.models.user import User
+from hbnb.app.services.facade import HBnBFacade
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=1000000)
+    args = parser.parse_args()
+
+    gc.disable()
+    tracemalloc.start()
+    users = [User('Bench', str(i), f'user{i}@example.com')
+             for i in range(max(1, args.places // 10))]
+    amenities = [Amenity(f'amenity-{i}') for i in range(50)]
+    base, _ = tracemalloc.get_traced_memory()
+
+    places = []
+    for i in range(args.places):
+        place = Place(f'Place {i}', 'Benchmark place', 100, 45.0, 5.0,
+                      users[i % len(users)])
+        place.add_amenity(amenities[i % len(amenities)])
+        place.add_amenity(amenities[(i * 7) % len(amenities)])
+        places.append(place)
+    models, _ = tracemalloc.get_traced_memory()
+
+    facade = HBnBFacade()
+    facade.place_repo.load(places)
+    stored, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    users_size = base / len(users)
+    per_place = (models - base) / args.places
+    per_entry = (stored - models) / args.places
+    print(f"{args.places} places, {len(users)} users")
+    print(f"user (with its strings): {users_size:,.0f} bytes")
+    print(f"place (with its strings): {per_place:,.0f} bytes")
+    print(f"place repository entry and indexes: {per_entry:,.0f} bytes")
+    print(f"total per place: {per_place + per_entry:,.0f} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Thread-scaling benchmark for the in-memory repository.
+
+Runs reader threads (get and indexed get_by_attribute) against one
+writer thread adding, updating and deleting amenities, for several
+thread counts, and reports reads and writes per second. A second pass
+iterates get_all() while writes happen and counts the reads that failed
+or saw a torn state (a pair half-added, or an updated object disagreeing
+with the name index), which must stay at zero.
+
+Usage (from part2/):
+    python -m tools.bench_repository [--objects 100000] [--seconds 2]
+"""
+
+import argparse
+import threading
+import time
+from hbnb.app.models.amenity import Amenity
+from hbnb.app.persistence.repository import InMemoryRepository
+
+
+def run(repo, names, readers, seconds):
+    """Run the mixed workload; return (reads/s, writes/s)."""
+    stop = threading.Event()
+    reads = [0] * readers
+    writes = [0]
+    ids = [obj.id for obj in repo.get_all()]
+
+    def reader(slot):
+        count = 0
+        position = slot
+        while not stop.is_set():
+            repo.get(ids[position % len(ids)])
+            repo.get_by_attribute('name', names[position % len(names)])
+            position += 7
+            count += 2
+        reads[slot] = count
+
+    def writer():
+        count = 0
+        while not stop.is_set():
+            amenity = Amenity(names[count % len(names)])
+            repo.add(amenity)
+            repo.update(amenity.id, {'name': names[(count + 1) % len(names)]})
+            repo.delete(amenity.id)
+            count += 3
+        writes[0] = count
+
+    threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / seconds, writes[0] / seconds
+
+
+def check_consistency(seconds):
+    """Iterate get_all() during writes; return (scans, failed scans)."""
+    repo = InMemoryRepository(indexes=('name',))
+    renamed = Amenity("renamed-0")
+    repo.add(renamed)
+    stop = threading.Event()
+
+    def writer():
+        count = 0
+        while not stop.is_set():
+            repo.update(renamed.id, {'name': f"renamed-{count}"})
+            # Each batch adds then removes a pair: a scan sees both or neither
+            pair = [Amenity(f"pair-{count}"), Amenity(f"pair-{count}")]
+            for amenity in pair:
+                repo.add(amenity)
+            for amenity in pair:
+                repo.delete(amenity.id)
+            count += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    scans = failures = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        snapshot = repo.snapshot()
+        try:
+            names = [obj.name for obj in snapshot.get_all()
+                     if obj.id != renamed.id]
+            current = snapshot.get(renamed.id)
+            if (len(names) != len(set(names)) * 2
+                    or snapshot.get_by_attribute('name', current.name) is not current):
+                failures += 1
+        except RuntimeError:
+            failures += 1
+        scans += 1
+    stop.set()
+    thread.join()
+    return scans, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--objects', type=int, default=100000)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    names = [f"amenity-{i}" for i in range(args.objects)]
+    repo = InMemoryRepository(indexes=('name',))
+    for name in names:
+        repo.add(Amenity(name))
+
+    print(f"{args.objects} objects, {args.seconds}s per run")
+    print(f"{'readers':>8} {'reads/s':>12} {'writes/s':>10}")
+    for readers in args.threads:
+        read_rate, write_rate = run(repo, names, readers, args.seconds)
+        print(f"{readers:>8} {read_rate:>12,.0f} {write_rate:>10,.0f}")
+
+    scans, failures = check_consistency(args.seconds)
+    print(f"consistency: {scans} scans during writes, {failures} inconsistent")
+
+
+if __name__ == '__main__':
+    main()
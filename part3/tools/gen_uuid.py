@@ -1,6 +1,76 @@
+"""
+Generate IDs for the seed rows of schema.sql.
+
+IDs are time-ordered UUIDs (version 7) by default, as the models generate
+them; --version 4 gives random ones. With --sql, each ID is also printed
+as the X'...' blob literal of its 16 bytes, the form the keys are stored
+in (BLOB key columns). --convert turns existing UUIDs into such literals,
+e.g. to keep the seeded IDs when moving schema.sql to blob keys.
+
+Usage:
+    python gen_uuid.py                       # IDs of the default amenities
+    python gen_uuid.py --sql Sauna Parking   # IDs and blob literals
+    python gen_uuid.py --convert 36c9050e-ddd3-4c3b-9731-9f487208bbc1
+"""
+
+import argparse
+import os
+import time
 import uuid
 
 amenities = ["WiFi", "Swimming Pool", "Air Conditioning"]
 
-for amenity in amenities:
-    print(f"{amenity}: {uuid.uuid4()}")
+_last_ms = 0
+_counter = 0
+
+
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48-bit Unix time in ms, a
+    12-bit counter keeping IDs of the same millisecond increasing, then
+    62 random bits.
+    """
+    global _last_ms, _counter
+    now = time.time_ns() // 1_000_000
+    if now > _last_ms:
+        _last_ms, _counter = now, int.from_bytes(os.urandom(2), 'big') >> 5
+    else:
+        _counter += 1
+        if _counter > 0xFFF:
+            _last_ms, _counter = _last_ms + 1, 0
+    random_bits = int.from_bytes(os.urandom(8), 'big') >> 2
+    value = (_last_ms << 80) | (0x7 << 76) | (_counter << 64) | (0b10 << 62) | random_bits
+    return uuid.UUID(int=value)
+
+
+def blob_literal(value):
+    """SQL literal of the 16 bytes of a UUID."""
+    return f"X'{value.hex}'"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate IDs for schema.sql seed rows.")
+    parser.add_argument('names', nargs='*', default=amenities,
+                        help="labels to generate an ID for (default: the seeded amenities)")
+    parser.add_argument('--version', type=int, choices=(4, 7), default=7,
+                        help="UUID version (default: 7, time-ordered)")
+    parser.add_argument('--sql', action='store_true',
+                        help="also print the X'...' blob literal of each ID")
+    parser.add_argument('--convert', nargs='+', metavar='UUID',
+                        help="print the blob literal of existing UUIDs")
+    args = parser.parse_args()
+
+    if args.convert:
+        for value in args.convert:
+            print(f"{value}: {blob_literal(uuid.UUID(value))}")
+        return
+    for name in args.names:
+        value = uuid7() if args.version == 7 else uuid.uuid4()
+        if args.sql:
+            print(f"{name}: {value} {blob_literal(value)}")
+        else:
+            print(f"{name}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,8 @@ from flask import Flask
 from flask_restx import Api
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
-from app.extensions import db
+from app.extensions import async_db, db, place_columns, place_knn
+from app.persistence import replica, sqlite, unit_of_work
 from flask_cors import CORS
 
 bcrypt = Bcrypt()
@@ -12,11 +13,17 @@ def create_app(config_class="config.DevelopmentConfig"):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
-    CORS(app, supports_credentials=True)
+    CORS(app, supports_credentials=True, expose_headers=['X-Next-Cursor'])
 
     bcrypt.init_app(app)
     jwt.init_app(app)
     db.init_app(app)
+    sqlite.init_app(app)
+    replica.init_app(app, db)
+    async_db.init_app(app)
+    unit_of_work.init_app(app)
+    place_columns.init_app(app, db)
+    place_knn.init_app(app, db)
 
     from app.api.v1.users import api as users_ns
     from app.api.v1.amenities import api as amenities_ns
@@ -24,6 +31,12 @@ def create_app(config_class="config.DevelopmentConfig"):
     from app.api.v1.reviews import api as review_ns
     from app.api.v1.auth import api as auth_ns
     from app.api.v1.protected import api as protected_ns
+    from app.api.v1.stats import api as stats_ns
+    from app.services import facade
+
+    with app.app_context():
+        facade.init_write_behind(app.config, db.engine, app.instance_path)
+    facade.init_cache(app.config)
 
     # Simple API setup with Bearer token support for Swagger testing
     authorizations = {
@@ -50,5 +63,6 @@ def create_app(config_class="config.DevelopmentConfig"):
     api.add_namespace(review_ns, path='/api/v1/reviews')
     api.add_namespace(auth_ns, path='/api/v1/auth')
     api.add_namespace(protected_ns, path='/api/v1/protected')
+    api.add_namespace(stats_ns, path='/api/v1/stats')
 
     return app
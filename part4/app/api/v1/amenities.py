@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.api.v1.pagination import pagination_parser, parse_pagination, page_headers
 """
 This module defines RESTful API endpoints for managing amenities in  HBnB app.
 
@@ -10,7 +11,8 @@ are delegated to the HBnBFacade.
 
 Routes:
     POST   /api/v1/amenities/           -> Create a new amenity
-    GET    /api/v1/amenities/           -> List all amenities
+    POST   /api/v1/amenities/batch      -> Create several amenities at once
+    GET    /api/v1/amenities/           -> List all amenities (?limit=&cursor=)
     GET    /api/v1/amenities/<id>       -> Retrieve amenity by ID
     PUT    /api/v1/amenities/<id>       -> Update an existing amenity
 
@@ -50,17 +52,53 @@ class AmenityList(Resource):
         except (ValueError, TypeError) as e:
             return {"error": str(e)}, 400
 
+    @api.expect(pagination_parser)
     @api.marshal_list_with(amenity_output_model)
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
         """
-        Get a list of all amenities.
+        Get a list of all amenities, or one page when limit/cursor is given.
 
         Returns:
-            tuple: List of amenities and HTTP status code.
+            tuple: List of amenities, HTTP status code and, when paginated,
+                the X-Next-Cursor header.
         """
-        amenities = facade.get_all_amenities()
-        return [a.to_dict() for a in amenities], 200
+        try:
+            limit, cursor = parse_pagination()
+            amenities, next_cursor = facade.get_amenity_rows(limit, cursor)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return amenities, 200, page_headers(next_cursor)
+
+
+@api.route('/batch')
+class AmenityBatch(Resource):
+    @api.expect([amenity_input_model])
+    @api.response(201, 'All amenities successfully created')
+    @api.response(207, 'Some amenities could not be created')
+    @api.response(400, 'Invalid batch')
+    def post(self):
+        """
+        Register several amenities in one transaction.
+
+        Returns:
+            tuple: Per-item results in request order, and HTTP status code.
+        """
+        try:
+            results = facade.create_amenities(api.payload)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        items = []
+        for index, (amenity, error) in enumerate(results):
+            if error:
+                items.append({"index": index, "status": 400, "error": error})
+            else:
+                items.append({"index": index, "status": 201,
+                              "amenity": amenity.to_dict()})
+        failed = any(error for amenity, error in results)
+        return {"results": items}, 207 if failed else 201
 
 
 @api.route('/<amenity_id>')
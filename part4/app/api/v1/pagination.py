@@ -0,0 +1,66 @@
+"""
+Query-string helpers for cursor-paginated collection endpoints.
+
+Collection endpoints accept `?limit=&cursor=`. When neither is given the
+full collection is returned as before; otherwise one page is returned and
+the cursor for the next page is sent in the `X-Next-Cursor` header.
+"""
+
+from flask import request
+from flask_restx import reqparse
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+# Documents the query string in Swagger; parse_pagination reads it.
+pagination_parser = reqparse.RequestParser()
+pagination_parser.add_argument(
+    'limit', type=int, location='args',
+    help=f'Page size (1-{MAX_PAGE_SIZE}, default {DEFAULT_PAGE_SIZE})')
+pagination_parser.add_argument(
+    'cursor', type=str, location='args',
+    help=f'Opaque cursor taken from the {NEXT_CURSOR_HEADER} header')
+
+
+def parse_pagination(args=None):
+    """
+    Read pagination arguments from the current request.
+
+    Args:
+        args (Mapping, optional): Query arguments to read instead of the
+            current Flask request's.
+
+    Returns:
+        tuple: (limit, cursor); limit is None when pagination is not requested.
+
+    Raises:
+        ValueError: If limit is not a positive integer.
+    """
+    if args is None:
+        args = request.args
+    limit, cursor = args.get('limit'), args.get('cursor')
+    if limit is None and not cursor:
+        return None, None
+    if limit is None:
+        return DEFAULT_PAGE_SIZE, cursor
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE), cursor
+
+
+def page_headers(next_cursor):
+    """
+    Build the response headers for a page.
+
+    Args:
+        next_cursor (str or None): Cursor of the next page.
+
+    Returns:
+        dict: Headers exposing the next cursor, empty on the last page.
+    """
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
@@ -7,9 +7,12 @@ It includes creation, retrieval (list and by ID), and update of place records.
 Each place is linked to a user (owner) and a list of amenities.
 """
 
-from app.models.base_model import BaseModel
-from flask_restx import Namespace, Resource, fields
+from app.models.base_model import BaseModel, serialize_row
+from flask import request
+from flask_restx import Namespace, Resource, fields, reqparse
 from app.services import facade
+from app.api.v1.pagination import (DEFAULT_PAGE_SIZE, pagination_parser, parse_pagination,
+                                   page_headers)
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 
@@ -40,6 +43,34 @@ place_model = api.model('Place', {
 })
 
 
+def _float_arg(name, required=False):
+    """
+    Read a number from the query string.
+
+    Raises:
+        ValueError: If the value is not a number, or is missing while required.
+    """
+    value = request.args.get(name)
+    if value is None or value == '':
+        if required:
+            raise ValueError(f"{name} is required")
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+
+def _place_rows(places):
+    """Serialize place rows read with their amenity rows."""
+    result = []
+    for place in places:
+        place_dict = serialize_row(place)
+        place_dict['amenities'] = [serialize_row(a) for a in place['amenities']]
+        result.append(place_dict)
+    return result
+
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model)
@@ -70,21 +101,243 @@ class PlaceList(Resource):
         except ValueError as e:
             return {"error": str(e)}, 400
 
+    @api.expect(pagination_parser)
+    @api.param('include', "Set to 'description' to include descriptions")
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    def get(self):
+        """
+        Get a list of all places, or one page when limit/cursor is given.
+
+        Descriptions are left out unless ?include=description is given.
+
+        Returns:
+            tuple: JSON response with list of places or error, status code
+                and, when paginated, the X-Next-Cursor header.
+        """
+        try:
+            limit, cursor = parse_pagination()
+            include_description = request.args.get('include') == 'description'
+            places, next_cursor = facade.get_place_rows(
+                limit, cursor, include_description)
+            return _place_rows(places), 200, page_headers(next_cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception:
+            return {"error": "An unexpected error occurred"}, 500
+
+
+# Documents the search query string in Swagger; PlaceSearch.get reads it.
+search_parser = pagination_parser.copy()
+search_parser.add_argument('min_price', type=float, location='args', help='Lowest price per night')
+search_parser.add_argument('max_price', type=float, location='args', help='Highest price per night')
+search_parser.add_argument(
+    'amenities', type=str, location='args', action='append',
+    help='Required amenity IDs or names, comma-separated or repeated')
+search_parser.add_argument('owner_id', type=str, location='args', help='ID of the owner')
+search_parser.add_argument(
+    'sort', type=str, location='args', choices=('created_at', 'price', 'rating'),
+    help='Sort key (default created_at)')
+search_parser.add_argument(
+    'order', type=str, location='args', choices=('asc', 'desc'),
+    help='Sort order (default desc for rating, asc otherwise)')
+search_parser.add_argument(
+    'include', type=str, location='args', help="Set to 'description' to include descriptions")
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.expect(search_parser)
+    @api.response(200, 'Page of matching places retrieved successfully')
+    @api.response(400, 'Invalid search or pagination parameters')
+    def get(self):
+        """
+        Search places by price range, amenities and owner, sorted and paginated.
+
+        A place must have every requested amenity. Results are always
+        paginated; the cursor of the next page is sent in X-Next-Cursor.
+
+        Returns:
+            tuple: JSON list of places or error, status code and headers.
+        """
+        try:
+            limit, cursor = parse_pagination()
+            amenities = [name.strip() for value in request.args.getlist('amenities')
+                         for name in value.split(',') if name.strip()]
+            sort = request.args.get('sort', 'created_at')
+            order = request.args.get('order', 'desc' if sort == 'rating' else 'asc')
+            places, next_cursor = facade.search_place_rows(
+                _float_arg('min_price'), _float_arg('max_price'), amenities,
+                request.args.get('owner_id') or None, sort, order,
+                limit or DEFAULT_PAGE_SIZE, cursor,
+                request.args.get('include') == 'description')
+            return _place_rows(places), 200, page_headers(next_cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception:
+            return {"error": "An unexpected error occurred"}, 500
+
+
+# Documents the nearby query string in Swagger; PlaceNearby.get reads it.
+nearby_parser = pagination_parser.copy()
+nearby_parser.add_argument('lat', type=float, location='args', required=True,
+                           help='Latitude of the center')
+nearby_parser.add_argument('lng', type=float, location='args', required=True,
+                           help='Longitude of the center')
+nearby_parser.add_argument('radius_km', type=float, location='args', required=True,
+                           help='Search radius in km')
+nearby_parser.add_argument(
+    'include', type=str, location='args', help="Set to 'description' to include descriptions")
+
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.expect(nearby_parser)
+    @api.response(200, 'Page of places retrieved successfully, nearest first')
+    @api.response(400, 'Invalid location or pagination parameters')
     def get(self):
         """
-        Get a list of all places.
+        Get the places within radius_km of (lat, lng), nearest first.
+
+        Each place has a distance_km. Results are always paginated; the
+        cursor of the next page is sent in X-Next-Cursor.
 
         Returns:
-            tuple: JSON response with list of places or error, and status code.
+            tuple: JSON list of places or error, status code and headers.
         """
         try:
-            all_place = facade.get_all_places()
-            return [place.to_dict() for place in all_place], 200
+            limit, cursor = parse_pagination()
+            places, next_cursor = facade.nearby_place_rows(
+                _float_arg('lat', True), _float_arg('lng', True), _float_arg('radius_km', True),
+                limit or DEFAULT_PAGE_SIZE, cursor,
+                request.args.get('include') == 'description')
+            return _place_rows(places), 200, page_headers(next_cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
         except Exception:
             return {"error": "An unexpected error occurred"}, 500
 
 
+# Largest k accepted by /places/nearest
+MAX_NEAREST = 100
+
+# Documents the nearest query string in Swagger; PlaceNearest.get reads it.
+nearest_parser = reqparse.RequestParser()
+nearest_parser.add_argument('lat', type=float, location='args', required=True,
+                            help='Latitude of the point')
+nearest_parser.add_argument('lng', type=float, location='args', required=True,
+                            help='Longitude of the point')
+nearest_parser.add_argument('k', type=int, location='args',
+                            help=f'Number of places (1-{MAX_NEAREST}, default 20)')
+nearest_parser.add_argument(
+    'include', type=str, location='args', help="Set to 'description' to include descriptions")
+
+
+@api.route('/nearest')
+class PlaceNearest(Resource):
+    @api.expect(nearest_parser)
+    @api.response(200, 'Nearest places retrieved successfully')
+    @api.response(400, 'Invalid location or k')
+    @api.response(503, 'Nearest-place index disabled')
+    def get(self):
+        """
+        Get the k places nearest to (lat, lng), nearest first, with no radius.
+
+        Each place has a distance_km.
+
+        Returns:
+            tuple: JSON list of places or error, and status code.
+        """
+        try:
+            k = request.args.get('k', '20')
+            try:
+                k = int(k)
+            except ValueError:
+                k = 0
+            if not 1 <= k <= MAX_NEAREST:
+                raise ValueError(f"k must be an integer between 1 and {MAX_NEAREST}")
+            places = facade.nearest_place_rows(
+                _float_arg('lat', True), _float_arg('lng', True), k,
+                request.args.get('include') == 'description')
+            return _place_rows(places), 200
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except RuntimeError as e:
+            return {"error": str(e)}, 503
+        except Exception:
+            return {"error": "An unexpected error occurred"}, 500
+
+
+# Documents the bounding-box query string in Swagger; PlaceBoundingBox.get reads it.
+bbox_parser = pagination_parser.copy()
+for _edge, _help in (('south', 'Southern edge latitude'), ('west', 'Western edge longitude'),
+                     ('north', 'Northern edge latitude'), ('east', 'Eastern edge longitude')):
+    bbox_parser.add_argument(_edge, type=float, location='args', required=True, help=_help)
+bbox_parser.add_argument(
+    'include', type=str, location='args', help="Set to 'description' to include descriptions")
+
+
+@api.route('/bbox')
+class PlaceBoundingBox(Resource):
+    @api.expect(bbox_parser)
+    @api.response(200, 'Page of places retrieved successfully')
+    @api.response(400, 'Invalid box or pagination parameters')
+    def get(self):
+        """
+        Get the places inside a bounding box, e.g. a map viewport.
+
+        A west edge greater than the east edge crosses the antimeridian.
+        Results are always paginated; the cursor of the next page is sent
+        in X-Next-Cursor.
+
+        Returns:
+            tuple: JSON list of places or error, status code and headers.
+        """
+        try:
+            limit, cursor = parse_pagination()
+            places, next_cursor = facade.bbox_place_rows(
+                _float_arg('south', True), _float_arg('west', True),
+                _float_arg('north', True), _float_arg('east', True),
+                limit or DEFAULT_PAGE_SIZE, cursor,
+                request.args.get('include') == 'description')
+            return _place_rows(places), 200, page_headers(next_cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        except Exception:
+            return {"error": "An unexpected error occurred"}, 500
+
+
+@api.route('/batch')
+class PlaceBatch(Resource):
+    @api.expect([place_model])
+    @api.response(201, 'All places successfully created')
+    @api.response(207, 'Some places could not be created')
+    @api.response(400, 'Invalid batch')
+    @api.doc(security='Bearer')
+    @jwt_required()
+    def post(self):
+        """
+        Create several places owned by the current user in one transaction.
+
+        Returns:
+            tuple: Per-item results in request order, and HTTP status code.
+        """
+        current_user_id = get_jwt_identity()
+        try:
+            results = facade.create_places(api.payload, current_user_id)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        items = []
+        for index, (place, error) in enumerate(results):
+            if error:
+                items.append({"index": index, "status": 400, "error": error})
+            else:
+                items.append({"index": index, "status": 201, "place": place.to_dict()})
+        failed = any(error for place, error in results)
+        return {"results": items}, 207 if failed else 201
+
+
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully')
@@ -99,7 +352,7 @@ class PlaceResource(Resource):
             tuple: Place data with owner and amenities, or error, and status code.
         """
         try:
-            place = facade.get_place(place_id)
+            place = facade.get_place_details(place_id)
             if not place:
                 return {"error": "Place not found"}, 404
             result = place.to_dict()
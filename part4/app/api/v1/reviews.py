@@ -19,6 +19,8 @@ Classes:
 from flask_restx import Namespace, Resource, fields
 from flask import request
 from app.services import facade
+from app.models.base_model import serialize_row
+from app.api.v1.pagination import pagination_parser, parse_pagination, page_headers
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 api = Namespace('reviews', description='Review operations')
@@ -54,18 +56,14 @@ class ReviewList(Resource):
             place = facade.get_place(review_data["place_id"])
             if place.owner_id == current_user_id:
                 return {"error": "You cannot review your own place."}, 400
-
-            existing_review = facade.get_review_by_user_and_place(
-                current_user_id, review_data["place_id"])
-            if existing_review:
-                return {"error": "You have already reviewed this place."}, 400
             review_data["user_id"] = current_user_id
 
             # Validate rating range
             if not (1 <= review_data['rating'] <= 5):
                 return {'error': 'Rating must be between 1 and 5'}, 400
 
-            # Create the review using facade
+            # Create the review using facade; a second review of the same
+            # place is rejected by the unique (user_id, place_id) constraint
             new_review = facade.create_review(review_data)
             return {
                 'id': new_review.id,
@@ -83,23 +81,18 @@ class ReviewList(Resource):
             traceback.print_exc()
             return {'error': 'Internal server error'}, 500
 
+    @api.expect(pagination_parser)
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
-        """Retrieve a list of all reviews"""
+        """Retrieve a list of all reviews, or one page with ?limit=&cursor="""
         try:
-            reviews = facade.get_all_reviews()
-            return [
-                {
-                    'id': review.id,
-                    'text': review.text,
-                    'rating': review.rating,
-                    'user_id': review.user_id,
-                    'place_id': review.place_id,
-                    'created_at': review.created_at.isoformat(),
-                    'updated_at': review.updated_at.isoformat()
-                }
-                for review in reviews
-            ], 200
+            limit, cursor = parse_pagination()
+            reviews, next_cursor = facade.get_review_rows(limit, cursor)
+            return [serialize_row(review) for review in reviews], \
+                200, page_headers(next_cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': 'Internal server error'}, 500
 
@@ -209,11 +202,17 @@ class ReviewResource(Resource):
 
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
+    @api.expect(pagination_parser)
+    @api.param('order', "'asc' (oldest first, default) or 'desc' (newest first)")
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Retrieve all reviews for a specific place.
 
+        Supports ?limit=&cursor=&order= to return one page at a time; the
+        next cursor is then sent in the X-Next-Cursor header.
+
         Args:
             place_id (str): The ID of the place.
 
@@ -223,11 +222,13 @@ class PlaceReviewList(Resource):
         """
         try:
             # First check if place exists
-            place = facade.get_place(place_id)
-            if not place:
+            if not facade.place_exists(place_id):
                 return {'error': 'Place not found'}, 404
 
-            reviews = facade.get_reviews_by_place(place_id)
+            limit, cursor = parse_pagination()
+            order = request.args.get('order', 'asc')
+            reviews, next_cursor = facade.get_place_reviews_page(
+                place_id, limit, cursor, order)
             return [
                 {
                     'id': review.id,
@@ -239,6 +240,8 @@ class PlaceReviewList(Resource):
                     'updated_at': review.updated_at.isoformat()
                 }
                 for review in reviews
-            ], 200
+            ], 200, page_headers(next_cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': 'Internal server error'}, 500
@@ -0,0 +1,31 @@
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from app.services import facade
+
+api = Namespace('stats', description='Runtime statistics (admin only)')
+
+
+@api.route('/cache')
+class CacheStats(Resource):
+    @api.response(200, 'Entity cache statistics')
+    @api.response(403, 'Admin access required')
+    @api.doc(security='Bearer')
+    @jwt_required()
+    def get(self):
+        """Hit/miss statistics of the entity caches, per table"""
+        if not get_jwt().get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+        return facade.get_cache_stats(), 200
+
+
+@api.route('/write-behind')
+class WriteBehindStats(Resource):
+    @api.response(200, 'Write-behind queue statistics')
+    @api.response(403, 'Admin access required')
+    @api.doc(security='Bearer')
+    @jwt_required()
+    def get(self):
+        """Pending, flushed and rejected records of the write-behind queue"""
+        if not get_jwt().get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+        return facade.get_write_behind_stats(), 200
@@ -8,6 +8,7 @@ All business logic is handled by the HBnBFacade.
 
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.pagination import pagination_parser, parse_pagination, page_headers
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 # Define the users namespace for the API
@@ -66,24 +67,22 @@ class UserList(Resource):
             if not claims or not claims.get('is_admin', False):
                 return {'error': 'Admin privileges required to create admin users'}, 403
 
-        # Check if email is already registered
-        existing_user = facade.get_user_by_email(user_data['email'])
-        if existing_user:
-            return {'error': 'Email already registered'}, 400
-
         if 'password' not in user_data or not user_data['password']:
             return {'error': 'Password is required'}, 400
 
-        # Create and return the new user
+        # Create and return the new user; a duplicate email is rejected
+        # by the unique index and reported as 'Email already registered'
         try:
             new_user = facade.create_user(user_data)
         except (TypeError, ValueError) as e:
             return {"error": str(e)}, 400
         return new_user.to_dict(), 201
 
-    # GET /api/v1/users/ : Return all users
+    # GET /api/v1/users/ : Return all users (or one page with ?limit=&cursor=)
+    @api.expect(pagination_parser)
     @api.marshal_list_with(user_output_model)
     @api.response(200, 'List of users')
+    @api.response(400, 'Invalid pagination parameters')
     @api.response(403, 'Admin access required')
     @api.doc(security='Bearer')
     @jwt_required()
@@ -92,15 +91,23 @@ class UserList(Resource):
         Retrieve all registered users (Admin only).
 
         Returns:
-            tuple: List of user data dictionaries and HTTP 200.
+            tuple: List of user data dictionaries and HTTP 200, plus the
+                   X-Next-Cursor header when paginated.
         """
         # Check if current user is admin
         claims = get_jwt()
         if not claims.get('is_admin', False):
             return {'error': 'Admin privileges required'}, 403
 
-        users = facade.get_all_users()
-        return [u.to_dict() for u in users], 200
+        try:
+            limit, cursor = parse_pagination()
+            if limit is None:
+                users = facade.get_all_users()
+                return [u.to_dict() for u in users], 200
+            users, next_cursor = facade.get_users_page(limit, cursor)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return [u.to_dict() for u in users], 200, page_headers(next_cursor)
 
 
 @api.route('/<user_id>')
@@ -164,12 +171,10 @@ class UserResource(Resource):
         if not is_admin and 'is_admin' in user_data:
             return {"error": "Only admins can modify admin status"}, 403
 
-        # If changing email, check for uniqueness
-        if 'email' in user_data:
-            existing_user = facade.get_user_by_email(user_data['email'])
-            if existing_user and existing_user.id != user_id:
-                return {'error': 'Email already in use'}, 400
-
-        # Update user data and return the updated user
-        updated_user = facade.update_user(user_id, user_data)
+        # Update user data and return the updated user; an email owned by
+        # another user is rejected by the unique index
+        try:
+            updated_user = facade.update_user(user_id, user_data)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         return updated_user.to_dict(), 200
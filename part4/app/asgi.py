@@ -0,0 +1,174 @@
+"""
+ASGI application serving the public read endpoints from AsyncHBnBFacade.
+
+The Flask application ties up one worker thread per request. This
+application answers the read-only endpoints, which most clients call,
+from a single event loop instead, so thousands of slow clients do not
+need thousands of threads. Paths, query strings and JSON bodies are the
+same as the Flask API's:
+
+    GET /api/v1/places/                          ?limit=&cursor=&include=
+    GET /api/v1/places/<place_id>
+    GET /api/v1/amenities/                       ?limit=&cursor=
+    GET /api/v1/amenities/<amenity_id>
+    GET /api/v1/reviews/places/<place_id>/reviews ?limit=&cursor=&order=
+
+Other requests get a 404: route them to the Flask application. The
+Flask application built by `create_app` still supplies the configuration
+and extensions.
+
+Usage (with any ASGI server, e.g. uvicorn; DevelopmentConfig):
+    uvicorn --factory app.asgi:create_asgi_app
+"""
+
+import json
+import logging
+import re
+from urllib.parse import parse_qsl
+from app import create_app
+from app.api.v1.pagination import page_headers, parse_pagination
+from app.extensions import async_db
+from app.models.base_model import serialize_row
+from app.services import async_facade
+
+logger = logging.getLogger(__name__)
+
+
+async def list_places(query):
+    limit, cursor = parse_pagination(query)
+    include_description = query.get('include') == 'description'
+    places, next_cursor = await async_facade.get_place_rows(
+        limit, cursor, include_description)
+    result = []
+    for place in places:
+        place_dict = serialize_row(place)
+        place_dict['amenities'] = [serialize_row(a) for a in place['amenities']]
+        result.append(place_dict)
+    return 200, result, page_headers(next_cursor)
+
+
+async def get_place(query, place_id):
+    place = await async_facade.get_place_details(place_id)
+    if not place:
+        return 404, {"error": "Place not found"}, {}
+    result = place.to_dict()
+    result["owner"] = place.owner.to_dict()
+    result["amenities"] = [amenity.to_dict() for amenity in place.amenities]
+    return 200, result, {}
+
+
+async def list_amenities(query):
+    limit, cursor = parse_pagination(query)
+    amenities, next_cursor = await async_facade.get_amenity_rows(limit, cursor)
+    # Pages also carry created_at for the cursor; the API shows id and name
+    amenities = [{'id': row['id'], 'name': row['name']} for row in amenities]
+    return 200, amenities, page_headers(next_cursor)
+
+
+async def get_amenity(query, amenity_id):
+    amenity = await async_facade.get_amenity(amenity_id)
+    if not amenity:
+        return 404, {"error": "Amenity not found"}, {}
+    return 200, amenity.to_dict(), {}
+
+
+async def list_place_reviews(query, place_id):
+    if not await async_facade.place_exists(place_id):
+        return 404, {"error": "Place not found"}, {}
+    limit, cursor = parse_pagination(query)
+    reviews, next_cursor = await async_facade.get_place_reviews_page(
+        place_id, limit, cursor, query.get('order', 'asc'))
+    return 200, [review.to_dict() for review in reviews], page_headers(next_cursor)
+
+
+def _encode(body):
+    return json.dumps(body).encode()
+
+
+# (path pattern, handler); the groups of the pattern are passed to the handler
+ROUTES = [
+    (re.compile(r'/api/v1/places/'), list_places),
+    (re.compile(r'/api/v1/places/([^/]+)'), get_place),
+    (re.compile(r'/api/v1/amenities/'), list_amenities),
+    (re.compile(r'/api/v1/amenities/([^/]+)'), get_amenity),
+    (re.compile(r'/api/v1/reviews/places/([^/]+)/reviews'), list_place_reviews),
+]
+
+
+class AsyncAPI:
+    """
+    ASGI callable dispatching GET requests to the async handlers above.
+
+    Each request uses the session of its own asyncio task, closed once
+    the response is built.
+
+    Attributes:
+        flask_app (Flask): The application supplying the configuration.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        status, payload, headers = await self._respond(scope)
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(payload)).encode())]
+                       + [(name.lower().encode(), value.encode())
+                          for name, value in headers.items()],
+        })
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _respond(self, scope):
+        """Run the handler of a request; return (status, JSON bytes, headers)."""
+        for pattern, handler in ROUTES:
+            match = pattern.fullmatch(scope['path'])
+            if match:
+                break
+        else:
+            return 404, _encode({"error": "Not found"}), {}
+        if scope['method'] != 'GET':
+            return 405, _encode({"error": "Method not allowed"}), {}
+        query = dict(parse_qsl(scope['query_string'].decode()))
+        try:
+            status, body, headers = await handler(query, *match.groups())
+            # Encoded here so that a body that cannot be serialized is a 500
+            return status, _encode(body), headers
+        except ValueError as e:
+            return 400, _encode({"error": str(e)}), {}
+        except Exception:
+            logger.exception("Error serving %s", scope['path'])
+            return 500, _encode({"error": "An unexpected error occurred"}), {}
+        finally:
+            await async_db.remove()
+
+    async def _lifespan(self, receive, send):
+        """Close the pooled connections when the server shuts down."""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_db.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_class="config.DevelopmentConfig"):
+    """
+    Build the ASGI application on top of a configured Flask application.
+
+    Args:
+        config_class (str or type): Configuration passed to `create_app`.
+
+    Returns:
+        AsyncAPI: The ASGI callable.
+    """
+    return AsyncAPI(create_app(config_class))
@@ -1,3 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
+from app.persistence.async_db import AsyncDatabase
+from app.persistence.place_columns import PlaceColumns
+from app.persistence.place_knn import PlaceKNN
+from app.persistence.replica import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+async_db = AsyncDatabase()
+place_columns = PlaceColumns()
+place_knn = PlaceKNN()
@@ -3,34 +3,175 @@ Defines the BaseModel class for HBnB, providing core attributes and methods.
 
 BaseModel supplies a unique ID, creation and update timestamps, and
 utility methods for saving, updating attributes, and serializing to dict.
+
+IDs are time-ordered UUIDs (version 7): consecutive inserts land next to
+each other at the end of the primary key and (created_at, id) indexes
+instead of at random positions. They are stored as 16 bytes (UUIDKey),
+less than half of the 36-character text form, which also shrinks every
+foreign key, index and join on them. Python code and the API still see
+the usual UUID strings.
 """
 
+import os
+import threading
+import time
 import uuid
 from datetime import datetime
+from sqlalchemy import LargeBinary
+from sqlalchemy.orm import declared_attr
+from sqlalchemy.types import TypeDecorator
 from app.extensions import db
 
+# Last millisecond and counter used by uuid7(), guarded by the lock
+_uuid7_lock = threading.Lock()
+_uuid7_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7():
+    """
+    Generate a time-ordered UUID string (version 7, RFC 9562).
+
+    The first 48 bits hold the Unix time in milliseconds. The next 12 bits
+    count the IDs generated in the same millisecond, starting at a random
+    value, so the IDs of a process are strictly increasing; the last 62
+    bits are random.
+
+    Returns:
+        str: The UUID in its 36-character form.
+    """
+    global _uuid7_ms, _uuid7_counter
+    with _uuid7_lock:
+        now = time.time_ns() // 1_000_000
+        if now > _uuid7_ms:
+            # Leave room for at least 2048 more IDs in this millisecond
+            _uuid7_ms, _uuid7_counter = now, int.from_bytes(os.urandom(2), 'big') >> 5
+        else:
+            # Same millisecond, or the clock went back: keep increasing
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                _uuid7_ms, _uuid7_counter = _uuid7_ms + 1, 0
+        ms, counter = _uuid7_ms, _uuid7_counter
+    random_bits = int.from_bytes(os.urandom(8), 'big') >> 2
+    value = (ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | random_bits
+    return str(uuid.UUID(int=value))
+
+
+def uuid_bytes(value):
+    """
+    Stored form of an ID: the 16 bytes of a UUID string.
+
+    Other strings (e.g. a mistyped ID in a URL) become their UTF-8 bytes,
+    which match no stored UUID.
+
+    Args:
+        value (str): The ID.
+
+    Returns:
+        bytes: The stored value; non-strings are returned unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+    if len(value) == 36 and value[8] == value[13] == value[18] == value[23] == '-':
+        try:
+            raw = bytes.fromhex(value.replace('-', ''))
+        except ValueError:
+            raw = b''
+        if len(raw) == 16:
+            return raw
+    return value.encode('utf-8')
+
+
+def uuid_string(value):
+    """
+    ID read back from the database: the inverse of `uuid_bytes`.
+
+    Text values, left by a database not migrated yet, are returned as is.
+
+    Args:
+        value (bytes or str): The stored value.
+
+    Returns:
+        str: The ID.
+    """
+    if isinstance(value, memoryview):
+        value = value.tobytes()
+    if not isinstance(value, bytes):
+        return value
+    if len(value) == 16:
+        digits = value.hex()
+        return f'{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}'
+    return value.decode('utf-8')
+
+
+class UUIDKey(TypeDecorator):
+    """
+    UUID string in Python, stored as its 16 bytes.
+
+    The byte order of a UUID is the order of its lowercase text form, so
+    sorting and keyset pagination on IDs give the same result in SQL and
+    in Python.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return str
+
+    def process_bind_param(self, value, dialect):
+        return uuid_bytes(value)
+
+    def process_result_value(self, value, dialect):
+        return uuid_string(value)
+
+def serialize_row(row):
+    """
+    Make a row dict read with SQLAlchemy Core JSON-serializable.
+
+    Args:
+        row (dict): Column names mapped to values.
+
+    Returns:
+        dict: The same mapping with datetimes as ISO 8601 strings.
+    """
+    return {key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in row.items()}
+
+
 class BaseModel(db.Model):
     """
     Core model class with common attributes and methods.
 
     Attributes:
-        id (str): Unique identifier (UUID4).
+        id (str): Unique, time-ordered identifier (UUIDv7).
         created_at (datetime): Timestamp of creation.
         updated_at (datetime): Timestamp of last update.
     """
     __abstract__ = True  # This ensures SQLAlchemy does not create a table for BaseModel
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDKey, primary_key=True, default=uuid7)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Extra indexes and constraints declared by subclasses
+    _table_args = ()
+
+    @declared_attr
+    def __table_args__(cls):
+        """Index (created_at, id) on every table for keyset pagination."""
+        return (
+            db.Index(f'ix_{cls.__tablename__}_created_at_id', 'created_at', 'id'),
+        ) + tuple(cls._table_args)
+
     def __init__(self):
         """
         Initialize a new BaseModel instance.
 
-        Sets id to a new UUID4 string and timestamps to current datetime.
+        Sets id to a new UUIDv7 string and timestamps to current datetime.
         """
-        self.id = str(uuid.uuid4())
+        self.id = uuid7()
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
 
@@ -5,13 +5,13 @@ A Place represents a rental property and includes details such as title,
 description, price, geographic coordinates, owner, reviews, and amenities.
 """
 
-from app.models.base_model import BaseModel
+from app.models.base_model import BaseModel, UUIDKey
 from app.extensions import db
 
 place_amenity = db.Table(
     'place_amenity',
-    db.Column('place_id', db.String(36), db.ForeignKey('places.id'), nullable=False),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), nullable=False)
+    db.Column('place_id', UUIDKey, db.ForeignKey('places.id'), primary_key=True),
+    db.Column('amenity_id', UUIDKey, db.ForeignKey('amenities.id'), primary_key=True)
 )
 class Place(BaseModel):
     """
@@ -31,6 +31,11 @@ class Place(BaseModel):
         amenities (list): List of Amenity instances.
     """
     __tablename__ = 'places'
+    # Price searches page on (price, id) straight from the index
+    _table_args = (
+        db.Index('ix_places_updated_at', 'updated_at'),
+        db.Index('ix_places_price_id', 'price', 'id'),
+    )
 
     title = db.Column(db.String(126), nullable=False)
     description = db.Column(db.String(256), nullable=False)
@@ -38,7 +43,7 @@ class Place(BaseModel):
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
 
-    owner_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    owner_id = db.Column(UUIDKey, db.ForeignKey('users.id'), nullable=False, index=True)
 
     owner = db.relationship('User', backref='user_places')
     amenities = db.relationship('Amenity', secondary=place_amenity, backref='amenity_places')
@@ -133,7 +138,7 @@ class Place(BaseModel):
             "owner_id": self.owner_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "amenities": [amenity.to_dict() for amenity in self.amenities] if hasattr(self, 'amenities') else []
+            "amenities": [amenity.to_dict() for amenity in self.amenities]
         }
 
 
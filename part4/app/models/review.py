@@ -5,7 +5,7 @@ A Review captures user feedback on a Place, including text, rating,
 and links to the Place and User instances.
 """
 
-from app.models.base_model import BaseModel
+from app.models.base_model import BaseModel, UUIDKey
 from sqlalchemy.orm import validates
 from app.extensions import db
 
@@ -24,12 +24,18 @@ class Review(BaseModel):
         user (User): The User instance who wrote the review.
     """
     __tablename__ = 'reviews'
+    # One review per user and place; the index serves "reviews of a
+    # place" ordered by date without a sort step
+    _table_args = (
+        db.UniqueConstraint('user_id', 'place_id', name='unique_review'),
+        db.Index('ix_reviews_place_id_created_at', 'place_id', 'created_at', 'id'),
+    )
 
     text = db.Column(db.String(256), nullable=False)
     rating = db.Column(db.Integer, nullable=False)
 
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False)
+    user_id = db.Column(UUIDKey, db.ForeignKey('users.id'), nullable=False)
+    place_id = db.Column(UUIDKey, db.ForeignKey('places.id'), nullable=False)
 
     user = db.relationship('User', backref='user_reviews')
     place = db.relationship('Place', backref='place_reviews')
@@ -96,3 +96,7 @@ class User(BaseModel):
         """Verifies if the provided password matches the hashed password."""
         from app import bcrypt
         return bcrypt.check_password_hash(self.password.encode('utf-8'), password)
+
+
+# Emails are unique regardless of case; also serves get_user_by_email
+db.Index('ux_users_email_lower', db.func.lower(User.email), unique=True)
@@ -1,9 +1,49 @@
+from sqlalchemy import or_, select
+from app.extensions import db
 from app.models.amenity import Amenity
+from app.persistence.replica import reads_from_replica
 from app.persistence.repository import SQLAlchemyRepository
 
 class AmenityRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Amenity)
 
+    @reads_from_replica
     def get_amenity_by_name(self, name):
-        return self.model.query.filter_by(name=name).first()
+        return self._query().filter_by(name=name).first()
+
+    @reads_from_replica
+    def get_amenities_by_names(self, names):
+        names = list(set(names))
+        amenities = {}
+        for start in range(0, len(names), self.IN_CHUNK_SIZE):
+            chunk = names[start:start + self.IN_CHUNK_SIZE]
+            for amenity in self._query().filter(self.model.name.in_(chunk)):
+                amenities.setdefault(amenity.name, amenity)
+        return amenities
+
+    @reads_from_replica
+    def resolve_ids(self, identifiers):
+        """
+        Map amenity IDs or names to the ID of the amenity they designate.
+
+        A value is taken as an ID first, then as a name.
+
+        Args:
+            identifiers (iterable): Amenity IDs and/or names.
+
+        Returns:
+            dict: Each value that designates an amenity mapped to its ID.
+        """
+        identifiers = list(set(identifiers))
+        table = self.model.__table__
+        by_id, by_name = {}, {}
+        for start in range(0, len(identifiers), self.IN_CHUNK_SIZE):
+            chunk = identifiers[start:start + self.IN_CHUNK_SIZE]
+            stmt = select(table.c.id, table.c.name).where(
+                or_(table.c.id.in_(chunk), table.c.name.in_(chunk)))
+            for amenity_id, name in db.session.execute(stmt):
+                by_id[amenity_id] = amenity_id
+                by_name[name] = amenity_id
+        return {value: by_id.get(value, by_name.get(value))
+                for value in identifiers if value in by_id or value in by_name}
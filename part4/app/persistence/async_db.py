@@ -0,0 +1,207 @@
+"""
+Asyncio database access for the HBnB application.
+
+`AsyncDatabase` builds an AsyncEngine (aiosqlite for SQLite) from the
+Flask configuration and hands out one AsyncSession per asyncio task, so
+an async server can serve many concurrent requests from a single thread.
+The URL and engine are resolved on first use, so applications that
+never touch the async layer need neither aiosqlite nor a database with
+an async driver.
+
+`AsyncUnitOfWork` is the asyncio counterpart of
+`app.persistence.unit_of_work.UnitOfWork`: the writes made inside it are
+committed once by the outermost unit, or rolled back on error.
+
+Usage:
+    async with AsyncUnitOfWork():
+        await user_repo.add(user)
+        await place_repo.add(place)   # both rows committed together
+    ...
+    await async_db.remove()           # when the request/task ends
+"""
+
+import asyncio
+from contextvars import ContextVar
+from functools import wraps
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (async_scoped_session, async_sessionmaker,
+                                    create_async_engine)
+
+# Async driver used for each synchronous backend
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite'
+}
+
+# Nesting depth of AsyncUnitOfWork in the current task
+_uow_depth = ContextVar('async_uow_depth', default=0)
+_uow_rollback_only = ContextVar('async_uow_rollback_only', default=False)
+
+
+def async_url(url):
+    """
+    Turn a synchronous database URL into its asyncio driver equivalent.
+
+    Args:
+        url (str or URL): e.g. 'sqlite:///hbnb.db'.
+
+    Returns:
+        URL: e.g. 'sqlite+aiosqlite:///hbnb.db'.
+
+    Raises:
+        ValueError: If no async driver is known for the backend.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+
+class AsyncDatabase:
+    """
+    Lazily created AsyncEngine plus task-scoped AsyncSessions.
+
+    Attributes:
+        session (async_scoped_session): Session of the current asyncio task.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._url = None
+        self._engine_options = {}
+        self._pragmas = {}
+        self._engine = None
+        self.session = None
+
+    def init_app(self, app):
+        """
+        Read the database settings of a configured application.
+
+        Args:
+            app (Flask): The configured application.
+        """
+        self._app = app
+        self._url = None
+        self._engine_options = app.config.get('ASYNC_ENGINE_OPTIONS') or {}
+        self._pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+        self._engine = None
+        self.session = async_scoped_session(
+            async_sessionmaker(expire_on_commit=False),
+            scopefunc=asyncio.current_task)
+
+    @property
+    def url(self):
+        """
+        The async database URL, resolved on first access.
+
+        ASYNC_DATABASE_URI wins; otherwise the URL of the app's primary
+        engine is reused with its async driver, so relative SQLite paths
+        resolve to the same file as Flask-SQLAlchemy's.
+
+        Raises:
+            RuntimeError: If `init_app` was not called.
+            ValueError: If no async driver is known for the backend.
+        """
+        if self._app is None:
+            raise RuntimeError("AsyncDatabase.init_app() was not called")
+        if self._url is None:
+            uri = self._app.config.get('ASYNC_DATABASE_URI')
+            if uri is None:
+                from app.extensions import db
+                with self._app.app_context():
+                    uri = db.engine.url
+            self._url = async_url(uri)
+        return self._url
+
+    @property
+    def engine(self):
+        """The AsyncEngine, created on first access."""
+        if self._engine is None:
+            from app.persistence.sqlite import apply_pragmas
+            self._engine = create_async_engine(self.url, **self._engine_options)
+            apply_pragmas(self._engine.sync_engine, self._pragmas)
+            self.session.session_factory.configure(bind=self._engine)
+        return self._engine
+
+    def get_session(self):
+        """
+        Return the AsyncSession of the current task.
+
+        Returns:
+            AsyncSession: Created on the task's first call.
+        """
+        self.engine  # binds the session factory on first use
+        return self.session()
+
+    async def remove(self):
+        """Close the current task's session and release its connection."""
+        if self.session is not None:
+            await self.session.remove()
+
+    async def dispose(self):
+        """Close every pooled connection of the engine."""
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+
+class AsyncUnitOfWork:
+    """
+    Async context manager (and coroutine decorator) for one transaction.
+
+    The nesting depth is kept in a context variable, so concurrent tasks
+    each have their own unit of work.
+    """
+
+    async def __aenter__(self):
+        _uow_depth.set(_uow_depth.get() + 1)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        depth = _uow_depth.get() - 1
+        _uow_depth.set(depth)
+        if exc_type is not None:
+            _uow_rollback_only.set(True)
+        if depth == 0:
+            await self.finish(success=exc_type is None)
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with self:
+                return await func(*args, **kwargs)
+        return wrapper
+
+    async def finish(self, success=True):
+        """
+        End the current transaction: commit on success, roll back otherwise.
+
+        Args:
+            success (bool): False forces a rollback.
+
+        Raises:
+            Exception: Whatever the commit raised, after rolling back.
+        """
+        from app.extensions import async_db
+        session = async_db.get_session()
+        rollback_only = _uow_rollback_only.get()
+        _uow_rollback_only.set(False)
+        if not success or rollback_only:
+            await session.rollback()
+            return
+        try:
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+def in_async_unit_of_work():
+    """
+    Tell whether an AsyncUnitOfWork is open in the current task.
+
+    Returns:
+        bool: True inside a unit of work.
+    """
+    return _uow_depth.get() > 0
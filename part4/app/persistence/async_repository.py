@@ -0,0 +1,286 @@
+"""
+Asyncio repositories mirroring the SQLAlchemy ones.
+
+AsyncSQLAlchemyRepository offers the Repository operations as coroutines
+on the current task's AsyncSession (see app.persistence.async_db). Lazy
+loading is not possible under asyncio, so every relationship a caller
+needs must be eager-loaded through `load` or `default_load`; the others
+raise on access instead of blocking the event loop.
+
+Pagination uses the same `(created_at, id)` keyset and cursors as
+SQLAlchemyRepository, so cursors work with both implementations.
+"""
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.orm import raiseload
+from app.extensions import async_db
+from app.models.amenity import Amenity
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.async_db import AsyncUnitOfWork, in_async_unit_of_work
+from app.persistence.repository import SQLAlchemyRepository
+
+
+async def commit():
+    """Commit the current task's session unless a unit of work is open."""
+    if not in_async_unit_of_work():
+        await async_db.get_session().commit()
+
+
+class AsyncSQLAlchemyRepository:
+    """
+    Coroutine version of SQLAlchemyRepository for one model.
+
+    Attributes:
+        model: The mapped model class.
+    """
+
+    IN_CHUNK_SIZE = SQLAlchemyRepository.IN_CHUNK_SIZE
+    LOADERS = SQLAlchemyRepository.LOADERS
+
+    # {relationship: strategy} used by get_all/get_page when load is None
+    default_load = {}
+
+    # Large columns that get_all_rows leaves out unless asked for
+    deferred_columns = ()
+
+    # Keyset ordering shared with the synchronous repository
+    _keyset = SQLAlchemyRepository._keyset
+    _split_page = staticmethod(SQLAlchemyRepository._split_page)
+
+    def __init__(self, model):
+        self.model = model
+
+    @property
+    def session(self):
+        """AsyncSession of the current task."""
+        return async_db.get_session()
+
+    def _options(self, load=None):
+        """Loader options for a {relationship: strategy} map; others raise."""
+        options = []
+        for name, strategy in (load or {}).items():
+            if strategy not in self.LOADERS:
+                raise ValueError(f"Unknown loading strategy: {strategy}")
+            options.append(self.LOADERS[strategy](getattr(self.model, name)))
+        options.append(raiseload('*'))
+        return options
+
+    def _select(self, load=None):
+        """SELECT of the model with the loader options of `load`."""
+        return select(self.model).options(*self._options(load))
+
+    async def _first(self, stmt):
+        return (await self.session.scalars(stmt.limit(1))).first()
+
+    async def add(self, obj):
+        self.session.add(obj)
+        await commit()
+
+    async def add_many(self, objs):
+        """Insert all objects in one transaction; the ORM batches the INSERTs."""
+        async with AsyncUnitOfWork():
+            self.session.add_all(objs)
+            # Surface constraint violations here rather than at commit
+            await self.session.flush()
+
+    async def _get_many(self, obj_ids, load=None):
+        """Load objects by ID with one IN query per chunk of IDs."""
+        obj_ids = list(obj_ids)
+        objs = []
+        for start in range(0, len(obj_ids), self.IN_CHUNK_SIZE):
+            chunk = obj_ids[start:start + self.IN_CHUNK_SIZE]
+            stmt = self._select(load).where(self.model.id.in_(chunk))
+            objs.extend((await self.session.scalars(stmt)).all())
+        return objs
+
+    async def get(self, obj_id, load=None):
+        if obj_id is None:
+            return None
+        obj = await self.session.get(self.model, obj_id, options=self._options(load))
+        if obj is not None and load:
+            # An identity-map hit skips the loader options
+            unloaded = [name for name in load if name in inspect(obj).unloaded]
+            if unloaded:
+                await self.session.refresh(obj, attribute_names=unloaded)
+        return obj
+
+    async def exists(self, obj_id):
+        """Check for an object with one SELECT of its id."""
+        table = self.model.__table__
+        stmt = select(table.c.id).where(table.c.id == obj_id).limit(1)
+        return (await self.session.execute(stmt)).first() is not None
+
+    async def get_all(self, load=None):
+        stmt = self._select(self.default_load if load is None else load)
+        return (await self.session.scalars(stmt)).all()
+
+    async def get_page(self, limit, cursor=None, load=None):
+        stmt = self._select(self.default_load if load is None else load)
+        return await self._keyset_page(stmt, limit, cursor)
+
+    async def _keyset_page(self, stmt, limit, cursor=None, descending=False):
+        """Keyset page on (created_at, id); one extra row detects the end."""
+        stmt = self._keyset(stmt, cursor, descending)
+        if limit is None:
+            return (await self.session.scalars(stmt)).all(), None
+        rows = (await self.session.scalars(stmt.limit(limit + 1))).all()
+        return self._split_page(rows, limit, lambda obj: (obj.created_at, obj.id))
+
+    async def get_all_rows(self, columns=None, limit=None, cursor=None):
+        """
+        Read rows as plain dicts with a Core SELECT, without ORM objects.
+
+        Args:
+            columns (iterable, optional): Column names to select; defaults
+                to every column except those in `deferred_columns`.
+            limit (int, optional): Page size; None returns every row.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of dicts, next cursor or None).
+
+        Raises:
+            ValueError: If a column does not exist or the cursor is invalid.
+        """
+        table = self.model.__table__
+        if columns is None:
+            columns = [column.name for column in table.columns
+                       if column.name not in self.deferred_columns]
+        columns = list(columns)
+        paginated = limit is not None or cursor
+        if paginated:
+            columns += [name for name in ('created_at', 'id') if name not in columns]
+        unknown = [name for name in columns if name not in table.c]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+
+        stmt = select(*[table.c[name] for name in columns])
+        if paginated:
+            stmt = self._keyset(stmt, cursor)
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        rows = [dict(row) for row in (await self.session.execute(stmt)).mappings()]
+        if limit is None:
+            return rows, None
+        return self._split_page(rows, limit, lambda row: (row['created_at'], row['id']))
+
+    async def update(self, obj_id, data):
+        obj = await self.get(obj_id)
+        if obj:
+            for key, value in data.items():
+                setattr(obj, key, value)
+            await commit()
+
+    async def update_many(self, updates):
+        async with AsyncUnitOfWork():
+            objs = await self._get_many(updates)
+            for obj in objs:
+                for key, value in updates[obj.id].items():
+                    setattr(obj, key, value)
+        return objs
+
+    async def delete(self, obj_id):
+        obj = await self.get(obj_id)
+        if obj:
+            await self.session.delete(obj)
+            await commit()
+
+    async def delete_many(self, obj_ids):
+        async with AsyncUnitOfWork():
+            objs = await self._get_many(set(obj_ids))
+            for obj in objs:
+                await self.session.delete(obj)
+        return len(objs)
+
+    async def get_by_attribute(self, attr_name, attr_value):
+        return await self._first(
+            self._select().where(getattr(self.model, attr_name) == attr_value))
+
+
+class AsyncUserRepository(AsyncSQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(User)
+
+    async def get_user_by_email(self, email):
+        # Case-insensitive, served by the unique lower(email) index
+        return await self._first(self._select().where(
+            func.lower(self.model.email) == email.lower()))
+
+
+class AsyncAmenityRepository(AsyncSQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(Amenity)
+
+    async def get_amenities_by_names(self, names):
+        names = list(set(names))
+        amenities = {}
+        for start in range(0, len(names), self.IN_CHUNK_SIZE):
+            chunk = names[start:start + self.IN_CHUNK_SIZE]
+            stmt = self._select().where(self.model.name.in_(chunk))
+            for amenity in await self.session.scalars(stmt):
+                amenities.setdefault(amenity.name, amenity)
+        return amenities
+
+
+class AsyncPlaceRepository(AsyncSQLAlchemyRepository):
+    default_load = {'amenities': 'selectin'}
+    detail_load = {'owner': 'joined', 'amenities': 'selectin'}
+    deferred_columns = ('description',)
+
+    def __init__(self):
+        super().__init__(Place)
+
+    async def get_amenity_rows(self, place_ids):
+        """
+        Amenity rows of several places with one Core query per chunk of ids.
+
+        Args:
+            place_ids (iterable): IDs of the places.
+
+        Returns:
+            dict: Place ID mapped to a list of amenity row dicts.
+        """
+        place_ids = list(place_ids)
+        amenities = Amenity.__table__
+        result = {place_id: [] for place_id in place_ids}
+        for start in range(0, len(place_ids), self.IN_CHUNK_SIZE):
+            chunk = place_ids[start:start + self.IN_CHUNK_SIZE]
+            stmt = select(place_amenity.c.place_id, *amenities.c) \
+                .join(amenities, amenities.c.id == place_amenity.c.amenity_id) \
+                .where(place_amenity.c.place_id.in_(chunk))
+            for row in (await self.session.execute(stmt)).mappings():
+                row = dict(row)
+                result[row.pop('place_id')].append(row)
+        return result
+
+
+class AsyncReviewRepository(AsyncSQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(Review)
+
+    async def get_by_user_and_place(self, user_id, place_id):
+        return await self._first(self._select().filter_by(
+            user_id=user_id, place_id=place_id))
+
+    async def get_by_place(self, place_id, limit=None, cursor=None, order='asc'):
+        """
+        Reviews of one place, served by the (place_id, created_at, id) index.
+
+        Args:
+            place_id (str): ID of the reviewed place.
+            limit (int, optional): Page size; None returns every review.
+            cursor (str, optional): Cursor returned with the previous page.
+            order (str): 'asc' (oldest first) or 'desc' (newest first).
+
+        Returns:
+            tuple: (list of Review, next cursor or None).
+
+        Raises:
+            ValueError: If order or cursor is invalid.
+        """
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        stmt = self._select().where(self.model.place_id == place_id)
+        return await self._keyset_page(stmt, limit, cursor, descending=order == 'desc')
@@ -0,0 +1,117 @@
+"""
+Bounded LRU + TTL cache used by SQLAlchemyRepository for entity reads.
+
+The cache stores plain snapshots (dicts of column values), never ORM
+instances, so entries can be shared safely between sessions and threads.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class EntityCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a fixed TTL.
+
+    Attributes:
+        capacity (int): Maximum number of entries kept.
+        ttl (float): Lifetime of an entry in seconds.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found nothing or an expired entry.
+        evictions (int): Entries dropped to stay within capacity.
+    """
+
+    def __init__(self, capacity, ttl, clock=time.monotonic):
+        """
+        Initialize an empty cache.
+
+        Args:
+            capacity (int): Maximum number of entries (must be positive).
+            ttl (float): Entry lifetime in seconds.
+            clock (callable, optional): Monotonic time source.
+
+        Raises:
+            ValueError: If capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError("Cache capacity must be a positive integer")
+        self.capacity = capacity
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Return the value cached under key, or None.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The cached value, or None if absent or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """
+        Cache a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key.
+            value: Value to store (should not be mutated afterwards).
+        """
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """
+        Drop the entry cached under key, if any.
+
+        Args:
+            key: Cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Report the cache usage statistics.
+
+        Returns:
+            dict: size, capacity, ttl, hits, misses, evictions and hit_rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,404 @@
+"""
+Write-behind repository serving every read from memory.
+
+CachedRepository keeps all rows of its table in memory, loaded from the
+database on first use, and answers reads from there. Writes update the
+memory and return once a WriteBehindQueue has journaled them; the queue
+applies them to the database in the background. The wrapped
+SQLAlchemyRepository supplies the model and stays available as `backend`.
+
+Reads return detached instances rebuilt from the stored rows: their
+columns are set but their relationships are not loaded, and changing
+them has no effect. Changes must go through `update` and `delete`.
+
+The unique and NOT NULL constraints of the table are checked in memory
+before a write is queued. A violation raises IntegrityError, like a
+flush would. A write the database still rejects is undone in memory
+once the queue gives up on it: the row is read back from the database.
+
+Usage:
+    queue = WriteBehindQueue(directory, db.engine, [Review.__table__])
+    reviews = CachedRepository(ReviewRepository(), queue.recover().start())
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from sqlalchemy import UniqueConstraint, select
+from sqlalchemy.exc import IntegrityError
+from app.persistence.repository import (MULTIPLE, Repository, SQLAlchemyRepository,
+                                        decode_cursor, filter_ids, filter_matches)
+from app.persistence.rows import (detached_instance, object_row, release,
+                                  row_position, updated_row, validated_values)
+from app.persistence.write_behind import PUT
+
+
+class CachedRepository(Repository):
+    """
+    In-memory rows of one table, persisted through a write-behind queue.
+
+    Attributes:
+        backend (SQLAlchemyRepository): Repository of the same model.
+        model (type): The mapped model class.
+        queue (WriteBehindQueue): Queue persisting the writes.
+        group_by (tuple): Columns whose values get an ordered index of
+            their rows (see `_group_page`).
+    """
+
+    group_by = ()
+
+    def __init__(self, backend, queue):
+        self.backend = backend
+        self.model = backend.model
+        self.table = self.model.__table__
+        self.queue = queue
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._rows = {}
+        # (created_at, id) of every row, sorted
+        self._order = []
+        self._unique = {columns: {} for columns in self._unique_columns()}
+        self._groups = {column: {} for column in self.group_by}
+        queue.on_reject(self._restore)
+
+    @property
+    def cache(self):
+        """No entity cache: every read is served from memory."""
+        return None
+
+    def _unique_columns(self):
+        """Column name tuples of the unique constraints, primary key aside."""
+        result = [(column.name,) for column in self.table.columns
+                  if column.unique and not column.primary_key]
+        result += [tuple(column.name for column in constraint.columns)
+                   for constraint in self.table.constraints
+                   if isinstance(constraint, UniqueConstraint)]
+        return result
+
+    def _load(self):
+        """Read the table once, then lay the writes not flushed yet on top."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with self.queue.paused():
+                with self.queue.engine.connect() as connection:
+                    for row in connection.execute(select(self.table)).mappings():
+                        self._store(dict(row))
+                for record in self.queue.pending(self.table):
+                    if record.op == PUT:
+                        self._store(record.row)
+                    else:
+                        self._discard(record.id)
+            self._loaded = True
+
+    def _restore(self, record):
+        """
+        Reset the row of a rejected record to the database row with the
+        other writes of it still queued laid on top, as `_load` would.
+
+        Runs on the flusher thread during the flush, so the database and
+        the queue cannot change meanwhile. Before the first `_load` there
+        is nothing to reset (and `_load` may be waiting for the flush).
+        """
+        if record.table is not self.table or not self._loaded:
+            return
+        with self._lock:
+            with self.queue.engine.connect() as connection:
+                row = connection.execute(select(self.table).where(
+                    self.table.c.id == record.id)).mappings().first()
+            self._discard(record.id)
+            if row is not None:
+                self._store(dict(row))
+            for pending in self.queue.pending(self.table):
+                if pending.id != record.id or pending is record:
+                    continue
+                if pending.op == PUT:
+                    self._store(pending.row)
+                else:
+                    self._discard(pending.id)
+
+    def _store(self, row):
+        self._discard(row['id'])
+        self._rows[row['id']] = row
+        insort(self._order, row_position(row))
+        for columns, index in self._unique.items():
+            index[tuple(row[name] for name in columns)] = row['id']
+        for column, groups in self._groups.items():
+            insort(groups.setdefault(row[column], []), row_position(row))
+
+    def _discard(self, obj_id):
+        row = self._rows.pop(obj_id, None)
+        if row is None:
+            return None
+        position = row_position(row)
+        del self._order[bisect_left(self._order, position)]
+        for columns, index in self._unique.items():
+            index.pop(tuple(row[name] for name in columns), None)
+        for column, groups in self._groups.items():
+            group = groups[row[column]]
+            del group[bisect_left(group, position)]
+            if not group:
+                del groups[row[column]]
+        return row
+
+    def _check(self, row, batch=None):
+        """
+        Enforce the NOT NULL and unique constraints on a row about to be stored.
+
+        Args:
+            row (dict): The new row.
+            batch (dict, optional): Unique keys already claimed by the
+                other rows of the same add_many call.
+
+        Raises:
+            IntegrityError: If a constraint would be violated.
+        """
+        for column in self.table.columns:
+            if row.get(column.name) is None and not column.nullable:
+                raise self._violation(f"NOT NULL constraint failed: "
+                                      f"{self.table.name}.{column.name}", row)
+        for columns, index in self._unique.items():
+            key = tuple(row[name] for name in columns)
+            if None in key:
+                continue
+            owner = index.get(key)
+            if batch is not None and owner in (None, row['id']):
+                owner = batch.setdefault((columns, key), row['id'])
+            if owner not in (None, row['id']):
+                names = ', '.join(f"{self.table.name}.{name}" for name in columns)
+                raise self._violation(f"UNIQUE constraint failed: {names}", row)
+
+    def _violation(self, message, row):
+        return IntegrityError(f"write-behind {self.table.name}", row, Exception(message))
+
+    def _page(self, positions, limit, cursor=None, descending=False):
+        """
+        Keyset page over a sorted list of (created_at, id) positions.
+
+        Returns:
+            tuple: (list of row dicts, next cursor or None).
+        """
+        if descending:
+            end = bisect_left(positions, decode_cursor(cursor)) if cursor else len(positions)
+            start = 0 if limit is None else max(0, end - limit - 1)
+            selected = positions[start:end][::-1]
+        else:
+            start = bisect_right(positions, decode_cursor(cursor)) if cursor else 0
+            end = None if limit is None else start + limit + 1
+            selected = positions[start:end]
+        rows = [self._rows[obj_id] for _, obj_id in selected]
+        if limit is None:
+            return rows, None
+        return SQLAlchemyRepository._split_page(rows, limit, row_position)
+
+    def _group_page(self, column, value, limit=None, cursor=None, descending=False):
+        """
+        Page of the objects whose `column` (listed in `group_by`) equals `value`.
+
+        Returns:
+            tuple: (list of objects, next cursor or None).
+        """
+        self._load()
+        with self._lock:
+            positions = self._groups[column].get(value, [])
+            rows, next_cursor = self._page(positions, limit, cursor, descending)
+        return [detached_instance(self.model, row) for row in rows], next_cursor
+
+    def _get_unique(self, columns, values):
+        """Object whose unique `columns` hold `values`, or None."""
+        self._load()
+        with self._lock:
+            obj_id = self._unique[columns].get(tuple(values))
+            row = self._rows.get(obj_id)
+        return detached_instance(self.model, row) if row is not None else None
+
+    def add(self, obj):
+        self._load()
+        with self._lock:
+            row = object_row(obj)
+            self._check(row)
+            self._store(row)
+            self.queue.put(self.table, row)
+        release(obj, row)
+
+    def add_many(self, objs):
+        """Store every object, or none if one of them violates a constraint."""
+        self._load()
+        with self._lock:
+            rows = [object_row(obj) for obj in objs]
+            claimed = {}
+            for row in rows:
+                self._check(row, claimed)
+            for row in rows:
+                self._store(row)
+                self.queue.put(self.table, row)
+        for obj, row in zip(objs, rows):
+            release(obj, row)
+
+    def get(self, obj_id, load=None):
+        """Retrieve an object by ID; `load` is accepted but ignored."""
+        self._load()
+        row = self._rows.get(obj_id)
+        return detached_instance(self.model, row) if row is not None else None
+
+    def get_all(self, load=None):
+        self._load()
+        with self._lock:
+            rows = [self._rows[obj_id] for _, obj_id in self._order]
+        return [detached_instance(self.model, row) for row in rows]
+
+    def get_page(self, limit, cursor=None, load=None):
+        self._load()
+        with self._lock:
+            rows, next_cursor = self._page(self._order, limit, cursor)
+        return [detached_instance(self.model, row) for row in rows], next_cursor
+
+    def get_all_rows(self, columns=None, limit=None, cursor=None):
+        """
+        Read rows as plain dicts, like SQLAlchemyRepository.get_all_rows.
+
+        Raises:
+            ValueError: If a column does not exist or the cursor is invalid.
+        """
+        if columns is None:
+            columns = [column.name for column in self.table.columns
+                       if column.name not in self.backend.deferred_columns]
+        columns = list(columns)
+        unknown = [name for name in columns if name not in self.table.c]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+        self._load()
+        with self._lock:
+            rows, next_cursor = self._page(self._order, limit, cursor)
+        return [{name: row[name] for name in columns} for row in rows], next_cursor
+
+    def invalidate(self, obj_id):
+        """Nothing to drop: there is no entity cache in front of memory."""
+
+    def update(self, obj_id, data):
+        """
+        Update an object and queue its new row.
+
+        Raises:
+            ValueError: If a model validator rejects a value.
+            IntegrityError: If the new values violate a constraint.
+        """
+        self._load()
+        with self._lock:
+            row = self._rows.get(obj_id)
+            if row is None:
+                return
+            new_row = updated_row(self.model, row, data)
+            if new_row is None:
+                return
+            self._check(new_row)
+            self._store(new_row)
+            self.queue.put(self.table, new_row)
+
+    def update_many(self, updates):
+        self._load()
+        updated = []
+        for obj_id, data in updates.items():
+            if obj_id in self._rows:
+                self.update(obj_id, data)
+                updated.append(self.get(obj_id))
+        return updated
+
+    def delete(self, obj_id):
+        self._load()
+        with self._lock:
+            if self._discard(obj_id) is not None:
+                self.queue.delete(self.table, obj_id)
+
+    def delete_many(self, obj_ids):
+        self._load()
+        deleted = 0
+        with self._lock:
+            for obj_id in set(obj_ids):
+                if self._discard(obj_id) is not None:
+                    self.queue.delete(self.table, obj_id)
+                    deleted += 1
+        return deleted
+
+    def get_by_attribute(self, attr_name, attr_value):
+        if (attr_name,) in self._unique:
+            return self._get_unique((attr_name,), (attr_value,))
+        self._load()
+        with self._lock:
+            row = next((row for row in self._rows.values()
+                        if row.get(attr_name) == attr_value), None)
+        return detached_instance(self.model, row) if row is not None else None
+
+    def _matching(self, filters):
+        """
+        IDs of the rows matching a filter, read from the indexes when the
+        filter has an `id`, unique key or `group_by` condition.
+
+        Raises:
+            ValueError: If a column does not exist.
+        """
+        filters = filters or {}
+        unknown = [name for name in filters if name not in self.table.c]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+        scalars = {name: value for name, value in filters.items()
+                   if not isinstance(value, MULTIPLE)}
+        ids = filter_ids(filters)
+        if ids is None:
+            for columns, index in self._unique.items():
+                if all(name in scalars for name in columns):
+                    ids = [index.get(tuple(scalars[name] for name in columns))]
+                    break
+        if ids is None:
+            for column, groups in self._groups.items():
+                if column in scalars:
+                    ids = [obj_id for _, obj_id in groups.get(scalars[column], [])]
+                    break
+        if ids is None:
+            ids = self._rows
+        return [obj_id for obj_id in ids
+                if obj_id in self._rows and filter_matches(self._rows[obj_id], filters)]
+
+    def exists(self, obj_id):
+        self._load()
+        return obj_id in self._rows
+
+    def count(self, filters=None):
+        self._load()
+        with self._lock:
+            if not filters:
+                return len(self._rows)
+            return len(self._matching(filters))
+
+    def update_where(self, filters, values):
+        """
+        Update the matching rows and queue each new row.
+
+        Raises:
+            ValueError: If the filter is empty, a column does not exist or
+                a model validator rejects a value.
+            IntegrityError: If new values violate a constraint; the rows
+                updated before the failing one stay updated.
+        """
+        if not filters:
+            raise ValueError("update_where requires a filter")
+        # Reject bad values before the first row is written
+        values = validated_values(self.model, values)
+        self._load()
+        with self._lock:
+            obj_ids = self._matching(filters)
+            for obj_id in obj_ids:
+                self.update(obj_id, values)
+        return len(obj_ids)
+
+    def delete_where(self, filters):
+        if not filters:
+            raise ValueError("delete_where requires a filter")
+        self._load()
+        with self._lock:
+            obj_ids = self._matching(filters)
+            for obj_id in obj_ids:
+                self._discard(obj_id)
+                self.queue.delete(self.table, obj_id)
+        return len(obj_ids)
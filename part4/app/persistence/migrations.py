@@ -0,0 +1,257 @@
+"""
+Versioned schema migrations for the HBnB SQLite database.
+
+Each migration has an increasing version number and is applied in its
+own transaction together with the row recording it in `schema_version`.
+Migrations are idempotent, so they also upgrade databases created by
+`schema.sql` or by an older `db.create_all()`. Migration 1 creates the
+baseline tables, so a fresh database goes through every later migration
+like an existing one does.
+
+Usage:
+    with app.app_context():
+        upgrade()
+"""
+
+import logging
+from sqlalchemy import inspect, text
+from app.extensions import db
+from app.models.base_model import uuid_bytes
+from app.persistence.spatial import rebuild_rtree
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = 'schema_version'
+
+# Secondary indexes, named as SQLAlchemy names the model-declared ones
+INDEXES = [
+    ('ix_users_created_at_id', 'users', 'created_at, id'),
+    ('ix_places_created_at_id', 'places', 'created_at, id'),
+    ('ix_reviews_created_at_id', 'reviews', 'created_at, id'),
+    ('ix_amenities_created_at_id', 'amenities', 'created_at, id'),
+    ('ix_places_owner_id', 'places', 'owner_id'),
+    ('ix_places_price', 'places', 'price'),
+    ('ix_places_updated_at', 'places', 'updated_at'),
+    ('ix_reviews_user_id', 'reviews', 'user_id'),
+    ('ix_reviews_place_id', 'reviews', 'place_id'),
+]
+
+
+# The tables as the first schema.sql created them. Frozen: the models'
+# later changes are made by the migrations after it, never here
+BASELINE_TABLES = [
+    'CREATE TABLE IF NOT EXISTS users ('
+    ' id CHAR(36) PRIMARY KEY NOT NULL,'
+    ' first_name VARCHAR(255) NOT NULL,'
+    ' last_name VARCHAR(255) NOT NULL,'
+    ' email VARCHAR(255) UNIQUE NOT NULL,'
+    ' password VARCHAR(255) NOT NULL,'
+    ' is_admin BOOLEAN DEFAULT FALSE,'
+    ' created_at DATETIME DEFAULT CURRENT_TIMESTAMP,'
+    ' updated_at DATETIME DEFAULT CURRENT_TIMESTAMP)',
+    'CREATE TABLE IF NOT EXISTS places ('
+    ' id CHAR(36) PRIMARY KEY NOT NULL,'
+    ' title VARCHAR(255) NOT NULL,'
+    ' description TEXT,'
+    ' price DECIMAL(10, 2) NOT NULL CHECK(price >= 0),'
+    ' latitude FLOAT NOT NULL,'
+    ' longitude FLOAT NOT NULL,'
+    ' owner_id CHAR(36) NOT NULL,'
+    ' created_at DATETIME DEFAULT CURRENT_TIMESTAMP,'
+    ' updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,'
+    ' FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE)',
+    'CREATE TABLE IF NOT EXISTS reviews ('
+    ' id CHAR(36) PRIMARY KEY NOT NULL,'
+    ' text TEXT NOT NULL,'
+    ' rating INT CHECK (rating BETWEEN 1 AND 5),'
+    ' user_id CHAR(36) NOT NULL,'
+    ' place_id CHAR(36) NOT NULL,'
+    ' created_at DATETIME DEFAULT CURRENT_TIMESTAMP,'
+    ' updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,'
+    ' FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,'
+    ' FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE,'
+    ' CONSTRAINT unique_review UNIQUE (user_id, place_id))',
+    'CREATE TABLE IF NOT EXISTS amenities ('
+    ' id CHAR(36) PRIMARY KEY NOT NULL,'
+    ' name VARCHAR(255) UNIQUE NOT NULL,'
+    ' created_at DATETIME DEFAULT CURRENT_TIMESTAMP,'
+    ' updated_at DATETIME DEFAULT CURRENT_TIMESTAMP)',
+    'CREATE TABLE IF NOT EXISTS place_amenity ('
+    ' place_id CHAR(36) NOT NULL,'
+    ' amenity_id CHAR(36) NOT NULL,'
+    ' created_at DATETIME DEFAULT CURRENT_TIMESTAMP,'
+    ' updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,'
+    ' PRIMARY KEY (place_id, amenity_id),'
+    ' FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE,'
+    ' FOREIGN KEY (amenity_id) REFERENCES amenities(id) ON DELETE CASCADE)',
+]
+
+
+def _create_tables(conn):
+    """Create the baseline tables missing from the database."""
+    for statement in BASELINE_TABLES:
+        conn.execute(text(statement))
+
+
+def _create_indexes(conn):
+    """Create the secondary indexes on databases that predate them."""
+    for name, table, columns in INDEXES:
+        conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})'))
+
+
+def _add_place_amenity_primary_key(conn):
+    """Rebuild place_amenity with a (place_id, amenity_id) primary key."""
+    if inspect(conn).get_pk_constraint('place_amenity')['constrained_columns']:
+        return
+    conn.execute(text(
+        'CREATE TABLE place_amenity_new ('
+        ' place_id VARCHAR(36) NOT NULL REFERENCES places (id),'
+        ' amenity_id VARCHAR(36) NOT NULL REFERENCES amenities (id),'
+        ' PRIMARY KEY (place_id, amenity_id))'))
+    # Duplicate links collapse into one row
+    conn.execute(text(
+        'INSERT OR IGNORE INTO place_amenity_new (place_id, amenity_id) '
+        'SELECT place_id, amenity_id FROM place_amenity'))
+    conn.execute(text('DROP TABLE place_amenity'))
+    conn.execute(text('ALTER TABLE place_amenity_new RENAME TO place_amenity'))
+
+
+def _index_reviews_by_place_and_date(conn):
+    """Replace the single-column place_id index with (place_id, created_at, id)."""
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_reviews_place_id_created_at '
+        'ON reviews (place_id, created_at, id)'))
+    conn.execute(text('DROP INDEX IF EXISTS ix_reviews_place_id'))
+
+
+def _add_unique_review_and_email(conn):
+    """Enforce one review per (user, place) and case-insensitive unique emails."""
+    inspector = inspect(conn)
+    review_keys = [c['column_names'] for c in inspector.get_unique_constraints('reviews')]
+    review_keys += [i['column_names'] for i in inspector.get_indexes('reviews') if i['unique']]
+    if not any(sorted(cols) == ['place_id', 'user_id'] for cols in review_keys):
+        # Keep the oldest review when a user reviewed a place several times
+        conn.execute(text(
+            'DELETE FROM reviews WHERE rowid NOT IN ('
+            ' SELECT MIN(rowid) FROM reviews GROUP BY user_id, place_id)'))
+        conn.execute(text(
+            'CREATE UNIQUE INDEX unique_review ON reviews (user_id, place_id)'))
+    # The unique index starts with user_id, so it replaces ix_reviews_user_id
+    conn.execute(text('DROP INDEX IF EXISTS ix_reviews_user_id'))
+    # Fails if two accounts differ only by case; merge them by hand first
+    conn.execute(text(
+        'CREATE UNIQUE INDEX IF NOT EXISTS ux_users_email_lower ON users (lower(email))'))
+
+
+def _index_places_by_price_and_id(conn):
+    """Replace the single-column price index with (price, id), for search pages."""
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_places_price_id ON places (price, id)'))
+    conn.execute(text('DROP INDEX IF EXISTS ix_places_price'))
+
+
+def _index_place_coordinates(conn):
+    """Create the R*Tree of place coordinates and its triggers, and fill it."""
+    rebuild_rtree(conn)
+
+
+def _key_rtree_by_place_id(conn):
+    """Rebuild the R*Tree keyed through places_rtree_keys instead of places.rowid."""
+    rebuild_rtree(conn)
+
+
+# Columns holding IDs, converted by _store_ids_as_bytes
+KEY_COLUMNS = [
+    ('users', ('id',)),
+    ('amenities', ('id',)),
+    ('places', ('id', 'owner_id')),
+    ('reviews', ('id', 'user_id', 'place_id')),
+    ('place_amenity', ('place_id', 'amenity_id')),
+]
+
+
+def _store_ids_as_bytes(conn):
+    """
+    Rewrite the text UUIDs of every key column as 16-byte values (UUIDKey).
+
+    SQLite keeps blobs as they are in the existing CHAR/VARCHAR columns,
+    so the tables are updated in place; only rows still holding text are
+    rewritten. Foreign keys are checked at commit, once parents and
+    children are all converted.
+    """
+    conn.connection.driver_connection.create_function(
+        'uuid_bytes', 1, uuid_bytes, deterministic=True)
+    conn.execute(text('PRAGMA defer_foreign_keys = ON'))
+    for table, columns in KEY_COLUMNS:
+        assignments = ', '.join(f'{column} = uuid_bytes({column})' for column in columns)
+        text_rows = ' OR '.join(f"typeof({column}) = 'text'" for column in columns)
+        conn.execute(text(f'UPDATE {table} SET {assignments} WHERE {text_rows}'))
+
+
+# (version, description, function applied with an open connection)
+MIGRATIONS = [
+    (1, 'create tables', _create_tables),
+    (2, 'secondary indexes', _create_indexes),
+    (3, 'place_amenity primary key', _add_place_amenity_primary_key),
+    (4, 'reviews (place_id, created_at) index', _index_reviews_by_place_and_date),
+    (5, 'unique reviews and case-insensitive emails', _add_unique_review_and_email),
+    (6, '16-byte UUID keys', _store_ids_as_bytes),
+    (7, 'places (price, id) index', _index_places_by_price_and_id),
+    (8, 'places coordinates R*Tree', _index_place_coordinates),
+    (9, 'R*Tree keyed by place id', _key_rtree_by_place_id),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    """
+    Read the schema version of the database.
+
+    Args:
+        conn (Connection): An open SQLAlchemy connection.
+
+    Returns:
+        int: The last applied migration version, 0 for a fresh database.
+    """
+    if not inspect(conn).has_table(VERSION_TABLE):
+        return 0
+    return conn.execute(text(f'SELECT MAX(version) FROM {VERSION_TABLE}')).scalar() or 0
+
+
+def upgrade(engine=None):
+    """
+    Apply every pending migration, each in its own transaction.
+
+    Returns immediately after one query when the schema is current.
+
+    Args:
+        engine (Engine, optional): Target engine; defaults to `db.engine`.
+
+    Returns:
+        list: Versions applied by this call.
+    """
+    engine = engine or db.engine
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version >= LATEST_VERSION:
+        return []
+
+    applied = []
+    for number, description, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ('
+                ' version INTEGER PRIMARY KEY,'
+                ' description VARCHAR(255) NOT NULL,'
+                ' applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)'))
+            migrate(conn)
+            conn.execute(
+                text(f'INSERT INTO {VERSION_TABLE} (version, description) '
+                     'VALUES (:version, :description)'),
+                {'version': number, 'description': description})
+        logger.info("Applied schema migration %d: %s", number, description)
+        applied.append(number)
+    return applied
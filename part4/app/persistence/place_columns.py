@@ -0,0 +1,362 @@
+"""
+In-process columnar index of places for vectorized filtering.
+
+PlaceColumns keeps the id, owner, price, latitude and longitude of every
+place in parallel NumPy arrays, so price ranges, bounding boxes and owner
+filters are answered with boolean masks over contiguous memory instead of
+a table scan.
+
+The columns are read from the primary database on first use and then
+follow the Place rows written by this process: SQLAlchemy session events
+record the places flushed in a transaction and apply them once it
+commits (they are dropped on rollback). Writes made by other processes
+are picked up by `refresh()`, which runs every
+PLACE_COLUMNS_REFRESH_INTERVAL seconds when that setting is positive.
+
+The loading and commit tracking live in PlaceIndex, shared with the
+nearest-place KD-tree (app.persistence.place_knn).
+
+NumPy is only required when PLACE_COLUMNS is enabled.
+
+Usage:
+    place_columns.query(min_price=50, max_price=120,
+                        bbox=(48.8, 2.2, 48.9, 2.4))   # -> [place ids]
+"""
+
+import threading
+import time
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+try:
+    import numpy as np
+except ImportError:  # optional, see PLACE_COLUMNS
+    np = None
+
+# Rows allocated on the first append; capacity then doubles
+INITIAL_CAPACITY = 1024
+
+# Session.info key of the place rows flushed in the current transaction
+_PENDING = 'place_columns_pending'
+
+# Indexes the committed place writes are applied to (one of each kind
+# per application, normally)
+_instances = []
+
+
+class PlaceIndex:
+    """
+    Base of the in-process place indexes kept in sync on commit.
+
+    The index is loaded from the primary database on first use, then
+    follows the place writes committed by this process, and is reloaded by
+    `refresh()`. Subclasses keep the places in their own structure by
+    implementing `_build(rows)`, `_upsert(place_id, owner_id, price,
+    latitude, longitude)` and `_remove(place_id)`; `_lock` is held around
+    each call.
+
+    Attributes:
+        enabled (bool): Whether init_app activated the index.
+    """
+
+    # Config key enabling the index; the reload period is read from
+    # the same key suffixed with _REFRESH_INTERVAL
+    config_key = None
+
+    def __init__(self):
+        self.enabled = False
+        self._engine = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        # Changes committed while the index is being (re)loaded
+        self._buffer = None
+
+    def init_app(self, app, db):
+        """
+        Enable the index for an application when its config key is set.
+
+        Args:
+            app (Flask): The configured application.
+            db (SQLAlchemy): Extension giving access to the primary engine.
+
+        Raises:
+            RuntimeError: If the index is enabled but NumPy is missing.
+        """
+        self.enabled = bool(app.config.get(self.config_key))
+        if not self.enabled:
+            return
+        if np is None:
+            raise RuntimeError(f"{self.config_key} requires numpy to be installed")
+        with app.app_context():
+            self._engine = db.engine
+        self._loaded = False
+        if self not in _instances:
+            _instances.append(self)
+        interval = app.config.get(f'{self.config_key}_REFRESH_INTERVAL', 0)
+        if interval:
+            thread = threading.Thread(target=self._refresh_periodically,
+                                      args=(interval,), daemon=True)
+            thread.start()
+
+    def apply(self, changes):
+        """
+        Apply committed place writes.
+
+        Args:
+            changes (dict): Place ID mapped to its (owner_id, price,
+                latitude, longitude) tuple, or None for a deletion.
+        """
+        with self._lock:
+            if self._buffer is not None:
+                self._buffer.append(changes)
+            if not self._loaded:
+                return
+            for place_id, values in changes.items():
+                if values is None:
+                    self._remove(place_id)
+                else:
+                    self._upsert(place_id, *values)
+
+    def refresh(self):
+        """
+        Reload the index from the database.
+
+        Queries keep using the previous index while the places are read;
+        writes committed meanwhile are applied again on top of the result.
+        """
+        from app.models.place import Place
+        with self._load_lock:
+            with self._lock:
+                self._buffer = []
+            try:
+                table = Place.__table__
+                stmt = select(table.c.id, table.c.owner_id, table.c.price,
+                              table.c.latitude, table.c.longitude)
+                with self._engine.connect() as connection:
+                    rows = connection.execute(stmt).all()
+            except Exception:
+                with self._lock:
+                    self._buffer = None
+                raise
+            with self._lock:
+                buffered, self._buffer = self._buffer, None
+                self._build(rows)
+                self._loaded = True
+            for changes in buffered:
+                self.apply(changes)
+
+    def _refresh_periodically(self, interval):
+        while True:
+            time.sleep(interval)
+            self.refresh()
+
+    def _build(self, rows):
+        raise NotImplementedError
+
+    def _upsert(self, place_id, owner_id, price, latitude, longitude):
+        raise NotImplementedError
+
+    def _remove(self, place_id):
+        raise NotImplementedError
+
+
+class PlaceColumns(PlaceIndex):
+    """
+    Parallel NumPy arrays of place attributes, kept in sync on commit.
+
+    Rows of deleted places are tombstoned in `alive` and reused by the
+    compaction that runs once they make up half of the arrays.
+    """
+
+    config_key = 'PLACE_COLUMNS'
+
+    def __init__(self):
+        super().__init__()
+        self._reset(0)
+
+    def _reset(self, capacity):
+        """Allocate empty columns able to hold `capacity` rows."""
+        self._ids = []
+        self._rows = {}
+        self._owner_codes = {}
+        self._size = 0
+        self._dead = 0
+        if np is None:
+            return
+        self.owner = np.zeros(capacity, dtype=np.int32)
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.latitude = np.zeros(capacity, dtype=np.float64)
+        self.longitude = np.zeros(capacity, dtype=np.float64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _owner_code(self, owner_id):
+        """Small integer standing for an owner ID in the owner column."""
+        code = self._owner_codes.get(owner_id)
+        if code is None:
+            code = self._owner_codes[owner_id] = len(self._owner_codes)
+        return code
+
+    def _grow(self):
+        """Double the capacity of every column."""
+        capacity = max(INITIAL_CAPACITY, 2 * len(self.alive))
+        for name in ('owner', 'price', 'latitude', 'longitude', 'alive'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _upsert(self, place_id, owner_id, price, latitude, longitude):
+        row = self._rows.get(place_id)
+        if row is None:
+            if self._size == len(self.alive):
+                self._grow()
+            row = self._rows[place_id] = self._size
+            self._ids.append(place_id)
+            self._size += 1
+        self.owner[row] = self._owner_code(owner_id)
+        self.price[row] = price
+        self.latitude[row] = latitude
+        self.longitude[row] = longitude
+        self.alive[row] = True
+
+    def _remove(self, place_id):
+        row = self._rows.pop(place_id, None)
+        if row is None:
+            return
+        self.alive[row] = False
+        self._dead += 1
+        if self._dead > INITIAL_CAPACITY and self._dead * 2 > self._size:
+            self._compact()
+
+    def _compact(self):
+        """Drop the tombstoned rows."""
+        keep = np.flatnonzero(self.alive[:self._size])
+        ids = [self._ids[row] for row in keep]
+        for name in ('owner', 'price', 'latitude', 'longitude', 'alive'):
+            column = getattr(self, name)
+            compacted = np.zeros(max(INITIAL_CAPACITY, len(keep)), dtype=column.dtype)
+            compacted[:len(keep)] = column[keep]
+            setattr(self, name, compacted)
+        self._ids = ids
+        self._rows = {place_id: row for row, place_id in enumerate(ids)}
+        self._size = len(ids)
+        self._dead = 0
+
+    def _build(self, rows):
+        """Replace the columns with (id, owner_id, price, lat, lng) rows."""
+        rows = list(rows)
+        self._reset(max(INITIAL_CAPACITY, len(rows)))
+        count = len(rows)
+        if not count:
+            return
+        ids, owners, prices, latitudes, longitudes = zip(*rows)
+        self._ids = list(ids)
+        self._rows = {place_id: row for row, place_id in enumerate(ids)}
+        self.owner[:count] = [self._owner_code(owner_id) for owner_id in owners]
+        self.price[:count] = prices
+        self.latitude[:count] = latitudes
+        self.longitude[:count] = longitudes
+        self.alive[:count] = True
+        self._size = count
+
+    def query(self, min_price=None, max_price=None, bbox=None, owner_id=None,
+              limit=None):
+        """
+        IDs of the places matching every given predicate.
+
+        Args:
+            min_price (float, optional): Lowest accepted price.
+            max_price (float, optional): Highest accepted price.
+            bbox (tuple, optional): (south, west, north, east) in degrees;
+                west > east denotes a box crossing the antimeridian.
+            owner_id (str, optional): ID of the owner.
+            limit (int, optional): Maximum number of IDs returned.
+
+        Returns:
+            list: Matching place IDs, in insertion order.
+
+        Raises:
+            RuntimeError: If the index is not enabled.
+        """
+        if not self.enabled:
+            raise RuntimeError("The place column index is disabled (PLACE_COLUMNS)")
+        if not self._loaded:
+            self.refresh()
+        with self._lock:
+            size = self._size
+            mask = self.alive[:size].copy()
+            if owner_id is not None:
+                code = self._owner_codes.get(owner_id)
+                if code is None:
+                    return []
+                mask &= self.owner[:size] == code
+            if min_price is not None:
+                mask &= self.price[:size] >= min_price
+            if max_price is not None:
+                mask &= self.price[:size] <= max_price
+            if bbox is not None:
+                south, west, north, east = bbox
+                latitude = self.latitude[:size]
+                longitude = self.longitude[:size]
+                mask &= (latitude >= south) & (latitude <= north)
+                if west <= east:
+                    mask &= (longitude >= west) & (longitude <= east)
+                else:
+                    mask &= (longitude >= west) | (longitude <= east)
+            rows = np.flatnonzero(mask)
+            if limit is not None:
+                rows = rows[:limit]
+            return [self._ids[row] for row in rows]
+
+
+def _place_values(place):
+    return place.owner_id, place.price, place.latitude, place.longitude
+
+
+def record_changes(session, changes):
+    """
+    Remember place writes made outside a flush until the session commits.
+
+    Set-based UPDATE and DELETE statements do not go through the flush
+    events; PlaceRepository reports the rows they matched here.
+
+    Args:
+        session (Session): Session whose transaction made the changes.
+        changes (dict): Place ID mapped to its (owner_id, price,
+            latitude, longitude) tuple, or None for a deletion.
+    """
+    if _instances and changes:
+        session.info.setdefault(_PENDING, {}).update(changes)
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_places(session, flush_context):
+    """Remember the places written by a flush until the commit."""
+    if not _instances:
+        return
+    from app.models.place import Place
+    changes = {}
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, Place):
+            changes[obj.id] = _place_values(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Place):
+            changes[obj.id] = None
+    record_changes(session, changes)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_places(session):
+    changes = session.info.pop(_PENDING, None)
+    if changes:
+        for columns in _instances:
+            columns.apply(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_places(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,328 @@
+"""
+In-process k-nearest-neighbour index of places.
+
+PlaceKNN answers "the k places closest to this point" without a radius.
+Coordinates are stored as 3D unit vectors, where the straight-line
+(chord) distance grows with the great-circle distance, so a KD-tree over
+them ranks places exactly, with no special case at the antimeridian or
+the poles.
+
+The index follows the place writes committed by this process like the
+column index does (see app.persistence.place_columns.PlaceIndex). The
+KD-tree itself is static: a written place is tombstoned in the tree and
+kept in a small `delta` searched by brute force. Once the delta and the
+tombstones exceed REBUILD_THRESHOLD, a new tree is built from the live
+places in a background thread; writes committed meanwhile are applied
+again on top of it.
+
+NumPy is only required when PLACE_KNN is enabled.
+
+Usage:
+    place_knn.nearest(48.85, 2.35, k=20)   # -> [(place id, distance in km)]
+"""
+
+import heapq
+import math
+import threading
+from app.persistence.place_columns import PlaceIndex, np
+
+# Points per KD-tree leaf, scanned with one vectorized distance computation
+LEAF_SIZE = 64
+
+# Rows allocated for the delta; capacity then doubles
+INITIAL_DELTA_CAPACITY = 256
+
+# Delta entries and tombstones that trigger a rebuild: every query scans
+# the delta, so it is kept small (about 0.1 ms to scan at this size)
+REBUILD_THRESHOLD = 4096
+
+
+def unit_vectors(latitudes, longitudes):
+    """
+    3D unit vectors of points on the sphere.
+
+    Args:
+        latitudes (array): Latitudes in degrees.
+        longitudes (array): Longitudes in degrees.
+
+    Returns:
+        ndarray: (n, 3) array of x, y, z coordinates.
+    """
+    phi = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lam = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_phi = np.cos(phi)
+    return np.column_stack((cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)))
+
+
+def chord_km(squared_chords):
+    """Great-circle distances (km) of squared chord lengths on the unit sphere."""
+    from app.persistence.spatial import EARTH_RADIUS_KM
+    chords = np.sqrt(np.clip(squared_chords, 0.0, 4.0))
+    return 2 * EARTH_RADIUS_KM * np.arcsin(chords / 2)
+
+
+class KDTree:
+    """
+    Static KD-tree over 3D points, split at the median of the widest axis.
+
+    The points are stored in tree order, so each node covers a contiguous
+    range of them; the nodes keep their bounding box for pruning.
+
+    Attributes:
+        points (ndarray): (n, 3) points in tree order.
+        ids (list): Place ID of each point, in tree order.
+    """
+
+    def __init__(self, points, ids):
+        """
+        Args:
+            points (ndarray): (n, 3) points.
+            ids (list): Place ID of each point.
+        """
+        order = np.arange(len(points))
+        # Per node: covered range, children (-1 for a leaf), bounding box
+        self._start, self._end, self._left, self._right = [], [], [], []
+        self._low, self._high = [], []
+        if len(points):
+            self._split(points, order)
+        self.points = np.ascontiguousarray(points[order])
+        self.ids = [ids[index] for index in order]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _new_node(self, start, end, low, high):
+        self._start.append(start)
+        self._end.append(end)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._low.append(tuple(low.tolist()))
+        self._high.append(tuple(high.tolist()))
+        return len(self._start) - 1
+
+    def _split(self, points, order):
+        """Build the nodes, reordering `order` so that nodes are contiguous."""
+        stack = [(0, len(order), None)]
+        while stack:
+            start, end, parent = stack.pop()
+            block = points[order[start:end]]
+            low, high = block.min(axis=0), block.max(axis=0)
+            node = self._new_node(start, end, low, high)
+            if parent is not None:
+                parent_node, side = parent
+                (self._left if side == 0 else self._right)[parent_node] = node
+            if end - start <= LEAF_SIZE:
+                continue
+            axis = int(np.argmax(high - low))
+            middle = (end - start) // 2
+            ranked = np.argpartition(block[:, axis], middle)
+            order[start:end] = order[start:end][ranked]
+            stack.append((start + middle, end, (node, 1)))
+            stack.append((start, start + middle, (node, 0)))
+
+    def _box_distance(self, node, point):
+        """Squared distance from a point to the bounding box of a node."""
+        distance = 0.0
+        for value, low, high in zip(point, self._low[node], self._high[node]):
+            if value < low:
+                distance += (low - value) ** 2
+            elif value > high:
+                distance += (value - high) ** 2
+        return distance
+
+    def nearest(self, point, k, alive=None):
+        """
+        The k points nearest to a point, best-first.
+
+        Args:
+            point (ndarray): Query point, shape (3,).
+            k (int): Number of neighbours.
+            alive (ndarray, optional): Boolean mask, in tree order, of the
+                points that may be returned.
+
+        Returns:
+            tuple: (squared distances, tree positions), nearest first.
+        """
+        best_distances = np.empty(0)
+        best_positions = np.empty(0, dtype=np.int64)
+        if not self.ids:
+            return best_distances, best_positions
+        coordinates = tuple(point.tolist())
+        bound = math.inf
+        heap = [(0.0, 0)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > bound:
+                break
+            left = self._left[node]
+            if left >= 0:
+                for child in (left, self._right[node]):
+                    child_distance = self._box_distance(child, coordinates)
+                    if child_distance <= bound:
+                        heapq.heappush(heap, (child_distance, child))
+                continue
+            start, end = self._start[node], self._end[node]
+            offsets = self.points[start:end] - point
+            distances = np.einsum('ij,ij->i', offsets, offsets)
+            positions = np.arange(start, end)
+            if alive is not None:
+                keep = alive[start:end]
+                distances, positions = distances[keep], positions[keep]
+            best_distances = np.concatenate((best_distances, distances))
+            best_positions = np.concatenate((best_positions, positions))
+            if len(best_distances) > k:
+                kept = np.argpartition(best_distances, k - 1)[:k]
+                best_distances, best_positions = best_distances[kept], best_positions[kept]
+            if len(best_distances) == k:
+                bound = best_distances.max()
+        ranked = np.argsort(best_distances, kind='stable')
+        return best_distances[ranked], best_positions[ranked]
+
+
+class PlaceKNN(PlaceIndex):
+    """
+    KD-tree of place coordinates with a brute-force delta, kept in sync on commit.
+    """
+
+    config_key = 'PLACE_KNN'
+
+    def __init__(self):
+        super().__init__()
+        # Incremented by each load: rebuilds of an older load are dropped
+        self._generation = 0
+        self._reset()
+
+    def _reset(self, tree=None):
+        """Install a tree (an empty one by default) and clear the delta."""
+        self._tree = tree
+        self._positions = {}
+        self._dead = 0
+        self._delta_ids = []
+        self._delta_rows = {}
+        self._rebuilding = None
+        if np is None:
+            return
+        if tree is None:
+            self._tree = KDTree(np.empty((0, 3)), [])
+        self._positions = {place_id: position for position, place_id in enumerate(self._tree.ids)}
+        self._alive = np.ones(len(self._tree), dtype=bool)
+        # Unit vectors of the delta places, in the first len(_delta_ids) rows
+        self._delta = np.empty((INITIAL_DELTA_CAPACITY, 3))
+
+    def __len__(self):
+        return len(self._positions) - self._dead + len(self._delta_ids)
+
+    def _build(self, rows):
+        """Build the tree from (id, owner_id, price, lat, lng) rows."""
+        rows = list(rows)
+        if not rows:
+            self._reset()
+        else:
+            ids, _, _, latitudes, longitudes = zip(*rows)
+            self._reset(KDTree(unit_vectors(latitudes, longitudes), list(ids)))
+        self._generation += 1
+
+    def _untrack(self, place_id):
+        """Tombstone a place in the tree and take it out of the delta."""
+        position = self._positions.get(place_id)
+        if position is not None and self._alive[position]:
+            self._alive[position] = False
+            self._dead += 1
+        row = self._delta_rows.pop(place_id, None)
+        if row is not None:
+            # Move the last delta entry into the freed row
+            last = len(self._delta_ids) - 1
+            if row != last:
+                moved = self._delta_ids[last]
+                self._delta_ids[row] = moved
+                self._delta[row] = self._delta[last]
+                self._delta_rows[moved] = row
+            self._delta_ids.pop()
+
+    def _upsert(self, place_id, owner_id, price, latitude, longitude):
+        if self._rebuilding is not None:
+            self._rebuilding.append((place_id, (owner_id, price, latitude, longitude)))
+        self._untrack(place_id)
+        row = len(self._delta_ids)
+        if row == len(self._delta):
+            grown = np.empty((2 * len(self._delta), 3))
+            grown[:row] = self._delta
+            self._delta = grown
+        self._delta[row] = unit_vectors([latitude], [longitude])[0]
+        self._delta_rows[place_id] = row
+        self._delta_ids.append(place_id)
+        self._maybe_rebuild()
+
+    def _remove(self, place_id):
+        if self._rebuilding is not None:
+            self._rebuilding.append((place_id, None))
+        self._untrack(place_id)
+        self._maybe_rebuild()
+
+    def _maybe_rebuild(self):
+        """Start a background rebuild once the delta and tombstones are too many."""
+        stale = len(self._delta_ids) + self._dead
+        if self._rebuilding is not None or stale <= REBUILD_THRESHOLD:
+            return
+        self._rebuilding = []
+        live = np.flatnonzero(self._alive)
+        ids = [self._tree.ids[position] for position in live] + self._delta_ids
+        points = np.concatenate((self._tree.points[live], self._delta[:len(self._delta_ids)]))
+        thread = threading.Thread(target=self._rebuild, daemon=True,
+                                  args=(points, ids, self._generation))
+        thread.start()
+
+    def _rebuild(self, points, ids, generation):
+        """Build a tree from a snapshot, then swap it in and replay newer writes."""
+        tree = KDTree(points, ids)
+        with self._lock:
+            changes, self._rebuilding = self._rebuilding, None
+            if generation != self._generation:
+                return
+            self._reset(tree)
+            for place_id, values in changes:
+                if values is None:
+                    self._remove(place_id)
+                else:
+                    self._upsert(place_id, *values)
+
+    def nearest(self, lat, lng, k=20):
+        """
+        The k places nearest to a point.
+
+        Args:
+            lat (float): Latitude of the point, in degrees.
+            lng (float): Longitude of the point, in degrees.
+            k (int): Number of places returned (fewer if there are fewer).
+
+        Returns:
+            list: (place ID, distance in km) tuples, nearest first.
+
+        Raises:
+            ValueError: If the point or k is invalid.
+            RuntimeError: If the index is not enabled.
+        """
+        if not self.enabled:
+            raise RuntimeError("The nearest-place index is disabled (PLACE_KNN)")
+        if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+            raise ValueError("lat must be between -90 and 90, lng between -180 and 180")
+        if k < 1:
+            raise ValueError("k must be a positive integer")
+        if not self._loaded:
+            self.refresh()
+        point = unit_vectors([lat], [lng])[0]
+        with self._lock:
+            tree = self._tree
+            distances, positions = tree.nearest(point, k, self._alive if self._dead else None)
+            ids = [tree.ids[position] for position in positions]
+            if self._delta_ids:
+                offsets = self._delta[:len(self._delta_ids)] - point
+                delta_distances = np.einsum('ij,ij->i', offsets, offsets)
+                rows = np.arange(len(delta_distances))
+                if len(rows) > k:
+                    rows = np.argpartition(delta_distances, k - 1)[:k]
+                distances = np.concatenate((distances, delta_distances[rows]))
+                ids += [self._delta_ids[row] for row in rows]
+        ranked = np.argsort(distances, kind='stable')[:k]
+        kilometres = chord_km(distances[ranked])
+        return [(ids[index], float(distance)) for index, distance in zip(ranked, kilometres)]
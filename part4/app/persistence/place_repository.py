@@ -1,9 +1,276 @@
-from app.models.place import Place
-from app.persistence.repository import SQLAlchemyRepository
+from datetime import datetime
+from sqlalchemy import and_, exists, func, or_, select
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.persistence.place_columns import record_changes
+from app.persistence.replica import reads_from_replica
+from app.persistence.repository import SQLAlchemyRepository, decode_cursor, keyset
+from app.persistence.spatial import (haversine_km, places_rtree, places_rtree_keys,
+                                     radius_bboxes, split_bbox)
 
 class PlaceRepository(SQLAlchemyRepository):
+    # Place.to_dict serializes amenities: fetch them for a whole page at once
+    default_load = {'amenities': 'selectin'}
+    # Place detail view also shows the owner
+    detail_load = {'owner': 'joined', 'amenities': 'selectin'}
+    # Only shown on the detail view
+    deferred_columns = ('description',)
+
     def __init__(self):
         super().__init__(Place)
 
+    def _rows_updated(self, rows):
+        # Bulk statements skip the flush events the column index listens to
+        record_changes(db.session, {
+            row['id']: (row['owner_id'], row['price'], row['latitude'], row['longitude'])
+            for row in rows})
+
+    def _rows_deleted(self, obj_ids):
+        record_changes(db.session, dict.fromkeys(obj_ids))
+
+    def _columns(self, columns, required):
+        """Place columns to select: the given or non-deferred ones, plus `required`."""
+        table = Place.__table__
+        if columns is None:
+            columns = [column.name for column in table.columns
+                       if column.name not in self.deferred_columns]
+        columns = list(columns)
+        unknown = [name for name in columns if name not in table.c]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+        columns += [name for name in required if name not in columns]
+        return [table.c[name] for name in columns]
+
+    @staticmethod
+    def _in_boxes(boxes):
+        """
+        Statement reading places through the R*Tree entries inside boxes.
+
+        Returns:
+            tuple: (FROM clause joining places_rtree to places, WHERE clause).
+        """
+        places = Place.__table__
+        rtree, keys = places_rtree.c, places_rtree_keys.c
+        source = places_rtree.join(places_rtree_keys, keys.rtree_id == rtree.id) \
+            .join(places, places.c.id == keys.place_id)
+        return source, or_(*[
+            and_(rtree.max_lat >= south, rtree.min_lat <= north,
+                 rtree.max_lng >= west, rtree.min_lng <= east)
+            for south, west, north, east in boxes])
+
+    @reads_from_replica
+    def nearby(self, lat, lng, radius_km, limit=None, cursor=None, columns=None):
+        """
+        Places within a distance of a point, nearest first.
+
+        The R*Tree returns the places inside the boxes covering the circle;
+        the exact haversine distance then discards the corners and orders
+        the rest. Pages are keyset pages on (distance, id).
+
+        Args:
+            lat (float): Latitude of the center, in degrees.
+            lng (float): Longitude of the center, in degrees.
+            radius_km (float): Search radius, in km.
+            limit (int, optional): Page size; None returns every match.
+            cursor (str, optional): Cursor returned with the previous
+                page of the same search.
+            columns (iterable, optional): Place columns to read; defaults
+                to every column except those in `deferred_columns`.
+
+        Returns:
+            tuple: (list of row dicts with a 'distance_km', next cursor or None).
+
+        Raises:
+            ValueError: If the center, radius, a column or the cursor is invalid.
+        """
+        if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+            raise ValueError("lat must be between -90 and 90, lng between -180 and 180")
+        if not radius_km > 0:
+            raise ValueError("radius_km must be positive")
+        source, in_boxes = self._in_boxes(radius_bboxes(lat, lng, radius_km))
+        stmt = select(*self._columns(columns, ('id', 'latitude', 'longitude'))) \
+            .select_from(source).where(in_boxes)
+        after = decode_cursor(cursor, float) if cursor else None
+        rows = []
+        for row in db.session.execute(stmt).mappings():
+            distance = haversine_km(lat, lng, row['latitude'], row['longitude'])
+            if distance <= radius_km and (after is None or (distance, row['id']) > after):
+                rows.append({**row, 'distance_km': distance})
+        rows.sort(key=lambda row: (row['distance_km'], row['id']))
+        if limit is None:
+            return rows, None
+        return self._split_page(rows[:limit + 1], limit,
+                                lambda row: (row['distance_km'], row['id']))
+
+    @reads_from_replica
+    def within_bbox(self, south, west, north, east, limit=None, cursor=None, columns=None):
+        """
+        Places inside a bounding box, e.g. a map viewport, oldest first.
+
+        Args:
+            south (float): Southern edge latitude, in degrees.
+            west (float): Western edge longitude; greater than `east`
+                when the box crosses the antimeridian.
+            north (float): Northern edge latitude.
+            east (float): Eastern edge longitude.
+            limit (int, optional): Page size; None returns every match.
+            cursor (str, optional): Cursor returned with the previous page.
+            columns (iterable, optional): Place columns to read; defaults
+                to every column except those in `deferred_columns`.
+
+        Returns:
+            tuple: (list of row dicts, next cursor or None).
+
+        Raises:
+            ValueError: If the box, a column or the cursor is invalid.
+        """
+        if not -90 <= south <= north <= 90:
+            raise ValueError("south and north must satisfy -90 <= south <= north <= 90")
+        if not (-180 <= west <= 180 and -180 <= east <= 180):
+            raise ValueError("west and east must be between -180 and 180")
+        boxes = split_bbox(south, west, north, east)
+        places = Place.__table__
+        source, in_boxes = self._in_boxes(boxes)
+        # The R*Tree keeps rounded coordinates: filter on the exact ones too
+        exact = or_(*[and_(places.c.latitude.between(s, n), places.c.longitude.between(w, e))
+                      for s, w, n, e in boxes])
+        stmt = select(*self._columns(columns, ('id', 'created_at'))) \
+            .select_from(source).where(in_boxes, exact)
+        stmt = keyset(stmt, places, cursor)
+        if limit is None:
+            return [dict(row) for row in db.session.execute(stmt).mappings()], None
+        rows = [dict(row) for row in db.session.execute(stmt.limit(limit + 1)).mappings()]
+        return self._split_page(rows, limit, lambda row: (row['created_at'], row['id']))
+
+    @reads_from_replica
+    def get_rows(self, place_ids, columns=None):
+        """
+        Rows of several places with one Core query per chunk of ids.
+
+        Args:
+            place_ids (iterable): IDs of the places.
+            columns (iterable, optional): Place columns to read; defaults
+                to every column except those in `deferred_columns`.
+
+        Returns:
+            dict: Place ID mapped to its row dict; missing places are left out.
+
+        Raises:
+            ValueError: If a column does not exist.
+        """
+        place_ids = list(dict.fromkeys(place_ids))
+        places = Place.__table__
+        selected = self._columns(columns, ('id',))
+        rows = {}
+        for start in range(0, len(place_ids), self.IN_CHUNK_SIZE):
+            chunk = place_ids[start:start + self.IN_CHUNK_SIZE]
+            stmt = select(*selected).where(places.c.id.in_(chunk))
+            for row in db.session.execute(stmt).mappings():
+                rows[row['id']] = dict(row)
+        return rows
+
+    @reads_from_replica
     def get_place_by_id(self, id):
-        return self.model.query.filter_by(id=id).first()
+        return self._query().filter_by(id=id).first()
+
+    @reads_from_replica
+    def get_amenity_rows(self, place_ids):
+        """
+        Amenity rows of several places with one Core query per chunk of ids.
+
+        Args:
+            place_ids (iterable): IDs of the places.
+
+        Returns:
+            dict: Place ID mapped to a list of amenity row dicts.
+        """
+        place_ids = list(place_ids)
+        amenities = Amenity.__table__
+        result = {place_id: [] for place_id in place_ids}
+        for start in range(0, len(place_ids), self.IN_CHUNK_SIZE):
+            chunk = place_ids[start:start + self.IN_CHUNK_SIZE]
+            stmt = select(place_amenity.c.place_id, *amenities.c) \
+                .join(amenities, amenities.c.id == place_amenity.c.amenity_id) \
+                .where(place_amenity.c.place_id.in_(chunk))
+            for row in db.session.execute(stmt).mappings():
+                row = dict(row)
+                result[row.pop('place_id')].append(row)
+        return result
+
+    # Orders accepted by search()
+    SEARCH_SORTS = ('created_at', 'price', 'rating')
+
+    @reads_from_replica
+    def search(self, min_price=None, max_price=None, amenity_ids=(), owner_id=None,
+               sort='created_at', order='asc', limit=20, cursor=None, columns=None,
+               place_ids=None):
+        """
+        One page of the place rows matching every given filter.
+
+        The filters are composed into a single SELECT: a price range on
+        the (price, id) index, the owner on its index, and one EXISTS
+        lookup on the place_amenity primary key per required amenity.
+        The page is a keyset page on (sort key, id).
+
+        Args:
+            min_price (float, optional): Lowest accepted price.
+            max_price (float, optional): Highest accepted price.
+            amenity_ids (iterable): Amenities a place must all have.
+            owner_id (str, optional): ID of the owner.
+            sort (str): 'created_at', 'price', or 'rating' (average
+                review rating, 0 for places without reviews).
+            order (str): 'asc' or 'desc'.
+            limit (int): Page size.
+            cursor (str, optional): Cursor returned with the previous
+                page of the same search.
+            columns (iterable, optional): Place columns to read; defaults
+                to every column except those in `deferred_columns`.
+            place_ids (list, optional): IDs the matches are restricted
+                to, e.g. candidates found by the column index. Each is a
+                bound parameter, so keep the list to a few thousand.
+
+        Returns:
+            tuple: (list of row dicts, next cursor or None); rows also
+                hold a 'rating' when sorted by rating.
+
+        Raises:
+            ValueError: If sort, order, a column or the cursor is invalid.
+        """
+        if sort not in self.SEARCH_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(self.SEARCH_SORTS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        table = Place.__table__
+        # The cursor is built from the sort key and the id
+        selected = self._columns(columns, ('id', 'created_at', 'price'))
+
+        if sort == 'rating':
+            reviews = Review.__table__
+            key = func.coalesce(
+                select(func.avg(reviews.c.rating))
+                .where(reviews.c.place_id == table.c.id)
+                .scalar_subquery(), 0.0)
+            selected.append(key.label('rating'))
+            parse = float
+        elif sort == 'price':
+            key, parse = table.c.price, float
+        else:
+            key, parse = table.c.created_at, datetime.fromisoformat
+
+        stmt = select(*selected)
+        if min_price is not None:
+            stmt = stmt.where(table.c.price >= min_price)
+        if max_price is not None:
+            stmt = stmt.where(table.c.price <= max_price)
+        if owner_id is not None:
+            stmt = stmt.where(table.c.owner_id == owner_id)
+        if place_ids is not None:
+            stmt = stmt.where(table.c.id.in_(place_ids))
+        for amenity_id in dict.fromkeys(amenity_ids):
+            stmt = stmt.where(exists().where(place_amenity.c.place_id == table.c.id,
+                                             place_amenity.c.amenity_id == amenity_id))
+        stmt = keyset(stmt, table, cursor, order == 'desc', key, parse)
+        rows = [dict(row) for row in db.session.execute(stmt.limit(limit + 1)).mappings()]
+        return self._split_page(rows, limit, lambda row: (row[sort], row['id']))
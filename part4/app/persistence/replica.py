@@ -0,0 +1,162 @@
+"""
+Read/write routing between the primary database and a read replica.
+
+When SQLALCHEMY_BINDS defines a `replica` engine, queries run inside
+`replica_reads()` (the repositories' read methods are wrapped with
+`@reads_from_replica`) go to the replica. Everything else goes to the
+primary: flushes, INSERT/UPDATE/DELETE statements, lazy loads outside a
+read method, and every read made once the request has written, so users
+always see their own writes. Without a replica, routing is a no-op.
+
+For local testing the replica can be a second SQLite file refreshed from
+the primary with SQLite's online backup API by `sync_replica`, every
+REPLICA_SYNC_INTERVAL seconds when that setting is positive.
+
+Usage:
+    SQLALCHEMY_BINDS = {'replica': 'sqlite:///replica.db'}
+    REPLICA_SYNC_INTERVAL = 5
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from itertools import chain
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+# Bind key of the read engine in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """
+    Session choosing the replica engine for replica reads, the primary otherwise.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            if self._flushing:
+                # Too late to refresh anything: the flush writes what it has
+                g.db_primary_only = True
+            elif isinstance(clause, UpdateBase):
+                stick_to_primary()
+            elif reading_replica(self._db):
+                g.replica_used = True
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def stick_to_primary():
+    """
+    Send every later query of the current request to the primary.
+
+    Called when the request writes (or is about to), so the data it reads
+    back includes its own changes, which the replica may not have yet.
+
+    On the first call, the objects the request read from the replica are
+    expired, so the write and later reads reload them from the primary
+    instead of reusing possibly stale values. Objects with pending
+    changes are left as they are.
+    """
+    if g.get('db_primary_only'):
+        return
+    g.db_primary_only = True
+    if g.pop('replica_used', False):
+        from app.extensions import db
+        session = db.session
+        changed = set(map(id, chain(session.dirty, session.deleted)))
+        for obj in list(session.identity_map.values()):
+            if id(obj) not in changed:
+                session.expire(obj)
+
+
+def reading_replica(db):
+    """
+    Tell whether the queries made now run on the replica.
+
+    Args:
+        db (SQLAlchemy): The extension holding the engines.
+
+    Returns:
+        bool: True inside `replica_reads()` when a replica is configured
+            and the request has not written yet.
+    """
+    return (bool(g.get('replica_reads', 0)) and not g.get('db_primary_only')
+            and REPLICA_BIND in db.engines)
+
+
+@contextmanager
+def replica_reads():
+    """Let the queries made inside the block run on the replica."""
+    g.replica_reads = g.get('replica_reads', 0) + 1
+    try:
+        yield
+    finally:
+        g.replica_reads -= 1
+
+
+def reads_from_replica(func):
+    """Decorate a repository read method to run its queries on the replica."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def sync_replica(engines):
+    """
+    Copy the primary SQLite database onto the replica with the backup API.
+
+    The backup runs page by page under SQLite's locking, so readers of the
+    replica see either the old or the new copy, never a partial one.
+
+    Args:
+        engines (dict): Bind key to engine, as `db.engines`.
+
+    Raises:
+        RuntimeError: If the primary or the replica is not SQLite.
+    """
+    primary, replica = engines[None], engines[REPLICA_BIND]
+    if primary.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+        raise RuntimeError("sync_replica only copies SQLite databases")
+    source = primary.raw_connection()
+    try:
+        target = replica.raw_connection()
+        try:
+            source.driver_connection.backup(target.driver_connection)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+
+def init_app(app, db):
+    """
+    Start refreshing the replica every REPLICA_SYNC_INTERVAL seconds.
+
+    Does nothing without a replica bind or with a non-positive interval.
+
+    Args:
+        app (Flask): The configured application.
+        db (SQLAlchemy): The extension whose engines are synced.
+    """
+    interval = app.config.get('REPLICA_SYNC_INTERVAL') or 0
+    if interval <= 0 or REPLICA_BIND not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+
+    def _sync_forever():
+        while True:
+            time.sleep(interval)
+            try:
+                with app.app_context():
+                    sync_replica(db.engines)
+            except Exception:
+                logger.exception("Replica sync failed")
+
+    threading.Thread(target=_sync_forever, name='replica-sync', daemon=True).start()
@@ -3,8 +3,30 @@ Defines the repository interface and an in-memory implementation for
 
 The Repository ABC declares CRUD and lookup methods. InMemoryRepository
 implements these using a simple dict for storage.
+
+Collections can be read page by page with `get_page`, which uses keyset
+pagination on `(created_at, id)` and an opaque cursor string.
+
+`exists`, `count`, `update_where` and `delete_where` work on sets of rows
+without loading them. Their filters map column names to a value, or to a
+list of accepted values, e.g. {'place_id': place_id, 'rating': [1, 2]}.
+
+SQLAlchemyRepository read methods run on the read replica when one is
+configured (see app.persistence.replica); writes always use the primary.
 """
+import base64
+import re
+from datetime import datetime
+from flask import current_app, g
+from sqlalchemy import and_, delete, func, inspect, or_, select, update
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import (joinedload, lazyload, make_transient_to_detached,
+                            raiseload, selectinload)
+from sqlalchemy.orm.attributes import set_committed_value
 from app.extensions import db
+from app.persistence.replica import reading_replica, reads_from_replica, stick_to_primary
+from app.persistence.rows import validated_values
+from app.persistence.unit_of_work import UnitOfWork, commit, flush
 from abc import ABC, abstractmethod
 from app.models.user import User
 from app.models.place import Place
@@ -14,6 +36,179 @@ from app.models.amenity import Amenity
 __all__ = ["User", "Place", "Review", "Amenity"]
 
 
+def encode_cursor(created_at, obj_id):
+    """
+    Build an opaque pagination cursor pointing just after a position.
+
+    Args:
+        created_at (datetime or float): Sort key of the last item of a
+            page: its creation time, or e.g. its price for other orders.
+        obj_id (str): ID of that item.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    key = created_at.isoformat() if isinstance(created_at, datetime) else repr(created_at)
+    raw = f"{key}|{obj_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, parse=datetime.fromisoformat):
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor string.
+        parse (callable): Turns the sort key back into its type
+            (e.g. float); defaults to a creation time.
+
+    Returns:
+        tuple: The `(created_at, id)` keyset position.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        created_at, obj_id = raw.split('|', 1)
+        return parse(created_at), obj_id
+    except ValueError:
+        raise ValueError("Invalid pagination cursor")
+
+
+# Filter values matching any of their items (IN) rather than equality
+MULTIPLE = (list, tuple, set, frozenset)
+
+
+def where_clauses(table, filters):
+    """
+    WHERE clauses of a filter on the columns of a table.
+
+    Args:
+        table (Table): The filtered table.
+        filters (dict, optional): Column name mapped to a value, or to a
+            list of accepted values; None matches NULL.
+
+    Returns:
+        list: Clauses to AND together.
+
+    Raises:
+        ValueError: If a column does not exist.
+    """
+    clauses = []
+    for name, value in (filters or {}).items():
+        if name not in table.c:
+            raise ValueError(f"Unknown column: {name}")
+        column = table.c[name]
+        if isinstance(value, MULTIPLE):
+            clauses.append(column.in_(list(value)))
+        elif value is None:
+            clauses.append(column.is_(None))
+        else:
+            clauses.append(column == value)
+    return clauses
+
+
+def filter_matches(values, filters):
+    """
+    Whether column values satisfy a filter, as `where_clauses` would.
+
+    Args:
+        values (dict): Column name mapped to value.
+        filters (dict, optional): The filter.
+
+    Returns:
+        bool: True if every condition holds.
+    """
+    for name, expected in (filters or {}).items():
+        value = values.get(name)
+        if isinstance(expected, MULTIPLE):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def filter_ids(filters):
+    """
+    IDs a filter restricts its matches to, when it has an `id` condition.
+
+    Returns:
+        list or None: The IDs, or None if any ID may match.
+    """
+    if not filters or 'id' not in filters:
+        return None
+    value = filters['id']
+    return list(dict.fromkeys(value)) if isinstance(value, MULTIPLE) else [value]
+
+
+def violates_unique(error, table, name):
+    """
+    Tell whether an IntegrityError was raised by one unique constraint.
+
+    Most databases put the constraint name in the message; SQLite names
+    the columns instead ("UNIQUE constraint failed: reviews.user_id,
+    reviews.place_id"), or the index for an expression index.
+
+    Args:
+        error (IntegrityError): Error raised by a flush or commit.
+        table (Table): Table declaring the constraint.
+        name (str): Name of the unique constraint or index.
+
+    Returns:
+        bool: True if the error comes from that constraint.
+    """
+    message = str(error.orig)
+    if re.search(rf'\b{re.escape(name)}\b', message):
+        return True
+    constraint = next((item for item in [*table.constraints, *table.indexes]
+                       if item.name == name), None)
+    if constraint is None:
+        return False
+    columns = ', '.join(f"{table.name}.{column.name}" for column in constraint.columns)
+    return message.endswith(f"UNIQUE constraint failed: {columns}")
+
+
+def keyset(query, table, cursor=None, descending=False, key=None,
+           parse=datetime.fromisoformat):
+    """
+    Apply a (created_at, id) cursor and ordering to a query or select.
+
+    Args:
+        query (Query or Select): Statement reading `table`.
+        table (Table): Table with `created_at` and `id` columns.
+        cursor (str, optional): Cursor returned with the previous page.
+        descending (bool): Newest first instead of oldest first.
+        key (ColumnElement, optional): Sort key used instead of
+            created_at, e.g. the price; it must not be NULL.
+        parse (callable): Type of the key in cursors (see decode_cursor).
+
+    Returns:
+        Query or Select: The filtered and ordered statement.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    created_col = table.c.created_at if key is None else key
+    id_col = table.c.id
+    if cursor:
+        created_at, obj_id = decode_cursor(cursor, parse)
+        if descending:
+            query = query.filter(or_(
+                created_col < created_at,
+                and_(created_col == created_at, id_col < obj_id)
+            ))
+        else:
+            query = query.filter(or_(
+                created_col > created_at,
+                and_(created_col == created_at, id_col > obj_id)
+            ))
+    if descending:
+        return query.order_by(created_col.desc(), id_col.desc())
+    return query.order_by(created_col, id_col)
+
 
 class Repository(ABC):
     """
@@ -53,6 +248,33 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_page(self, limit, cursor=None):
+        """
+        Retrieve one page of objects ordered by (created_at, id).
+
+        Args:
+            limit (int): Maximum number of objects to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of objects, next cursor or None on the last page).
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        pass
+
+    @abstractmethod
+    def add_many(self, objs):
+        """
+        Add several objects in a single transaction.
+
+        Args:
+            objs (list): The objects to add.
+        """
+        pass
+
     @abstractmethod
     def update(self, obj_id, data):
         """
@@ -64,6 +286,19 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def update_many(self, updates):
+        """
+        Update several objects in a single transaction.
+
+        Args:
+            updates (dict): Mapping of object ID to the attributes to update.
+
+        Returns:
+            list: The objects that were found and updated.
+        """
+        pass
+
     @abstractmethod
     def delete(self, obj_id):
         """
@@ -74,6 +309,19 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def delete_many(self, obj_ids):
+        """
+        Remove several objects in a single transaction.
+
+        Args:
+            obj_ids (iterable): IDs of the objects to delete.
+
+        Returns:
+            int: Number of objects deleted.
+        """
+        pass
+
     @abstractmethod
     def get_by_attribute(self, attr_name, attr_value):
         """
@@ -88,6 +336,72 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    def exists(self, obj_id):
+        """
+        Check whether an object is stored, without loading it.
+
+        Args:
+            obj_id (str): The ID of the object.
+
+        Returns:
+            bool: True if the object exists.
+        """
+        pass
+
+    @abstractmethod
+    def count(self, filters=None):
+        """
+        Count the objects matching a filter, without loading them.
+
+        Args:
+            filters (dict, optional): Column name mapped to a value or a
+                list of accepted values; None counts every object.
+
+        Returns:
+            int: Number of matching objects.
+
+        Raises:
+            ValueError: If a column does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def update_where(self, filters, values):
+        """
+        Set the same values on every object matching a filter.
+
+        Args:
+            filters (dict): Column name mapped to a value or a list of
+                accepted values.
+            values (dict): Column name mapped to its new value.
+
+        Returns:
+            int: Number of matching objects.
+
+        Raises:
+            ValueError: If the filter is empty, a column does not exist or
+                a model validator rejects a value.
+        """
+        pass
+
+    @abstractmethod
+    def delete_where(self, filters):
+        """
+        Remove every object matching a filter.
+
+        Args:
+            filters (dict): Column name mapped to a value or a list of
+                accepted values.
+
+        Returns:
+            int: Number of objects deleted.
+
+        Raises:
+            ValueError: If the filter is empty or a column does not exist.
+        """
+        pass
+
 
 class InMemoryRepository(Repository):
     """
@@ -109,6 +423,15 @@ class InMemoryRepository(Repository):
         """
         self._storage[obj.id] = obj
 
+    def add_many(self, objs):
+        """
+        Store several objects, keyed by their ids.
+
+        Args:
+            objs (list): Objects to store; each must have an `id` attribute.
+        """
+        self._storage.update((obj.id, obj) for obj in objs)
+
     def get(self, obj_id):
         """
         Retrieve an object by its ID.
@@ -130,6 +453,29 @@ class InMemoryRepository(Repository):
         """
         return list(self._storage.values())
 
+    def get_page(self, limit, cursor=None):
+        """
+        Retrieve one page of stored objects ordered by (created_at, id).
+
+        Args:
+            limit (int): Maximum number of objects to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of objects, next cursor or None on the last page).
+        """
+        objs = sorted(self._storage.values(),
+                      key=lambda obj: (obj.created_at, obj.id))
+        if cursor:
+            position = decode_cursor(cursor)
+            objs = [obj for obj in objs
+                    if (obj.created_at, obj.id) > position]
+        page = objs[:limit]
+        next_cursor = None
+        if len(objs) > limit:
+            next_cursor = encode_cursor(page[-1].created_at, page[-1].id)
+        return page, next_cursor
+
     def update(self, obj_id, data):
         """
         Update an object if it exists.
@@ -145,6 +491,24 @@ class InMemoryRepository(Repository):
         if obj:
             obj.update(data)
 
+    def update_many(self, updates):
+        """
+        Update every stored object listed in `updates`.
+
+        Args:
+            updates (dict): Mapping of object ID to new attribute values.
+
+        Returns:
+            list: The objects that were found and updated.
+        """
+        updated = []
+        for obj_id, data in updates.items():
+            obj = self.get(obj_id)
+            if obj:
+                obj.update(data)
+                updated.append(obj)
+        return updated
+
     def delete(self, obj_id):
         """
         Delete an object by its ID.
@@ -155,6 +519,19 @@ class InMemoryRepository(Repository):
         if obj_id in self._storage:
             del self._storage[obj_id]
 
+    def delete_many(self, obj_ids):
+        """
+        Delete every stored object whose ID is listed.
+
+        Args:
+            obj_ids (iterable): IDs of the objects to remove.
+
+        Returns:
+            int: Number of objects deleted.
+        """
+        return sum(self._storage.pop(obj_id, None) is not None
+                   for obj_id in set(obj_ids))
+
     def get_by_attribute(self, attr_name, attr_value):
         """
         Find first object matching a given attribute value.
@@ -171,32 +548,458 @@ class InMemoryRepository(Repository):
              if getattr(obj, attr_name) == attr_value),
             None
         )
+
+    def _matching(self, filters):
+        """
+        Stored objects matching a filter.
+
+        An `id` condition is answered by key lookups instead of a scan.
+        """
+        ids = filter_ids(filters)
+        if ids is None:
+            candidates = self._storage.values()
+        else:
+            candidates = [self._storage[obj_id] for obj_id in ids if obj_id in self._storage]
+        return [obj for obj in candidates
+                if filter_matches({name: getattr(obj, name, None) for name in filters or {}},
+                                  filters)]
+
+    def exists(self, obj_id):
+        """
+        Check whether an object is stored, in constant time.
+
+        Args:
+            obj_id (str): The key of the object.
+
+        Returns:
+            bool: True if the object is stored.
+        """
+        return obj_id in self._storage
+
+    def count(self, filters=None):
+        """
+        Count the stored objects matching a filter.
+
+        Constant time without a filter or with an `id` condition only.
+
+        Args:
+            filters (dict, optional): Attribute name mapped to a value or a
+                list of accepted values.
+
+        Returns:
+            int: Number of matching objects.
+        """
+        if not filters:
+            return len(self._storage)
+        if filters.keys() == {'id'}:
+            return sum(obj_id in self._storage for obj_id in filter_ids(filters))
+        return len(self._matching(filters))
+
+    def update_where(self, filters, values):
+        """
+        Update every stored object matching a filter.
+
+        Args:
+            filters (dict): Attribute name mapped to a value or a list of
+                accepted values.
+            values (dict): New attribute values.
+
+        Returns:
+            int: Number of matching objects.
+
+        Raises:
+            ValueError: If the filter is empty.
+        """
+        if not filters:
+            raise ValueError("update_where requires a filter")
+        objs = self._matching(filters)
+        for obj in objs:
+            obj.update(values)
+        return len(objs)
+
+    def delete_where(self, filters):
+        """
+        Delete every stored object matching a filter.
+
+        Args:
+            filters (dict): Attribute name mapped to a value or a list of
+                accepted values.
+
+        Returns:
+            int: Number of objects deleted.
+
+        Raises:
+            ValueError: If the filter is empty.
+        """
+        if not filters:
+            raise ValueError("delete_where requires a filter")
+        objs = self._matching(filters)
+        for obj in objs:
+            del self._storage[obj.id]
+        return len(objs)
 class SQLAlchemyRepository(Repository):
-    def __init__(self, model):
+    # SQLite refuses statements with more than 32766 bound parameters
+    IN_CHUNK_SIZE = 500
+
+    # Relationship loading strategies accepted in `load` mappings
+    LOADERS = {
+        'selectin': selectinload,
+        'joined': joinedload,
+        'lazy': lazyload,
+        'raise': raiseload
+    }
+
+    # {relationship: strategy} used by get_all/get_page when load is None
+    default_load = {}
+
+    # Large columns that get_all_rows leaves out unless asked for
+    deferred_columns = ()
+
+    def __init__(self, model, cache=None):
         self.model = model
+        # Optional EntityCache of column snapshots keyed by id
+        self.cache = cache
+
+    def _query(self, load=None):
+        """
+        Base query with loader options for a {relationship: strategy} map.
+
+        With STRICT_LOADING enabled, every relationship not listed in
+        `load` raises on access instead of silently lazy-loading.
+        """
+        options = []
+        for name, strategy in (load or {}).items():
+            if strategy not in self.LOADERS:
+                raise ValueError(f"Unknown loading strategy: {strategy}")
+            options.append(self.LOADERS[strategy](getattr(self.model, name)))
+        if current_app.config.get('STRICT_LOADING'):
+            options.append(raiseload('*'))
+        return self.model.query.options(*options)
+
+    def _ensure_loaded(self, obj, load):
+        """Load requested relationships skipped by an identity-map or cache hit."""
+        unloaded = inspect(obj).unloaded
+        for name, strategy in (load or {}).items():
+            if strategy not in ('selectin', 'joined') or name not in unloaded:
+                continue
+            try:
+                getattr(obj, name)
+            except InvalidRequestError:
+                # Loaded earlier with raiseload (strict mode): load explicitly
+                db.session.refresh(obj, attribute_names=[name])
 
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        self.invalidate(obj.id)
+        commit()
+
+    def add_many(self, objs):
+        """Insert all objects in one transaction; the ORM batches the INSERTs."""
+        with UnitOfWork():
+            db.session.add_all(objs)
+            for obj in objs:
+                self.invalidate(obj.id)
+            # Surface constraint violations here rather than at request end
+            flush()
+
+    def _get_many(self, obj_ids):
+        """Load objects by ID with one IN query per chunk of IDs."""
+        obj_ids = list(obj_ids)
+        objs = []
+        for start in range(0, len(obj_ids), self.IN_CHUNK_SIZE):
+            chunk = obj_ids[start:start + self.IN_CHUNK_SIZE]
+            objs.extend(self._query().filter(self.model.id.in_(chunk)).all())
+        return objs
+
+    @reads_from_replica
+    def get(self, obj_id, load=None):
+        if self.cache is not None:
+            obj = self._get_cached(obj_id)
+            if obj is not None:
+                self._ensure_loaded(obj, load)
+                return obj
+        obj = self._query(load).get(obj_id)
+        if obj is not None:
+            if self.cache is not None:
+                self._remember(obj)
+            self._ensure_loaded(obj, load)
+        return obj
+
+    def invalidate(self, obj_id):
+        """
+        Drop an object from the cache and keep it out for this request.
 
-    def get(self, obj_id):
-        return self.model.query.get(obj_id)
+        The entry is dropped again once the transaction commits (see
+        unit_of_work.finish): another request reading the row before the
+        commit may have cached the old version meanwhile.
+        """
+        if self.cache is None:
+            return
+        self.cache.delete(obj_id)
+        g.setdefault('cache_written', {})[(self.model.__tablename__, obj_id)] = self.cache
 
-    def get_all(self):
-        return self.model.query.all()
+    def _remember(self, obj):
+        """
+        Cache a committed snapshot of the object's columns.
+
+        Rows read from the replica are not cached: it may lag behind the
+        primary, and a cached entry would outlive the invalidation of a
+        later write.
+        """
+        written = g.get('cache_written', ())
+        if (self.model.__tablename__, obj.id) in written or obj in db.session.dirty:
+            return
+        if reading_replica(db):
+            return
+        mapper = self.model.__mapper__
+        self.cache.set(obj.id, {attr.key: getattr(obj, attr.key)
+                                for attr in mapper.column_attrs})
+
+    def _get_cached(self, obj_id):
+        """Rebuild a cached object inside the current session without SQL."""
+        mapper = self.model.__mapper__
+        obj = db.session.identity_map.get(mapper.identity_key_from_primary_key([obj_id]))
+        if obj is not None:
+            return obj
+        snapshot = self.cache.get(obj_id)
+        if snapshot is None:
+            return None
+        obj = mapper.class_manager.new_instance()
+        for key, value in snapshot.items():
+            set_committed_value(obj, key, value)
+        # Relationships stay unloaded and lazy-load from this session
+        make_transient_to_detached(obj)
+        db.session.add(obj)
+        return obj
+
+    @reads_from_replica
+    def get_all(self, load=None):
+        return self._query(self.default_load if load is None else load).all()
+
+    @reads_from_replica
+    def get_page(self, limit, cursor=None, load=None):
+        query = self._query(self.default_load if load is None else load)
+        return self._keyset_page(query, limit, cursor)
+
+    def _keyset(self, query, cursor=None, descending=False):
+        """Apply the (created_at, id) cursor and ordering to a query or select."""
+        return keyset(query, self.model.__table__, cursor, descending)
+
+    @staticmethod
+    def _split_page(rows, limit, position):
+        """Cut the extra row fetched past `limit` and turn it into a cursor."""
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(*position(page[-1]))
+        return page, next_cursor
+
+    def _keyset_page(self, query, limit, cursor=None, descending=False):
+        """Keyset page on (created_at, id); one extra row detects the end."""
+        query = self._keyset(query, cursor, descending)
+        if limit is None:
+            return query.all(), None
+        rows = query.limit(limit + 1).all()
+        return self._split_page(rows, limit, lambda obj: (obj.created_at, obj.id))
+
+    @reads_from_replica
+    def get_all_rows(self, columns=None, limit=None, cursor=None):
+        """
+        Read rows as plain dicts with a Core SELECT, without ORM objects.
+
+        Args:
+            columns (iterable, optional): Column names to select; defaults
+                to every column except those in `deferred_columns`.
+            limit (int, optional): Page size; None returns every row.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of dicts, next cursor or None).
+
+        Raises:
+            ValueError: If a column does not exist or the cursor is invalid.
+        """
+        table = self.model.__table__
+        if columns is None:
+            columns = [column.name for column in table.columns
+                       if column.name not in self.deferred_columns]
+        columns = list(columns)
+        paginated = limit is not None or cursor
+        if paginated:
+            # The cursor is built from these two columns
+            columns += [name for name in ('created_at', 'id') if name not in columns]
+        unknown = [name for name in columns if name not in table.c]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+
+        stmt = select(*[table.c[name] for name in columns])
+        if paginated:
+            stmt = self._keyset(stmt, cursor)
+        if limit is None:
+            return [dict(row) for row in db.session.execute(stmt).mappings()], None
+        rows = [dict(row) for row in db.session.execute(stmt.limit(limit + 1)).mappings()]
+        return self._split_page(rows, limit, lambda row: (row['created_at'], row['id']))
 
     def update(self, obj_id, data):
-        obj = self.get(obj_id)
-        if obj:
-            for key, value in data.items():
-                setattr(obj, key, value)
-            db.session.commit()
+        """Update an object with one UPDATE statement (see `update_where`)."""
+        self.update_where({'id': obj_id}, data)
+
+    def update_many(self, updates):
+        with UnitOfWork():
+            objs = self._get_many(updates)
+            for obj in objs:
+                for key, value in updates[obj.id].items():
+                    setattr(obj, key, value)
+                self.invalidate(obj.id)
+        return objs
 
     def delete(self, obj_id):
-        obj = self.get(obj_id)
-        if obj:
-            db.session.delete(obj)
-            db.session.commit()
+        """Delete an object with one DELETE statement (see `delete_where`)."""
+        self.delete_where({'id': obj_id})
+
+    def delete_many(self, obj_ids):
+        return self.delete_where({'id': list(obj_ids)})
 
+    @reads_from_replica
     def get_by_attribute(self, attr_name, attr_value):
-        return self.model.query.filter(getattr(self.model, attr_name) == attr_value).first()
+        if self.cache is not None:
+            # The cache maps (attribute, value) to an id; the object found
+            # through it is re-checked since the attribute may have changed
+            obj_id = self.cache.get((attr_name, attr_value))
+            obj = self.get(obj_id) if obj_id is not None else None
+            if obj is not None and getattr(obj, attr_name) == attr_value:
+                return obj
+        obj = self._query().filter(getattr(self.model, attr_name) == attr_value).first()
+        if obj is not None and self.cache is not None and not reading_replica(db):
+            self.cache.set((attr_name, attr_value), obj.id)
+            self._remember(obj)
+        return obj
+
+    def _filter_chunks(self, filters):
+        """
+        Split a filter so that no statement binds more than IN_CHUNK_SIZE
+        values for its longest list.
+        """
+        filters = dict(filters or {})
+        lists = [name for name, value in filters.items() if isinstance(value, MULTIPLE)]
+        if not lists:
+            yield filters
+            return
+        name = max(lists, key=lambda name: len(filters[name]))
+        values = list(dict.fromkeys(filters[name]))
+        if not values:
+            yield filters
+            return
+        for start in range(0, len(values), self.IN_CHUNK_SIZE):
+            yield {**filters, name: values[start:start + self.IN_CHUNK_SIZE]}
+
+    def _links(self):
+        """(link table, column referring to this model) of each many-to-many."""
+        links = []
+        for rel in self.model.__mapper__.relationships:
+            if rel.secondary is not None:
+                (_, own), = rel.synchronize_pairs
+                links.append((rel.secondary, rel.secondary.c[own.name]))
+        return links
+
+    def _returning(self, stmt, columns):
+        """
+        Execute a bulk UPDATE or DELETE and return the rows it matched.
+
+        RETURNING reports them in the same statement; databases without it
+        get the IDs read before the statement (and the rows after it).
+
+        Returns:
+            list: Dicts of `columns` of the matched rows.
+        """
+        dialect = db.session.get_bind(mapper=self.model.__mapper__).dialect
+        if dialect.update_returning if stmt.is_update else dialect.delete_returning:
+            return [dict(row) for row in db.session.execute(stmt.returning(*columns)).mappings()]
+        table = self.model.__table__
+        ids = db.session.execute(select(table.c.id).where(stmt.whereclause)).scalars().all()
+        db.session.execute(stmt)
+        if stmt.is_delete:
+            return [{'id': obj_id} for obj_id in ids]
+        rows = []
+        for start in range(0, len(ids), self.IN_CHUNK_SIZE):
+            chunk = ids[start:start + self.IN_CHUNK_SIZE]
+            rows += [dict(row) for row in db.session.execute(
+                select(*columns).where(table.c.id.in_(chunk))).mappings()]
+        return rows
+
+    def _rows_updated(self, rows):
+        """Called with the new rows of a set-based update, before commit."""
+
+    def _rows_deleted(self, obj_ids):
+        """Called with the IDs removed by a set-based delete, before commit."""
+
+    @reads_from_replica
+    def exists(self, obj_id):
+        """Check for an object with the identity map, the cache, then one SELECT."""
+        mapper = self.model.__mapper__
+        if mapper.identity_key_from_primary_key([obj_id]) in db.session.identity_map:
+            return True
+        if self.cache is not None and self.cache.get(obj_id) is not None:
+            return True
+        table = self.model.__table__
+        stmt = select(table.c.id).where(table.c.id == obj_id).limit(1)
+        return db.session.execute(stmt).first() is not None
+
+    @reads_from_replica
+    def count(self, filters=None):
+        """Count matching rows with SELECT count(*)."""
+        table = self.model.__table__
+        return sum(db.session.execute(
+                       select(func.count()).select_from(table)
+                       .where(*where_clauses(table, chunk))).scalar()
+                   for chunk in self._filter_chunks(filters))
+
+    def update_where(self, filters, values):
+        """
+        Update matching rows with one UPDATE statement, without loading them.
+
+        Model validators run on the values and `onupdate` columns
+        (updated_at) are set by the statement. Objects already in the
+        session are updated too.
+        """
+        if not filters:
+            raise ValueError("update_where requires a filter")
+        if not values:
+            return self.count(filters)
+        values = validated_values(self.model, values)
+        stick_to_primary()
+        table = self.model.__table__
+        rows = []
+        for chunk in self._filter_chunks(filters):
+            stmt = update(self.model).where(*where_clauses(table, chunk)).values(values)
+            rows += self._returning(stmt, table.columns)
+        for row in rows:
+            self.invalidate(row['id'])
+        self._rows_updated(rows)
+        commit()
+        return len(rows)
+
+    def delete_where(self, filters):
+        """
+        Delete matching rows with one DELETE statement, without loading them.
+
+        Their many-to-many link rows are deleted first, one statement per
+        link table. Objects already in the session are marked deleted.
+        """
+        if not filters:
+            raise ValueError("delete_where requires a filter")
+        stick_to_primary()
+        table = self.model.__table__
+        obj_ids = []
+        for chunk in self._filter_chunks(filters):
+            clauses = where_clauses(table, chunk)
+            for secondary, column in self._links():
+                db.session.execute(delete(secondary).where(
+                    column.in_(select(table.c.id).where(*clauses))))
+            stmt = delete(self.model).where(*clauses)
+            obj_ids += [row['id'] for row in self._returning(stmt, [table.c.id])]
+        for obj_id in obj_ids:
+            self.invalidate(obj_id)
+        self._rows_deleted(obj_ids)
+        commit()
+        return len(obj_ids)
@@ -1,9 +1,64 @@
 from app.models.review import Review
+from app.persistence.cached_repository import CachedRepository
+from app.persistence.replica import reads_from_replica
 from app.persistence.repository import SQLAlchemyRepository
 
 class ReviewRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Review)
 
+    @reads_from_replica
     def get_review_by_id(self, id):
-        return self.model.query.filter_by(id=id).first()
+        return self._query().filter_by(id=id).first()
+
+    @reads_from_replica
+    def get_by_user_and_place(self, user_id, place_id):
+        return self._query().filter_by(user_id=user_id, place_id=place_id).first()
+
+    @reads_from_replica
+    def get_by_place(self, place_id, limit=None, cursor=None, order='asc'):
+        """
+        Reviews of one place, served by the (place_id, created_at, id) index.
+
+        Args:
+            place_id (str): ID of the reviewed place.
+            limit (int, optional): Page size; None returns every review.
+            cursor (str, optional): Cursor returned with the previous page.
+            order (str): 'asc' (oldest first) or 'desc' (newest first).
+
+        Returns:
+            tuple: (list of Review, next cursor or None).
+
+        Raises:
+            ValueError: If order or cursor is invalid.
+        """
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        query = self._query().filter(self.model.place_id == place_id)
+        return self._keyset_page(query, limit, cursor, descending=order == 'desc')
+
+
+class CachedReviewRepository(CachedRepository):
+    """
+    ReviewRepository counterpart serving reviews from memory, their writes
+    being persisted by a write-behind queue (see WRITE_BEHIND_TABLES).
+    """
+    group_by = ('place_id',)
+
+    def get_review_by_id(self, id):
+        return self.get(id)
+
+    def get_by_user_and_place(self, user_id, place_id):
+        return self._get_unique(('user_id', 'place_id'), (user_id, place_id))
+
+    def get_by_place(self, place_id, limit=None, cursor=None, order='asc'):
+        """
+        Reviews of one place, ordered by date, like ReviewRepository.get_by_place.
+
+        Raises:
+            ValueError: If order or cursor is invalid.
+        """
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        return self._group_page('place_id', place_id, limit, cursor,
+                                descending=order == 'desc')
@@ -0,0 +1,178 @@
+"""
+Conversions between model objects and plain rows.
+
+Used by the repositories that store rows without going through
+`db.session` (write-behind, sharded): they turn the objects built by the
+facade into column dicts, and the rows they read back into detached
+model instances.
+"""
+
+from contextlib import nullcontext
+from sqlalchemy import inspect
+from sqlalchemy.orm import MANYTOONE, configure_mappers, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+def _value(default):
+    """Value of a Python-side column default or onupdate."""
+    return default.arg(None) if default.is_callable else default.arg
+
+
+def row_position(row):
+    """Keyset position (created_at, id) of a row, as paginated."""
+    return row['created_at'], row['id']
+
+
+def related_value(related, key):
+    """
+    Attribute of an object related to one being stored, e.g. its ID.
+
+    Reading an expired attribute loads it; the load must not autoflush,
+    since the backrefs put the stored object in the session's collections
+    although it is not saved through the session.
+
+    Args:
+        related: A related model instance, possibly in a session.
+        key (str): Attribute name.
+
+    Returns:
+        The attribute value.
+    """
+    session = inspect(related).session
+    with session.no_autoflush if session is not None else nullcontext():
+        return getattr(related, key)
+
+
+def object_row(obj):
+    """
+    Column values of an object, foreign keys taken from its relationships.
+
+    Python-side column defaults fill the values still missing.
+
+    Args:
+        obj: A model instance, usually new.
+
+    Returns:
+        dict: Column name mapped to value, for every column of its table.
+    """
+    mapper = inspect(obj).mapper
+    table = mapper.local_table
+    row = {column.name: obj.__dict__.get(column.key) for column in table.columns}
+    for rel in mapper.relationships:
+        related = obj.__dict__.get(rel.key)
+        if rel.direction is MANYTOONE and related is not None:
+            for local, remote in rel.local_remote_pairs:
+                row[local.name] = related_value(related, remote.key)
+    for column in table.columns:
+        if row[column.name] is None and column.default is not None:
+            row[column.name] = _value(column.default)
+    return row
+
+
+def release(obj, row):
+    """
+    Give a stored object its row values and take it back out of the
+    collections of its related objects.
+
+    Building an object with relationships to session objects (e.g.
+    `Review(place=place)`) adds it to their collections; since the object
+    is stored without the session, SQLAlchemy would otherwise try (and
+    refuse, with a warning) to save it along with them at the next flush.
+
+    Args:
+        obj: The stored object.
+        row (dict): Its stored column values.
+    """
+    for name, value in row.items():
+        if obj.__dict__.get(name) != value:
+            set_committed_value(obj, name, value)
+    mapper = inspect(obj).mapper
+    for rel in mapper.relationships:
+        related = obj.__dict__.get(rel.key)
+        if related is None:
+            continue
+        for other in related if rel.uselist else [related]:
+            state = inspect(other)
+            if state.persistent:
+                state.session.expire(other, [prop.key for prop in state.mapper.relationships
+                                             if prop.mapper is mapper])
+
+
+def detached_instance(model, row):
+    """
+    Detached instance of a model holding the values of a row.
+
+    Its relationships are not loaded: accessing them raises.
+
+    Args:
+        model (type): The model class.
+        row (dict): Column values, primary key included.
+
+    Returns:
+        The instance.
+    """
+    configure_mappers()
+    obj = model.__mapper__.class_manager.new_instance()
+    for key, value in row.items():
+        set_committed_value(obj, key, value)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def validated_values(model, values):
+    """
+    New column values of a set-based update, model validators applied.
+
+    Args:
+        model (type): The model class.
+        values (dict): Column name mapped to its new value.
+
+    Returns:
+        dict: The values as the validators returned them.
+
+    Raises:
+        ValueError: If a column does not exist, is the primary key, or a
+            model validator rejects its value.
+    """
+    table = model.__table__
+    unknown = [name for name in values if name not in table.c]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    if 'id' in values:
+        raise ValueError("id cannot be updated")
+    # Bare instances only get their attribute setters once mappers are configured
+    configure_mappers()
+    obj = model.__mapper__.class_manager.new_instance()
+    for key, value in values.items():
+        setattr(obj, key, value)
+    return {key: obj.__dict__[key] for key in values}
+
+
+def updated_row(model, row, data):
+    """
+    Row of an object after an update, model validators included.
+
+    Columns with an `onupdate` not set by `data` are refreshed when
+    something changed, as a flush would.
+
+    Args:
+        model (type): The model class.
+        row (dict): Current column values.
+        data (dict): Attributes to set.
+
+    Returns:
+        dict or None: The new row, or None if nothing changed.
+
+    Raises:
+        ValueError: If a model validator rejects a value.
+    """
+    obj = detached_instance(model, row)
+    for key, value in data.items():
+        setattr(obj, key, value)
+    new_row = object_row(obj)
+    if new_row == row:
+        return None
+    for column in model.__table__.columns:
+        if column.onupdate is not None and column.name not in data:
+            new_row[column.name] = _value(column.onupdate)
+    return new_row
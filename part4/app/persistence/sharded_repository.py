@@ -0,0 +1,320 @@
+"""
+Repository of places or reviews spread over the shards of a ShardSet.
+
+Each row is stored on the shard of the place it belongs to (see
+app.persistence.sharding): a place by its own ID, a review by its
+place_id. Writes therefore touch a single database. The amenity links of
+a place are written along with it.
+
+A lookup by shard key (`get_by_shard_key`, e.g. the reviews of a place)
+reads one shard. Other reads are scatter-gather: every shard is queried
+concurrently, and their results, each ordered by (created_at, id), are
+merged. Pages use the same keyset cursors as SQLAlchemyRepository: each
+shard returns at most `limit + 1` rows past the cursor, so a page never
+reads more than that per shard.
+
+Like CachedRepository, reads return detached instances holding the
+column values. The amenities of a place are read with `get_link_ids`.
+Each write is one transaction on its shard; `add_many` commits once per
+shard, so a batch spanning several shards is not atomic.
+"""
+
+import heapq
+from itertools import islice
+from sqlalchemy import delete, func, insert, select, update
+from app.persistence.repository import (MULTIPLE, Repository, SQLAlchemyRepository, keyset,
+                                        where_clauses)
+from app.persistence.rows import (detached_instance, object_row, related_value,
+                                  release, row_position, updated_row,
+                                  validated_values)
+from app.persistence.sharding import SHARD_KEYS
+
+
+class ShardedRepository(Repository):
+    """
+    Rows of one sharded table, routed by their shard key.
+
+    Attributes:
+        model (type): The mapped model (Place or Review).
+        shards (ShardSet): The shards and their routing.
+        shard_key (str): Column holding the place ID the rows are routed by.
+    """
+
+    def __init__(self, model, shards):
+        """
+        Args:
+            model (type): A model whose table is listed in SHARD_KEYS.
+            shards (ShardSet): The shards.
+
+        Raises:
+            ValueError: If the model's table is not sharded.
+        """
+        if model.__tablename__ not in SHARD_KEYS:
+            raise ValueError(f"{model.__tablename__} is not a sharded table")
+        self.model = model
+        self.table = model.__table__
+        self.shards = shards
+        self.shard_key = SHARD_KEYS[self.table.name]
+        # {relationship: (secondary table, own key column, other key column)}
+        self._links = {}
+        for rel in model.__mapper__.relationships:
+            if rel.secondary is not None and rel.secondary.name in SHARD_KEYS:
+                (_, own), = rel.synchronize_pairs
+                (_, other), = rel.secondary_synchronize_pairs
+                self._links[rel.key] = (rel.secondary, own, other)
+
+    def _link_rows(self, obj):
+        """Rows of the link tables for the related objects of `obj`."""
+        rows = []
+        for key, (secondary, own, other) in self._links.items():
+            for related in obj.__dict__.get(key) or []:
+                rows.append((secondary, {own.name: obj.id,
+                                        other.name: related_value(related, 'id')}))
+        return rows
+
+    def _insert(self, connection, obj, row):
+        connection.execute(insert(self.table), row)
+        for secondary, link in self._link_rows(obj):
+            connection.execute(insert(secondary), link)
+
+    def _locate(self, obj_id):
+        """(engine, row) of an object, or (None, None) if it does not exist."""
+        stmt = select(self.table).where(self.table.c.id == obj_id)
+        if self.shard_key == 'id':
+            engine = self.shards.engine_for(obj_id)
+            results = [(engine, self._read(engine, stmt))]
+        else:
+            results = self.shards.scatter(lambda engine: (engine, self._read(engine, stmt)))
+        for engine, rows in results:
+            if rows:
+                return engine, rows[0]
+        return None, None
+
+    def _read(self, engine, stmt):
+        with engine.connect() as connection:
+            return [dict(row) for row in connection.execute(stmt).mappings()]
+
+    def _gather(self, stmt, limit=None, cursor=None, descending=False):
+        """
+        Merge the keyset-ordered rows of every shard into one page.
+
+        Returns:
+            tuple: (list of row dicts, next cursor or None).
+        """
+        stmt = keyset(stmt, self.table, cursor, descending)
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        results = self.shards.scatter(lambda engine: self._read(engine, stmt))
+        rows = heapq.merge(*results, key=row_position, reverse=descending)
+        if limit is None:
+            return list(rows), None
+        rows = list(islice(rows, limit + 1))
+        return SQLAlchemyRepository._split_page(rows, limit, row_position)
+
+    def add(self, obj):
+        row = object_row(obj)
+        with self.shards.engine_for(row[self.shard_key]).begin() as connection:
+            self._insert(connection, obj, row)
+        release(obj, row)
+
+    def add_many(self, objs):
+        """Insert the objects with one transaction per shard, concurrently."""
+        by_engine = {}
+        for obj in objs:
+            row = object_row(obj)
+            by_engine.setdefault(self.shards.engine_for(row[self.shard_key]), []).append((obj, row))
+
+        def insert_all(engine):
+            if engine not in by_engine:
+                return
+            with engine.begin() as connection:
+                for obj, row in by_engine[engine]:
+                    self._insert(connection, obj, row)
+
+        self.shards.scatter(insert_all)
+        for items in by_engine.values():
+            for obj, row in items:
+                release(obj, row)
+
+    def get(self, obj_id, load=None):
+        """Retrieve an object by ID; `load` is accepted but ignored."""
+        _, row = self._locate(obj_id)
+        return detached_instance(self.model, row) if row is not None else None
+
+    def get_all(self, load=None):
+        rows, _ = self._gather(select(self.table))
+        return [detached_instance(self.model, row) for row in rows]
+
+    def get_page(self, limit, cursor=None, load=None):
+        rows, next_cursor = self._gather(select(self.table), limit, cursor)
+        return [detached_instance(self.model, row) for row in rows], next_cursor
+
+    def get_by_shard_key(self, value, limit=None, cursor=None, order='asc'):
+        """
+        Page of the objects of one place, read from its shard only.
+
+        Args:
+            value (str): The place ID (e.g. the place_id of reviews).
+            limit (int, optional): Page size; None returns every object.
+            cursor (str, optional): Cursor returned with the previous page.
+            order (str): 'asc' (oldest first) or 'desc' (newest first).
+
+        Returns:
+            tuple: (list of objects, next cursor or None).
+
+        Raises:
+            ValueError: If order or cursor is invalid.
+        """
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        stmt = keyset(select(self.table).where(self.table.c[self.shard_key] == value),
+                      self.table, cursor, descending=order == 'desc')
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        rows = self._read(self.shards.engine_for(value), stmt)
+        if limit is not None:
+            rows, next_cursor = SQLAlchemyRepository._split_page(rows, limit, row_position)
+        else:
+            next_cursor = None
+        return [detached_instance(self.model, row) for row in rows], next_cursor
+
+    def get_link_ids(self, obj_id, relationship):
+        """
+        IDs of the objects linked to one object through a link table.
+
+        Args:
+            obj_id (str): ID of the object (a place).
+            relationship (str): Relationship name, e.g. 'amenities'.
+
+        Returns:
+            list: IDs of the linked objects (e.g. amenity IDs).
+        """
+        secondary, own, other = self._links[relationship]
+        stmt = select(secondary.c[other.name]).where(secondary.c[own.name] == obj_id)
+        with self.shards.engine_for(obj_id).connect() as connection:
+            return connection.execute(stmt).scalars().all()
+
+    def update(self, obj_id, data):
+        """
+        Update an object on its shard.
+
+        Raises:
+            ValueError: If a model validator rejects a value, or `data`
+                changes the shard key.
+        """
+        engine, row = self._locate(obj_id)
+        if row is None:
+            return
+        new_row = updated_row(self.model, row, data)
+        if new_row is None:
+            return
+        if new_row[self.shard_key] != row[self.shard_key]:
+            raise ValueError(f"{self.shard_key} cannot be changed on a sharded {self.table.name}")
+        changes = {key: value for key, value in new_row.items() if row[key] != value}
+        with engine.begin() as connection:
+            connection.execute(update(self.table).where(self.table.c.id == obj_id)
+                               .values(changes))
+
+    def update_many(self, updates):
+        updated = []
+        for obj_id, data in updates.items():
+            self.update(obj_id, data)
+            obj = self.get(obj_id)
+            if obj is not None:
+                updated.append(obj)
+        return updated
+
+    def _delete(self, engine, clauses):
+        """Delete the rows matching `clauses`, and their links, from one shard."""
+        with engine.begin() as connection:
+            for secondary, own, _ in self._links.values():
+                connection.execute(delete(secondary).where(secondary.c[own.name].in_(
+                    select(self.table.c.id).where(*clauses))))
+            return connection.execute(delete(self.table).where(*clauses)).rowcount
+
+    def delete(self, obj_id):
+        """Delete an object, and its links, from its shard."""
+        engine, row = self._locate(obj_id)
+        if row is not None:
+            self._delete(engine, [self.table.c.id == obj_id])
+
+    def delete_many(self, obj_ids):
+        return self.delete_where({'id': list(set(obj_ids))})
+
+    def get_by_attribute(self, attr_name, attr_value):
+        """Oldest object whose attribute has the given value, on any shard."""
+        stmt = select(self.table).where(self.table.c[attr_name] == attr_value)
+        rows, _ = self._gather(stmt, limit=1)
+        return detached_instance(self.model, rows[0]) if rows else None
+
+    def _shard_filters(self, filters):
+        """
+        Filter to run on each shard holding matching rows.
+
+        A shard key condition (the place ID, or `id` of places) routes the
+        filter to the shards of its values only.
+
+        Returns:
+            dict: Engine mapped to the filter to run on it.
+        """
+        filters = dict(filters or {})
+        where_clauses(self.table, filters)
+        if self.shard_key not in filters:
+            return {engine: filters for engine in self.shards.engines.values()}
+        value = filters[self.shard_key]
+        if not isinstance(value, MULTIPLE):
+            return {self.shards.engine_for(value): filters}
+        by_engine = {}
+        for key in dict.fromkeys(value):
+            by_engine.setdefault(self.shards.engine_for(key), []).append(key)
+        return {engine: {**filters, self.shard_key: keys} for engine, keys in by_engine.items()}
+
+    def _scatter_filters(self, filters, func):
+        """Sum of `func(engine, clauses)` over the shards a filter targets."""
+        targets = self._shard_filters(filters)
+        return sum(self.shards.scatter(
+            lambda engine: func(engine, where_clauses(self.table, targets[engine]))
+            if engine in targets else 0))
+
+    def exists(self, obj_id):
+        stmt = select(self.table.c.id).where(self.table.c.id == obj_id).limit(1)
+        if self.shard_key == 'id':
+            return bool(self._read(self.shards.engine_for(obj_id), stmt))
+        return any(self.shards.scatter(lambda engine: self._read(engine, stmt)))
+
+    def count(self, filters=None):
+        """Count matching rows on the shards the filter targets."""
+        def count_rows(engine, clauses):
+            stmt = select(func.count()).select_from(self.table).where(*clauses)
+            with engine.connect() as connection:
+                return connection.execute(stmt).scalar()
+        return self._scatter_filters(filters, count_rows)
+
+    def update_where(self, filters, values):
+        """
+        Update matching rows with one UPDATE per targeted shard.
+
+        Raises:
+            ValueError: If the filter is empty, a column does not exist, a
+                model validator rejects a value or `values` changes the
+                shard key.
+        """
+        if not filters:
+            raise ValueError("update_where requires a filter")
+        if not values:
+            return self.count(filters)
+        values = validated_values(self.model, values)
+        if self.shard_key in values:
+            raise ValueError(f"{self.shard_key} cannot be changed on a sharded {self.table.name}")
+
+        def update_rows(engine, clauses):
+            with engine.begin() as connection:
+                return connection.execute(
+                    update(self.table).where(*clauses).values(values)).rowcount
+        return self._scatter_filters(filters, update_rows)
+
+    def delete_where(self, filters):
+        """Delete matching rows, and their links, on the targeted shards."""
+        if not filters:
+            raise ValueError("delete_where requires a filter")
+        return self._scatter_filters(filters, self._delete)
@@ -0,0 +1,254 @@
+"""
+Hash sharding of places, with their reviews and amenity links, over
+several SQLite databases.
+
+SQLite lets one writer at a time work on a database file. Spreading the
+places over N files (shards) lets N writers work at once. The shard of a
+place is picked by consistent hashing of its ID (`HashRing`), so adding
+a shard only moves about 1/N of the places.
+
+Co-location: the rows that belong to a place live on its shard. Each
+sharded table has a shard key column (`SHARD_KEYS`) holding a place ID.
+Reviews and amenity links are therefore read and written together with
+their place on a single database, and the one-review-per-user-and-place
+constraint stays enforceable. Users and amenities are not sharded; they
+stay in the main database.
+
+`reshard()` moves the places whose shard changed, with their reviews and
+links, after shards are added or removed (see tools/reshard.py).
+
+Usage:
+    shards = ShardSet({'s0': 'sqlite:///shard0.db', 's1': 'sqlite:///shard1.db'})
+    shards.create_all()
+    places = ShardedRepository(Place, shards)
+"""
+
+import hashlib
+import logging
+from bisect import bisect
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import ForeignKeyConstraint, MetaData, create_engine, delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.persistence.sqlite import apply_pragmas
+
+logger = logging.getLogger(__name__)
+
+# Sharded tables mapped to the column holding the ID of their place
+SHARD_KEYS = {
+    Place.__table__.name: 'id',
+    Review.__table__.name: 'place_id',
+    place_amenity.name: 'place_id'
+}
+
+# Points per shard on the hash ring; more points spread keys more evenly
+VNODES = 64
+
+# Run on every shard connection: concurrent readers, and writers waiting
+# for the lock instead of failing (see ProductionConfig.SQLITE_PRAGMAS)
+SHARD_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000
+}
+
+
+def _hash(value):
+    """Stable 64-bit hash of a string (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def shard_metadata():
+    """
+    Schema of a shard: copies of the sharded tables and their indexes.
+
+    Foreign keys to the tables that stay in the main database (users,
+    amenities) are left out, since those tables do not exist on a shard.
+
+    Returns:
+        MetaData: Metadata holding the shard tables.
+    """
+    metadata = MetaData()
+    for name in SHARD_KEYS:
+        table = Place.metadata.tables[name]
+        external = {tuple(constraint.column_keys)
+                    for constraint in table.foreign_key_constraints
+                    if constraint.elements[0].target_fullname.split('.')[0]
+                    not in SHARD_KEYS}
+        copy = table.to_metadata(metadata)
+        for constraint in list(copy.foreign_key_constraints):
+            if tuple(constraint.column_keys) in external:
+                copy.constraints.discard(constraint)
+                for column in constraint.columns:
+                    copy.foreign_keys.difference_update(column.foreign_keys)
+                    column.foreign_keys.clear()
+    return metadata
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to shard names.
+
+    Attributes:
+        names (tuple): The shard names, sorted.
+    """
+
+    def __init__(self, names, vnodes=VNODES):
+        """
+        Place `vnodes` points per shard on the ring.
+
+        Args:
+            names (iterable): Shard names.
+            vnodes (int): Points per shard.
+
+        Raises:
+            ValueError: If no shard name is given.
+        """
+        self.names = tuple(sorted(names))
+        if not self.names:
+            raise ValueError("A hash ring needs at least one shard")
+        points = sorted((_hash(f'{name}#{i}'), name)
+                        for name in self.names for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [name for _, name in points]
+
+    def shard_for(self, key):
+        """
+        Name of the shard owning a key: the first point clockwise of it.
+
+        Args:
+            key (str): A place ID.
+
+        Returns:
+            str: Shard name.
+        """
+        index = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class ShardSet:
+    """
+    Engines of the shards and the ring routing place IDs to them.
+
+    Attributes:
+        engines (dict): Shard name mapped to its Engine.
+        ring (HashRing): Routing of place IDs.
+    """
+
+    def __init__(self, uris, pragmas=None, vnodes=VNODES):
+        """
+        Create one engine per shard.
+
+        Args:
+            uris (dict): Shard name mapped to its SQLite database URL.
+            pragmas (dict, optional): PRAGMAs run on every connection;
+                defaults to SHARD_PRAGMAS.
+            vnodes (int): Points per shard on the ring.
+        """
+        self.engines = {name: create_engine(uri) for name, uri in uris.items()}
+        for engine in self.engines.values():
+            apply_pragmas(engine, SHARD_PRAGMAS if pragmas is None else pragmas)
+        self.ring = HashRing(self.engines, vnodes)
+        self._executor = ThreadPoolExecutor(max_workers=len(self.engines),
+                                            thread_name_prefix='shard')
+
+    def create_all(self):
+        """Create the shard tables where they do not exist yet."""
+        metadata = shard_metadata()
+        for engine in self.engines.values():
+            metadata.create_all(engine)
+
+    def name_for(self, place_id):
+        """Name of the shard holding a place and its co-located rows."""
+        return self.ring.shard_for(place_id)
+
+    def engine_for(self, place_id):
+        """Engine of the shard holding a place and its co-located rows."""
+        return self.engines[self.ring.shard_for(place_id)]
+
+    def scatter(self, func):
+        """
+        Run `func(engine)` on every shard concurrently.
+
+        SQLite releases the GIL while it works, so the shards are queried
+        in parallel.
+
+        Args:
+            func (callable): Called with each shard engine.
+
+        Returns:
+            list: The results, in shard name order.
+        """
+        futures = [self._executor.submit(func, self.engines[name])
+                   for name in self.ring.names]
+        return [future.result() for future in futures]
+
+    def dispose(self):
+        """Stop the worker threads and close every connection."""
+        self._executor.shutdown()
+        for engine in self.engines.values():
+            engine.dispose()
+
+
+def reshard(source, target, batch_size=500):
+    """
+    Move the places whose shard differs in `target`, with their reviews
+    and amenity links.
+
+    Each batch is copied to its new shard in one transaction, then
+    removed from the old one. An existing copy is kept, so an interrupted
+    run can simply be started again.
+
+    Args:
+        source (ShardSet): The shards as they are.
+        target (ShardSet): The new shard layout; a shard present in both
+            (same name and database) keeps the places it still owns.
+        batch_size (int): Places moved per transaction.
+
+    Returns:
+        int: Number of places moved.
+    """
+    target.create_all()
+    tables = [Place.metadata.tables[name] for name in SHARD_KEYS]
+    places = Place.__table__
+    moved = 0
+    for name, engine in source.engines.items():
+        last_id = ''
+        while True:
+            with engine.connect() as connection:
+                ids = connection.execute(
+                    select(places.c.id).where(places.c.id > last_id)
+                    .order_by(places.c.id).limit(batch_size)).scalars().all()
+            if not ids:
+                break
+            last_id = ids[-1]
+            moves = {}
+            for place_id in ids:
+                new_engine = target.engine_for(place_id)
+                if str(new_engine.url) != str(engine.url):
+                    moves.setdefault(new_engine, []).append(place_id)
+            for new_engine, place_ids in moves.items():
+                _move(engine, new_engine, tables, place_ids)
+                moved += len(place_ids)
+        logger.info("Shard %s resharded, %d places moved so far", name, moved)
+    return moved
+
+
+def _move(engine, new_engine, tables, place_ids):
+    """Copy the rows of some places to another shard, then delete them."""
+    with engine.connect() as connection:
+        rows = {table: [dict(row) for row in connection.execute(
+                    select(table).where(table.c[SHARD_KEYS[table.name]].in_(place_ids))
+                ).mappings()]
+                for table in tables}
+    with new_engine.begin() as connection:
+        for table in tables:
+            if rows[table]:
+                connection.execute(sqlite_insert(table).on_conflict_do_nothing(),
+                                   rows[table])
+    with engine.begin() as connection:
+        # Children before the places they refer to
+        for table in reversed(tables):
+            connection.execute(delete(table).where(
+                table.c[SHARD_KEYS[table.name]].in_(place_ids)))
@@ -0,0 +1,156 @@
+"""
+SQLite R*Tree index of place coordinates, and the geometry to query it.
+
+`places_rtree` holds one degenerate box (a point) per place. An R*Tree
+is keyed by an integer, so `places_rtree_keys` maps each place id to the
+integer key of its box; that key is an INTEGER PRIMARY KEY, which VACUUM
+keeps (unlike the implicit rowid of `places`). Triggers on `places` keep
+both tables in sync with every insert, id or coordinate update and
+delete, whichever path wrote the row (ORM flush, bulk UPDATE/DELETE,
+another process). They are created with the places table by
+`create_all` and by migration on existing databases.
+
+The R*Tree stores 32-bit floats rounded outwards, and a circle is looked
+up through the boxes that cover it, so the index only prefilters:
+callers refine the candidates on the exact columns (`haversine_km`).
+"""
+
+import math
+from sqlalchemy import DDL, column, event, table, text
+from app.models.place import Place
+
+RTREE_TABLE = 'places_rtree'
+KEYS_TABLE = 'places_rtree_keys'
+
+# Mean Earth radius (IUGG), in km
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# Columns of the R*Tree, for Core statements (not part of the metadata)
+places_rtree = table(RTREE_TABLE, column('id'), column('min_lat'), column('max_lat'),
+                     column('min_lng'), column('max_lng'))
+places_rtree_keys = table(KEYS_TABLE, column('rtree_id'), column('place_id'))
+
+# R*Tree key of the place a trigger fires for
+_NEW_KEY = f'(SELECT rtree_id FROM {KEYS_TABLE} WHERE place_id = new.id)'
+_OLD_KEY = f'(SELECT rtree_id FROM {KEYS_TABLE} WHERE place_id = old.id)'
+
+RTREE_DDL = [
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE} '
+    'USING rtree(id, min_lat, max_lat, min_lng, max_lng)',
+    f'CREATE TABLE IF NOT EXISTS {KEYS_TABLE} ('
+    ' rtree_id INTEGER PRIMARY KEY,'
+    ' place_id BLOB NOT NULL UNIQUE)',
+    f'CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_insert AFTER INSERT ON places BEGIN '
+    f' INSERT INTO {KEYS_TABLE} (place_id) VALUES (new.id); '
+    f' INSERT INTO {RTREE_TABLE} VALUES '
+    f' ({_NEW_KEY}, new.latitude, new.latitude, new.longitude, new.longitude); '
+    'END',
+    f'CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_update '
+    'AFTER UPDATE OF latitude, longitude ON places BEGIN '
+    f' UPDATE {RTREE_TABLE} SET min_lat = new.latitude, max_lat = new.latitude,'
+    f'  min_lng = new.longitude, max_lng = new.longitude WHERE id = {_NEW_KEY}; '
+    'END',
+    f'CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_update_id AFTER UPDATE OF id ON places BEGIN '
+    f' UPDATE {KEYS_TABLE} SET place_id = new.id WHERE place_id = old.id; '
+    'END',
+    f'CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_delete AFTER DELETE ON places BEGIN '
+    f' DELETE FROM {RTREE_TABLE} WHERE id = {_OLD_KEY}; '
+    f' DELETE FROM {KEYS_TABLE} WHERE place_id = old.id; '
+    'END',
+]
+
+# Triggers of the first version, which keyed the R*Tree on places.rowid
+_ROWID_TRIGGERS = [f'{RTREE_TABLE}_insert', f'{RTREE_TABLE}_update', f'{RTREE_TABLE}_delete']
+
+for _statement in RTREE_DDL:
+    event.listen(Place.__table__, 'after_create',
+                 DDL(_statement).execute_if(dialect='sqlite'))
+
+
+def rebuild_rtree(conn):
+    """
+    Create the R*Tree, its key table and triggers, and reload every place.
+
+    Triggers left by an older version of the index are replaced.
+
+    Args:
+        conn (Connection): An open connection to an SQLite database.
+    """
+    for name in _ROWID_TRIGGERS:
+        conn.execute(text(f'DROP TRIGGER IF EXISTS {name}'))
+    for statement in RTREE_DDL:
+        conn.execute(text(statement))
+    conn.execute(text(f'DELETE FROM {RTREE_TABLE}'))
+    conn.execute(text(f'DELETE FROM {KEYS_TABLE}'))
+    conn.execute(text(f'INSERT INTO {KEYS_TABLE} (place_id) SELECT id FROM places'))
+    conn.execute(text(
+        f'INSERT INTO {RTREE_TABLE} '
+        'SELECT rtree_id, latitude, latitude, longitude, longitude '
+        f'FROM {KEYS_TABLE} JOIN places ON places.id = {KEYS_TABLE}.place_id'))
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance between two points.
+
+    Args:
+        lat1, lng1 (float): First point, in degrees.
+        lat2, lng2 (float): Second point, in degrees.
+
+    Returns:
+        float: Distance in km.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def split_bbox(south, west, north, east):
+    """
+    Boxes covering a bounding box, split where it crosses the antimeridian.
+
+    Args:
+        south, west, north, east (float): Box edges in degrees; `west`
+            greater than `east` means the box crosses longitude 180.
+
+    Returns:
+        list: (south, west, north, east) tuples with west <= east.
+    """
+    if west <= east:
+        return [(south, west, north, east)]
+    return [(south, west, north, 180.0), (south, -180.0, north, east)]
+
+
+def radius_bboxes(lat, lng, radius_km):
+    """
+    Boxes covering every point within a distance of a center.
+
+    The box spans the whole longitude range when the circle reaches a
+    pole, and is split when it crosses the antimeridian.
+
+    Args:
+        lat, lng (float): Center, in degrees.
+        radius_km (float): Radius, in km.
+
+    Returns:
+        list: (south, west, north, east) tuples with west <= east.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    if south == -90.0 or north == 90.0:
+        return [(south, -180.0, north, 180.0)]
+    # Widest longitude span of the circle, reached at latitude asin(sin(lat) / cos(r))
+    angle = radius_km / EARTH_RADIUS_KM
+    ratio = math.sin(angle) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return [(south, -180.0, north, 180.0)]
+    dlng = math.degrees(math.asin(ratio))
+    west, east = lng - dlng, lng + dlng
+    if west < -180.0:
+        west += 360.0
+    if east > 180.0:
+        east -= 360.0
+    return split_bbox(south, west, north, east)
@@ -0,0 +1,54 @@
+"""
+SQLite connection tuning for the HBnB application.
+
+`init_app` runs the PRAGMA statements listed in the SQLITE_PRAGMAS config
+key on every new connection the application's engines open. Most SQLite
+settings (synchronous, cache_size, busy_timeout, foreign_keys...) are
+per connection, so they must be applied on connect rather than once.
+"""
+
+from sqlalchemy import event
+from app.extensions import db
+
+
+def apply_pragmas(engine, pragmas):
+    """
+    Run the given PRAGMA statements on every new connection of an engine.
+
+    Non-SQLite engines are left untouched.
+
+    Args:
+        engine (Engine): A synchronous engine (use `sync_engine` for an
+            AsyncEngine).
+        pragmas (dict): PRAGMA name mapped to its value.
+    """
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def init_app(app):
+    """
+    Apply SQLITE_PRAGMAS to every new connection of the app's engines.
+
+    Does nothing when the setting is empty; non-SQLite engines are skipped.
+
+    Args:
+        app (Flask): The configured application.
+    """
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    if not pragmas:
+        return
+    # The primary and, when configured, the read replica
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        apply_pragmas(engine, pragmas)
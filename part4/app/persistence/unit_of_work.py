@@ -0,0 +1,182 @@
+"""
+Unit of work for the SQLAlchemy repositories.
+
+A unit of work groups every repository write made inside it into a single
+transaction on `db.session`: writes are only staged (SQLAlchemy autoflush
+sends them to the database when a later query needs them) and the
+outermost unit commits once on success or rolls everything back on error.
+Nested units join the outermost one.
+
+`init_app` opens a unit of work around every API request, so a request
+performs at most one commit. Outside a request (scripts, shell), the
+facade methods open their own unit of work.
+
+Usage:
+    with UnitOfWork():
+        user_repo.add(user)
+        place_repo.add(place)   # both rows committed together
+"""
+
+import logging
+from contextlib import ContextDecorator
+from flask import g, jsonify
+from app.extensions import db
+from app.persistence.replica import stick_to_primary
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWork(ContextDecorator):
+    """
+    Context manager (and decorator) delimiting one database transaction.
+
+    The nesting depth lives in `flask.g`, so one instance can be shared
+    between threads and reused as a method decorator. Entering a unit
+    means the request is about to write, so its later reads go to the
+    primary database rather than the read replica.
+    """
+
+    def __enter__(self):
+        g.uow_depth = g.get('uow_depth', 0) + 1
+        stick_to_primary()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        g.uow_depth -= 1
+        if exc_type is not None:
+            g.uow_rollback_only = True
+        if g.uow_depth == 0:
+            finish(success=exc_type is None)
+        return False
+
+
+def in_unit_of_work():
+    """
+    Tell whether a unit of work is currently open.
+
+    Returns:
+        bool: True inside a unit of work.
+    """
+    return g.get('uow_depth', 0) > 0
+
+
+def commit():
+    """
+    Commit the session, or defer to the enclosing unit of work.
+
+    Repositories call this after staging a write; inside a unit of work
+    the single commit happens when the outermost unit ends.
+    """
+    if not in_unit_of_work():
+        db.session.commit()
+        forget_written(committed=True)
+
+
+def flush():
+    """
+    Send staged writes to the database without committing.
+
+    Only needed when a constraint violation must surface at the call site
+    instead of at the final commit.
+    """
+    db.session.flush()
+
+
+def flush_and_refresh(obj):
+    """
+    Flush, then re-read the columns of an object from the database.
+
+    Facade write methods return objects that the API serializes before
+    the request's unit of work commits. Refreshing them first shows what
+    the database stored: foreign keys set through relationships, values
+    converted by the column type (a price of 12 reads back as 12.0) and
+    `updated_at`. Objects outside the session, such as the detached rows
+    of a write-behind repository, are returned unchanged.
+
+    Args:
+        obj: A mapped object.
+
+    Returns:
+        The same object.
+    """
+    db.session.flush()
+    if obj in db.session:
+        db.session.refresh(obj, attribute_names=[
+            attr.key for attr in obj.__mapper__.column_attrs])
+    return obj
+
+
+def finish(success=True):
+    """
+    End the current transaction: commit on success, roll back otherwise.
+
+    Args:
+        success (bool): False forces a rollback.
+
+    Raises:
+        Exception: Whatever the commit raised, after rolling back.
+    """
+    rollback_only = g.pop('uow_rollback_only', False)
+    if not success or rollback_only:
+        db.session.rollback()
+        forget_written(committed=False)
+        return
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        forget_written(committed=False)
+        raise
+    forget_written(committed=True)
+
+
+def forget_written(committed):
+    """
+    Clear the entity cache keys written by the transaction (see
+    SQLAlchemyRepository.invalidate).
+
+    After a commit the keys are dropped from their caches once more: a
+    concurrent request may have cached the old row between the write and
+    the commit.
+
+    Args:
+        committed (bool): Whether the transaction was committed.
+    """
+    written = g.pop('cache_written', {})
+    if committed:
+        for (_, obj_id), cache in written.items():
+            cache.delete(obj_id)
+
+
+def init_app(app):
+    """
+    Wrap every request of the application in one unit of work.
+
+    Responses with a status code of 400 or more roll the transaction back.
+
+    Args:
+        app (Flask): The application to hook.
+    """
+
+    @app.before_request
+    def _begin_request_unit_of_work():
+        g.uow_depth = 1
+
+    @app.after_request
+    def _finish_request_unit_of_work(response):
+        if g.get('uow_depth', 0) != 1:
+            return response
+        g.uow_depth = 0
+        try:
+            finish(success=response.status_code < 400)
+        except Exception:
+            logger.exception("Commit failed at the end of the request")
+            response = jsonify({'error': 'Internal server error'})
+            response.status_code = 500
+        return response
+
+    @app.teardown_request
+    def _discard_request_unit_of_work(exc):
+        if g.pop('uow_depth', 0):
+            g.pop('uow_rollback_only', None)
+            db.session.rollback()
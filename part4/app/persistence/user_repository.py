@@ -1,3 +1,4 @@
+from sqlalchemy import func
 from app.models.user import User
 from app.persistence.repository import SQLAlchemyRepository
 
@@ -6,4 +7,8 @@ class UserRepository(SQLAlchemyRepository):
         super().__init__(User)
 
     def get_user_by_email(self, email):
-        return self.model.query.filter_by(email=email).first()
+        # Stays on the primary: a login right after sign-up must find the
+        # account even if the replica has not caught up yet
+        # Case-insensitive, served by the unique lower(email) index
+        return self._query().filter(
+            func.lower(self.model.email) == email.lower()).first()
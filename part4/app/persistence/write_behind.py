@@ -0,0 +1,460 @@
+"""
+Durable write-behind queue persisting repository writes in the background.
+
+A write is acknowledged once its record is appended to a journal on
+disk; a background thread then applies the queued records to the
+database in batches, one transaction per batch. Records are applied in
+the order they were queued, so the writes of an entity reach the
+database in the order they were acknowledged.
+
+The journal is a sequence of segment files of JSON lines
+(`journal-<first seq>.log`); a segment is deleted once every record in
+it is in the database. After a crash, `recover()` queues the records
+still in the journal again: puts are upserts of the whole row and
+deletes ignore missing rows, so records applied twice are harmless.
+
+A record the database rejects (e.g. a foreign key to a row not
+committed yet) is retried after a delay doubling from RETRY_DELAY,
+holding back the later records of the same entity, and written to
+`rejected.log` after MAX_ATTEMPTS failures. The `on_reject` callbacks
+then let in-memory copies of the row go back to what the database holds.
+
+Usage:
+    queue = WriteBehindQueue('instance/write-behind', db.engine).start()
+    queue.put(Review.__table__, {'id': ..., 'text': ..., ...})
+    queue.delete(Review.__table__, review_id)
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from sqlalchemy import DateTime, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models.base_model import serialize_row
+
+logger = logging.getLogger(__name__)
+
+PUT = 'put'
+DELETE = 'delete'
+
+# A new journal segment is started past this size (bytes)
+SEGMENT_SIZE = 4 * 1024 * 1024
+
+# Failed applications of a record before it is moved to rejected.log
+MAX_ATTEMPTS = 5
+
+# Seconds before the first retry of a failed record, doubled on each failure
+RETRY_DELAY = 0.5
+
+
+class Record:
+    """One queued write: the whole row for a put, its ID for a delete."""
+
+    __slots__ = ('seq', 'table', 'op', 'id', 'row', 'attempts', 'retry_at')
+
+    def __init__(self, seq, table, op, obj_id, row=None):
+        self.seq = seq
+        self.table = table
+        self.op = op
+        self.id = obj_id
+        self.row = row
+        self.attempts = 0
+        # time.monotonic() before which the record is not retried
+        self.retry_at = 0
+
+    def to_json(self):
+        return json.dumps({'seq': self.seq, 'table': self.table.name, 'op': self.op,
+                           'id': self.id, 'row': serialize_row(self.row or {})})
+
+    @classmethod
+    def from_json(cls, line, tables):
+        data = json.loads(line)
+        table = tables[data['table']]
+        row = data['row'] or None
+        if row is not None:
+            # The journal stores datetimes as ISO 8601 strings
+            for column in table.columns:
+                value = row.get(column.name)
+                if isinstance(column.type, DateTime) and isinstance(value, str):
+                    row[column.name] = datetime.fromisoformat(value)
+        return cls(data['seq'], table, data['op'], data['id'], row)
+
+
+class WriteBehindQueue:
+    """
+    Journaled queue of writes applied to the database by a background thread.
+
+    Attributes:
+        directory (str): Directory holding the journal segments.
+        batch_size (int): Maximum number of records per transaction.
+        interval (float): Seconds the flusher waits for more records
+            before applying a partial batch.
+        fsync (bool): Whether every append is forced to disk; without it
+            a process crash loses nothing, an OS crash the last writes.
+        flushed (int): Records applied to the database.
+        rejected (int): Records given up after MAX_ATTEMPTS failures.
+    """
+
+    def __init__(self, directory, engine, tables=(), batch_size=500,
+                 interval=0.05, fsync=True):
+        """
+        Create a queue; `recover()` and `start()` must follow.
+
+        Args:
+            directory (str): Journal directory, created when missing.
+            engine (Engine): SQLite engine the records are applied to.
+            tables (iterable): Tables whose records may be in the journal.
+            batch_size (int): Maximum records per transaction.
+            interval (float): Batching delay in seconds.
+            fsync (bool): Force every journal append to disk.
+
+        Raises:
+            RuntimeError: If the engine is not a SQLite one.
+        """
+        if engine.dialect.name != 'sqlite':
+            raise RuntimeError("The write-behind queue requires a SQLite database")
+        self.directory = directory
+        self.engine = engine
+        self.tables = {table.name: table for table in tables}
+        self.batch_size = batch_size
+        self.interval = interval
+        self.fsync = fsync
+        self.flushed = 0
+        self.rejected = 0
+        self._pending = deque()
+        self._seq = 0
+        # Guards the journal and the queue; flushes wait on it
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # Held while a batch is applied (see `paused`)
+        self._flush_lock = threading.Lock()
+        self._segments = []
+        self._journal = None
+        self._thread = None
+        self._stopping = False
+        self._reject_callbacks = []
+
+    def _segment_path(self, first_seq):
+        return os.path.join(self.directory, f'journal-{first_seq:020d}.log')
+
+    def recover(self):
+        """
+        Queue again the records left in the journal by the last run.
+
+        A torn last line (crash during an append) is dropped.
+
+        Returns:
+            WriteBehindQueue: self, for chaining.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith('journal-') and name.endswith('.log'))
+        for name in names:
+            path = os.path.join(self.directory, name)
+            self._segments.append([path, 0])
+            with open(path, 'rb') as journal:
+                data = journal.read()
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                record = Record.from_json(line, self.tables)
+                self._pending.append(record)
+                self._segments[-1][1] = record.seq
+                self._seq = max(self._seq, record.seq)
+            if end < len(data):
+                logger.warning("Dropping a torn record at the end of %s", path)
+                with open(path, 'r+b') as journal:
+                    journal.truncate(end)
+        return self
+
+    def start(self):
+        """
+        Open a new journal segment and start the flusher thread.
+
+        Returns:
+            WriteBehindQueue: self, for chaining.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._open_segment()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='write-behind')
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def _open_segment(self):
+        if self._journal is not None:
+            self._journal.close()
+        path = self._segment_path(self._seq + 1)
+        self._journal = open(path, 'ab', buffering=0)
+        if not self._segments or self._segments[-1][0] != path:
+            self._segments.append([path, self._seq])
+
+    def put(self, table, row):
+        """
+        Queue the insertion or replacement of a row.
+
+        Args:
+            table (Table): Table of the row.
+            row (dict): Every column value of the row, `id` included.
+        """
+        self._append(table, PUT, row['id'], dict(row))
+
+    def delete(self, table, obj_id):
+        """
+        Queue the deletion of a row.
+
+        Args:
+            table (Table): Table of the row.
+            obj_id (str): ID of the row.
+        """
+        self._append(table, DELETE, obj_id)
+
+    def _append(self, table, op, obj_id, row=None):
+        with self._lock:
+            self._seq += 1
+            record = Record(self._seq, table, op, obj_id, row)
+            self._journal.write(record.to_json().encode('utf-8') + b'\n')
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._segments[-1][1] = record.seq
+            self._pending.append(record)
+            if os.fstat(self._journal.fileno()).st_size > SEGMENT_SIZE:
+                self._open_segment()
+            self._wakeup.notify()
+
+    def pending(self, table=None):
+        """
+        Records not applied to the database yet, oldest first.
+
+        Args:
+            table (Table, optional): Only return the records of this table.
+
+        Returns:
+            list: Pending Record objects.
+        """
+        with self._lock:
+            return [record for record in self._pending
+                    if table is None or record.table is table]
+
+    def on_reject(self, callback):
+        """
+        Call `callback(record)` for every record given up after MAX_ATTEMPTS.
+
+        Callbacks run during the flush, before the record leaves the queue
+        (`pending()` still lists it), so they must not wait on `paused()`.
+
+        Args:
+            callback (callable): Receives the rejected Record.
+        """
+        self._reject_callbacks.append(callback)
+
+    def paused(self):
+        """
+        Context manager holding back the flusher, e.g. while reading a table
+        and the pending records of it that must be laid on top.
+        """
+        return self._flush_lock
+
+    def stats(self):
+        """
+        Report the queue counters.
+
+        Returns:
+            dict: Pending, flushed and rejected record counts.
+        """
+        with self._lock:
+            pending = len(self._pending)
+        return {'pending': pending, 'flushed': self.flushed, 'rejected': self.rejected}
+
+    def drain(self, timeout=None):
+        """
+        Wait until every queued record is applied or rejected.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the queue is empty.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return True
+                self._wakeup.notify()
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(min(self.interval, 0.01) or 0.001)
+
+    def close(self, timeout=10):
+        """
+        Apply what is queued (within `timeout`) and stop the flusher.
+
+        Records still queued stay in the journal for the next `recover()`.
+        """
+        if self._thread is None:
+            return
+        self.drain(timeout)
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify()
+        self._thread.join(timeout)
+        self._thread = None
+        with self._lock:
+            self._journal.close()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending and not self._stopping:
+                    self._wakeup.wait()
+                if self._stopping:
+                    return
+            # Let a burst of writes accumulate into one transaction
+            if len(self._pending) < self.batch_size and self.interval:
+                time.sleep(self.interval)
+            try:
+                done = self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed")
+                done = 0
+            if not done:
+                # Only held-back records are left: retry them later
+                time.sleep(self.interval or 0.1)
+
+    def flush(self):
+        """
+        Apply up to `batch_size` queued records in one transaction.
+
+        Returns:
+            int: Number of records applied or rejected.
+        """
+        with self._flush_lock:
+            rejected = []
+            with self._lock:
+                batch = self._due()
+            if not batch:
+                return 0
+            try:
+                with self.engine.begin() as connection:
+                    self._apply(connection, batch)
+                done = batch
+            except Exception:
+                logger.warning("Write-behind batch failed, applying its records one by one",
+                               exc_info=True)
+                done = self._apply_each(batch, rejected)
+            for record in rejected:
+                for callback in self._reject_callbacks:
+                    try:
+                        callback(record)
+                    except Exception:
+                        logger.exception("Write-behind reject callback failed")
+            self._finish(done)
+            return len(done)
+
+    def _due(self):
+        """
+        Up to `batch_size` queued records ready to be applied, oldest first.
+
+        A record waiting for its retry holds back the later records of the
+        same entity.
+        """
+        now = time.monotonic()
+        batch = []
+        waiting = set()
+        for record in self._pending:
+            key = (record.table.name, record.id)
+            if key in waiting:
+                continue
+            if record.retry_at > now:
+                waiting.add(key)
+                continue
+            batch.append(record)
+            if len(batch) == self.batch_size:
+                break
+        return batch
+
+    def _apply(self, connection, records):
+        """Run the records in order, one executemany per run of alike records."""
+        start = 0
+        while start < len(records):
+            first = records[start]
+            end = start + 1
+            while (end < len(records) and records[end].table is first.table
+                   and records[end].op == first.op):
+                end += 1
+            run = records[start:end]
+            table = first.table
+            if first.op == PUT:
+                stmt = sqlite_insert(table)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.id],
+                    set_={column.name: stmt.excluded[column.name]
+                          for column in table.columns if column.name != 'id'})
+                connection.execute(stmt, [record.row for record in run])
+            else:
+                connection.execute(delete(table).where(
+                    table.c.id.in_([record.id for record in run])))
+            start = end
+
+    def _apply_each(self, batch, rejected):
+        """
+        Apply records one per transaction after a batch failed.
+
+        A failed record holds back the later records of the same entity,
+        so they are retried in order with it once its retry delay is over.
+
+        Args:
+            batch (list): Records to apply.
+            rejected (list): Receives the records given up.
+
+        Returns:
+            list: The records applied or rejected.
+        """
+        done = []
+        blocked = set()
+        for record in batch:
+            key = (record.table.name, record.id)
+            if key in blocked:
+                continue
+            try:
+                with self.engine.begin() as connection:
+                    self._apply(connection, [record])
+                done.append(record)
+            except Exception as e:
+                record.attempts += 1
+                if record.attempts < MAX_ATTEMPTS:
+                    record.retry_at = (time.monotonic()
+                                       + RETRY_DELAY * 2 ** (record.attempts - 1))
+                    blocked.add(key)
+                    continue
+                logger.error("Rejecting write-behind record %s %s %s: %s",
+                             record.op, record.table.name, record.id, e)
+                with open(os.path.join(self.directory, 'rejected.log'), 'ab') as log:
+                    log.write(record.to_json().encode('utf-8') + b'\n')
+                self.rejected += 1
+                rejected.append(record)
+                done.append(record)
+        return done
+
+    def _finish(self, done):
+        """Unqueue applied records and delete the segments fully applied."""
+        done_ids = {id(record) for record in done}
+        with self._lock:
+            self._pending = deque(record for record in self._pending
+                                  if id(record) not in done_ids)
+            self.flushed += len(done)
+            oldest = self._pending[0].seq if self._pending else self._seq + 1
+            while len(self._segments) > 1 and self._segments[0][1] < oldest:
+                path, _ = self._segments.pop(0)
+                os.remove(path)
+            if not self._pending and os.fstat(self._journal.fileno()).st_size:
+                # Everything is applied: start the current segment afresh
+                self._journal.truncate(0)
+                self._segments[-1][1] = self._seq
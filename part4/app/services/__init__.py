@@ -7,6 +7,10 @@ user, place, review, and amenity operations.
 """
 
 from app.services.facade import HBnBFacade
+from app.services.async_facade import AsyncHBnBFacade
 
 # Single facade instance for the HBnB business logic layer
 facade = HBnBFacade()
+
+# Asyncio variant, for use from async servers (see app.persistence.async_db)
+async_facade = AsyncHBnBFacade()
@@ -0,0 +1,622 @@
+"""
+Implements the AsyncHBnBFacade class, the asyncio variant of HBnBFacade.
+
+Every method of HBnBFacade has a coroutine counterpart with the same name,
+arguments and results, backed by the async repositories. Objects are
+returned with the relationships their `to_dict` needs already loaded, as
+lazy loading is not available under asyncio.
+"""
+
+import asyncio
+from sqlalchemy.exc import IntegrityError
+from app.persistence.async_db import AsyncUnitOfWork
+from app.persistence.repository import violates_unique
+from app.persistence.async_repository import (AsyncAmenityRepository,
+                                              AsyncPlaceRepository,
+                                              AsyncReviewRepository,
+                                              AsyncUserRepository)
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.services.facade import HBnBFacade
+
+
+class AsyncHBnBFacade:
+    """
+    Asyncio facade for HBnB business logic.
+
+    Every write method runs in an AsyncUnitOfWork: all of its repository
+    writes share one transaction of the calling task's session.
+
+    Attributes:
+        user_repo (AsyncUserRepository): Storage for User objects.
+        place_repo (AsyncPlaceRepository): Storage for Place objects.
+        review_repo (AsyncReviewRepository): Storage for Review objects.
+        amenity_repo (AsyncAmenityRepository): Storage for Amenity objects.
+    """
+
+    # Same validation as the synchronous facade
+    _check_batch = staticmethod(HBnBFacade._check_batch)
+
+    def __init__(self):
+        """
+        Initialize all repositories for each entity type.
+        """
+        self.user_repo = AsyncUserRepository()
+        self.place_repo = AsyncPlaceRepository()
+        self.review_repo = AsyncReviewRepository()
+        self.amenity_repo = AsyncAmenityRepository()
+
+    @AsyncUnitOfWork()
+    async def create_user(self, user_data):
+        """
+        Create and store a new User.
+
+        Args:
+            user_data (dict): Attributes for User initialization.
+
+        Returns:
+            User: The newly created User object.
+
+        Raises:
+            ValueError: If the email is already registered (in any case).
+        """
+        user = User(
+            first_name=user_data['first_name'],
+            last_name=user_data['last_name'],
+            email=user_data['email'],
+            is_admin=user_data.get('is_admin', False)
+        )
+        # bcrypt is CPU-bound: keep it off the event loop
+        await asyncio.to_thread(user.hash_password, user_data['password'])
+        await self.user_repo.add(user)
+        try:
+            await self.user_repo.session.flush()
+        except IntegrityError as error:
+            if violates_unique(error, User.__table__, 'ux_users_email_lower'):
+                raise ValueError("Email already registered")
+            raise
+        return user
+
+    async def get_user(self, user_id):
+        """
+        Retrieve a User by ID.
+
+        Args:
+            user_id (str): ID of the user to retrieve.
+
+        Returns:
+            User or None: The User or None if not found.
+        """
+        return await self.user_repo.get(user_id)
+
+    async def get_user_by_email(self, email):
+        """
+        Retrieve a User by their email address.
+
+        Args:
+            email (str): Email to search for.
+
+        Returns:
+            User or None: The User matching the email or None.
+        """
+        return await self.user_repo.get_user_by_email(email)
+
+    async def get_all_users(self):
+        """
+        Retrieve all stored users.
+
+        Returns:
+            list: All User objects.
+        """
+        return await self.user_repo.get_all()
+
+    async def get_users_page(self, limit, cursor=None):
+        """
+        Retrieve one page of users using keyset pagination.
+
+        Args:
+            limit (int): Maximum number of users to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of User objects, next cursor or None).
+        """
+        return await self.user_repo.get_page(limit, cursor)
+
+    @AsyncUnitOfWork()
+    async def update_user(self, user_id, new_data):
+        """
+        Update an existing User's attributes.
+
+        Args:
+            user_id (str): ID of the user to update.
+            new_data (dict): Attributes to update.
+
+        Returns:
+            User or None: Updated User or None if not found.
+
+        Raises:
+            ValueError: If the new email belongs to another user.
+        """
+        user = await self.user_repo.get(user_id)
+        if not user:
+            return None
+
+        for key, value in new_data.items():
+            if hasattr(user, key):
+                if key == 'password':
+                    await asyncio.to_thread(user.hash_password, value)
+                else:
+                    setattr(user, key, value)
+
+        try:
+            await self.user_repo.session.flush()
+        except IntegrityError as error:
+            if violates_unique(error, User.__table__, 'ux_users_email_lower'):
+                raise ValueError("Email already in use")
+            raise
+        return user
+
+    @AsyncUnitOfWork()
+    async def create_amenity(self, amenity_data):
+        """
+        Create and store a new Amenity.
+
+        Args:
+            amenity_data (dict): Attributes for Amenity init.
+
+        Returns:
+            Amenity: The newly created Amenity.
+        """
+        amenity = Amenity(**amenity_data)
+        await self.amenity_repo.add(amenity)
+        return amenity
+
+    @AsyncUnitOfWork()
+    async def create_amenities(self, amenities_data):
+        """
+        Create several Amenities and store the valid ones in one transaction.
+
+        Args:
+            amenities_data (list): One attribute dict per Amenity.
+
+        Returns:
+            list: One (Amenity, None) or (None, error message) pair per item.
+
+        Raises:
+            ValueError: If the batch is too large or violates a constraint.
+        """
+        self._check_batch(amenities_data)
+        results = []
+        for amenity_data in amenities_data:
+            try:
+                results.append((Amenity(**amenity_data), None))
+            except (TypeError, ValueError) as e:
+                results.append((None, str(e)))
+        await self._add_batch(self.amenity_repo, results)
+        return results
+
+    async def get_amenity(self, amenity_id):
+        """
+        Retrieve an Amenity by ID.
+
+        Args:
+            amenity_id (str): ID of the amenity.
+
+        Returns:
+            Amenity or None: The Amenity or None if not found.
+        """
+        return await self.amenity_repo.get(amenity_id)
+
+    async def get_all_amenities(self):
+        """
+        Retrieve all stored amenities.
+
+        Returns:
+            list: All Amenity objects.
+        """
+        return await self.amenity_repo.get_all()
+
+    async def get_amenities_page(self, limit, cursor=None):
+        """
+        Retrieve one page of amenities using keyset pagination.
+
+        Args:
+            limit (int): Maximum number of amenities to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of Amenity objects, next cursor or None).
+        """
+        return await self.amenity_repo.get_page(limit, cursor)
+
+    async def get_amenity_rows(self, limit=None, cursor=None):
+        """
+        Retrieve amenities as plain dicts (id and name) without ORM objects.
+
+        Args:
+            limit (int, optional): Page size; None returns every amenity.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of dicts, next cursor or None).
+        """
+        return await self.amenity_repo.get_all_rows(['id', 'name'], limit, cursor)
+
+    @AsyncUnitOfWork()
+    async def update_amenity(self, amenity_id, amenity_data):
+        """
+        Update an existing Amenity's attributes.
+
+        Args:
+            amenity_id (str): ID of the amenity to update.
+            amenity_data (dict): Attributes to update.
+
+        Returns:
+            Amenity or None: Updated Amenity or None if not found.
+        """
+        amenity = await self.amenity_repo.get(amenity_id)
+        if not amenity:
+            return None
+        for key, value in amenity_data.items():
+            if hasattr(amenity, key):
+                setattr(amenity, key, value)
+        return amenity
+
+    @AsyncUnitOfWork()
+    async def create_place(self, place_data):
+        """
+        Create a new place.
+
+        Args:
+            place_data (dict): Dictionary with place details including owner_id.
+
+        Returns:
+            Place: The newly created Place.
+
+        Raises:
+            ValueError: If specified owner is not found.
+        """
+        owner_id = place_data.pop('owner_id')
+        amenities_data = place_data.pop('amenities', [])
+
+        owner = await self.get_user(owner_id)
+        if not owner:
+            raise ValueError("Owner not found")
+
+        # Looked up before the Place exists, so autoflush cannot see it half-built
+        amenities = await self.amenity_repo.get_amenities_by_names(amenities_data)
+        place = Place(owner=owner, **place_data)
+
+        for amenity_name in amenities_data:
+            if amenity_name not in amenities:
+                amenities[amenity_name] = Amenity(name=amenity_name)
+            place.add_amenity(amenities[amenity_name])
+
+        await self.place_repo.add(place)
+        return place
+
+    @AsyncUnitOfWork()
+    async def create_places(self, places_data, owner_id):
+        """
+        Create several places for one owner in a single transaction.
+
+        Args:
+            places_data (list): One place dict per item (owner_id is ignored).
+            owner_id (str): ID of the user owning every place.
+
+        Returns:
+            list: One (Place, None) or (None, error message) pair per item.
+
+        Raises:
+            ValueError: If the owner is not found, the batch is too large
+                or it violates a constraint.
+        """
+        self._check_batch(places_data)
+        owner = await self.get_user(owner_id)
+        if not owner:
+            raise ValueError("Owner not found")
+
+        names = [name for data in places_data if isinstance(data, dict)
+                 for name in data.get('amenities') or []
+                 if isinstance(name, str)]
+        amenities = await self.amenity_repo.get_amenities_by_names(names)
+
+        results = []
+        for place_data in places_data:
+            try:
+                place_data = dict(place_data)
+                place_data.pop('owner_id', None)
+                place_amenities = []
+                for name in place_data.pop('amenities', None) or []:
+                    if name not in amenities:
+                        amenities[name] = Amenity(name=name)
+                    place_amenities.append(amenities[name])
+                place = Place(owner=owner, **place_data)
+                for amenity in place_amenities:
+                    place.add_amenity(amenity)
+                results.append((place, None))
+            except (TypeError, ValueError) as e:
+                results.append((None, str(e)))
+        await self._add_batch(self.place_repo, results)
+        return results
+
+    @staticmethod
+    async def _add_batch(repo, results):
+        """Store the valid objects of a batch with one commit."""
+        try:
+            await repo.add_many([obj for obj, error in results if obj is not None])
+        except IntegrityError:
+            raise ValueError(
+                "Batch violates a database constraint; nothing was saved")
+
+    async def get_place(self, place_id):
+        """
+        Retrieve a Place by ID with its amenities loaded.
+
+        Args:
+            place_id (str): ID of the place to retrieve.
+
+        Returns:
+            Place or None: The Place or None if not found.
+        """
+        return await self.place_repo.get(place_id, load=self.place_repo.default_load)
+
+    async def place_exists(self, place_id):
+        """
+        Check whether a Place exists, without loading it.
+
+        Args:
+            place_id (str): ID of the place.
+
+        Returns:
+            bool: True if the place exists.
+        """
+        return await self.place_repo.exists(place_id)
+
+    async def get_place_details(self, place_id):
+        """
+        Retrieve a Place by ID with its owner and amenities loaded.
+
+        Args:
+            place_id (str): ID of the place to retrieve.
+
+        Returns:
+            Place or None: The Place or None if not found.
+        """
+        return await self.place_repo.get(place_id, load=self.place_repo.detail_load)
+
+    async def get_all_places(self):
+        """
+        Retrieve all stored places.
+
+        Returns:
+            list: All Place objects.
+        """
+        return await self.place_repo.get_all()
+
+    async def get_places_page(self, limit, cursor=None):
+        """
+        Retrieve one page of places using keyset pagination.
+
+        Args:
+            limit (int): Maximum number of places to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of Place objects, next cursor or None).
+        """
+        return await self.place_repo.get_page(limit, cursor)
+
+    async def get_place_rows(self, limit=None, cursor=None, include_description=False):
+        """
+        Retrieve places as plain dicts, with their amenities, without ORM objects.
+
+        Args:
+            limit (int, optional): Page size; None returns every place.
+            cursor (str, optional): Cursor returned with the previous page.
+            include_description (bool): Also read the description column.
+
+        Returns:
+            tuple: (list of dicts shaped like Place.to_dict, next cursor or None).
+        """
+        columns = None
+        if include_description:
+            columns = [column.name for column in Place.__table__.columns]
+        rows, next_cursor = await self.place_repo.get_all_rows(columns, limit, cursor)
+        amenities = await self.place_repo.get_amenity_rows(row['id'] for row in rows)
+        for row in rows:
+            row['amenities'] = amenities[row['id']]
+        return rows, next_cursor
+
+    @AsyncUnitOfWork()
+    async def update_place(self, place_id, place_data):
+        """
+        Update an existing Place's attributes.
+
+        Args:
+            place_id (str): ID of the place to update.
+            place_data (dict): Attributes to update.
+
+        Returns:
+            Place or None: Updated Place or None if not found.
+        """
+        place = await self.place_repo.get(place_id, load={'amenities': 'selectin'})
+        if not place:
+            return None
+
+        if 'amenities' in place_data:
+            amenities_data = place_data.pop('amenities')
+
+            place.amenities.clear()
+
+            for amenity_identifier in amenities_data:
+                amenity = await self.amenity_repo.get(amenity_identifier)
+
+                if not amenity:
+                    amenity = await self.amenity_repo.get_by_attribute(
+                        'name', amenity_identifier)
+
+                if not amenity:
+                    amenity = Amenity(name=amenity_identifier)
+                    await self.amenity_repo.add(amenity)
+
+                place.amenities.append(amenity)
+
+        for key, value in place_data.items():
+            if hasattr(place, key) and key != 'amenities':
+                setattr(place, key, value)
+
+        return place
+
+    @AsyncUnitOfWork()
+    async def create_review(self, review_data):
+        """
+        Create and store a new Review linked to User and Place.
+
+        Args:
+            review_data (dict): Includes 'user' and 'place' IDs and content.
+
+        Returns:
+            Review: The newly created Review.
+
+        Raises:
+            ValueError: If specified user or place is not found, or the
+                user already reviewed the place.
+        """
+        user_id = review_data.pop('user_id')
+        place_id = review_data.pop('place_id')
+        user = await self.get_user(user_id)
+        if not user:
+            raise ValueError("User not found")
+        place = await self.place_repo.get(place_id)
+        if not place:
+            raise ValueError("Place not found")
+        review = Review(user=user, place=place, **review_data)
+        await self.review_repo.add(review)
+        try:
+            # The unique (user_id, place_id) constraint rejects duplicates
+            await self.review_repo.session.flush()
+        except IntegrityError as error:
+            if violates_unique(error, Review.__table__, 'unique_review'):
+                raise ValueError("You have already reviewed this place.")
+            raise
+        return review
+
+    async def get_review(self, review_id):
+        """
+        Retrieve a Review by ID.
+
+        Args:
+            review_id (str): ID of the review to retrieve.
+
+        Returns:
+            Review or None: The Review or None if not found.
+        """
+        return await self.review_repo.get(review_id)
+
+    async def get_all_reviews(self):
+        """
+        Retrieve all stored reviews.
+
+        Returns:
+            list: All Review objects.
+        """
+        return await self.review_repo.get_all()
+
+    async def get_reviews_page(self, limit, cursor=None):
+        """
+        Retrieve one page of reviews using keyset pagination.
+
+        Args:
+            limit (int): Maximum number of reviews to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of Review objects, next cursor or None).
+        """
+        return await self.review_repo.get_page(limit, cursor)
+
+    async def get_review_rows(self, limit=None, cursor=None):
+        """
+        Retrieve reviews as plain dicts without ORM objects.
+
+        Args:
+            limit (int, optional): Page size; None returns every review.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of dicts, next cursor or None).
+        """
+        return await self.review_repo.get_all_rows(None, limit, cursor)
+
+    async def get_reviews_by_place(self, place_id):
+        """
+        Retrieve all reviews for a specific place.
+
+        Args:
+            place_id (str): ID of the place.
+
+        Returns:
+            list: Reviews linked to the given place.
+        """
+        reviews, _ = await self.review_repo.get_by_place(place_id)
+        return reviews
+
+    async def get_place_reviews_page(self, place_id, limit, cursor=None, order='asc'):
+        """
+        Retrieve one page of the reviews of a place, ordered by date.
+
+        Args:
+            place_id (str): ID of the place.
+            limit (int or None): Maximum number of reviews; None for all.
+            cursor (str, optional): Cursor returned with the previous page.
+            order (str): 'asc' (oldest first) or 'desc' (newest first).
+
+        Returns:
+            tuple: (list of Review objects, next cursor or None).
+        """
+        return await self.review_repo.get_by_place(place_id, limit, cursor, order)
+
+    @AsyncUnitOfWork()
+    async def update_review(self, review_id, review_data):
+        """
+        Update an existing Review's attributes.
+
+        Args:
+            review_id (str): ID of the review to update.
+            review_data (dict): Attributes to update.
+
+        Returns:
+            Review or None: Updated Review or None if not found.
+        """
+        review = await self.review_repo.get(review_id)
+        if not review:
+            return None
+        for key, value in review_data.items():
+            if hasattr(review, key):
+                setattr(review, key, value)
+        return review
+
+    @AsyncUnitOfWork()
+    async def delete_review(self, review_id):
+        """
+        Delete a Review by its ID.
+
+        Args:
+            review_id (str): ID of the review to delete.
+
+        Returns:
+            bool: True if deleted, False if not found.
+        """
+        review = await self.review_repo.get(review_id)
+        if not review:
+            return False
+        await self.review_repo.session.delete(review)
+        return True
+
+    async def get_review_by_user_and_place(self, user_id, place_id):
+        """Get review by user and place to check for duplicates."""
+        return await self.review_repo.get_by_user_and_place(user_id, place_id)
@@ -5,28 +5,50 @@ The facade provides methods to create, retrieve, update, and delete users,
 places, reviews, and amenities via in-memory repositories.
 """
 
-from app.persistence.repository import SQLAlchemyRepository
+import os
+from app.persistence.repository import SQLAlchemyRepository, violates_unique
 from app.persistence.user_repository import UserRepository
 from app.persistence.place_repository import PlaceRepository
-from app.persistence.review_repository import ReviewRepository
+from app.persistence.review_repository import CachedReviewRepository, ReviewRepository
 from app.persistence.amenity_repository import AmenityRepository
+from app.persistence.unit_of_work import UnitOfWork, flush, flush_and_refresh
+from app.persistence.cache import EntityCache
+from app.persistence.cached_repository import CachedRepository
+from app.persistence.write_behind import WriteBehindQueue
+from app.extensions import place_columns, place_knn
 from app.models.user import User
-from app.extensions import db
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
+from sqlalchemy.exc import IntegrityError
+
+# Maximum number of items accepted by a single batch call
+MAX_BATCH_SIZE = 1000
+
+# Largest set of candidates from the column index (PLACE_COLUMNS) that a
+# search hands to the database as an id list; broader filters stay SQL
+# predicates, which the (price, id) and owner indexes serve as well
+MAX_SEARCH_CANDIDATES = 5000
+
+# Tables whose repository has a write-behind variant
+WRITE_BEHIND_SUPPORTED = ('reviews',)
 
 
 class HBnBFacade:
     """
     Facade for HBnB business logic using in-memory repositories.
 
+    Every write method runs in a UnitOfWork: all of its repository writes
+    share one transaction, joined to the request's one when there is one.
+
     Attributes:
         user_repo (SQLAlchemyRepository): Storage for User objects.
         place_repo (SQLAlchemyRepository): Storage for Place objects.
         review_repo (SQLAlchemyRepository): Storage for Review objects.
         amenity_repo (SQLAlchemyRepository): Storage for Amenity objects.
+        write_behind (WriteBehindQueue): Queue persisting the writes of
+            the write-behind repositories, None when there are none.
     """
 
     def __init__(self):
@@ -37,7 +59,91 @@ class HBnBFacade:
         self.place_repo = PlaceRepository()
         self.review_repo = ReviewRepository()
         self.amenity_repo = AmenityRepository()
+        self.write_behind = None
+
+    def _repositories(self):
+        """Return every repository handled by the facade."""
+        return [self.user_repo, self.place_repo,
+                self.review_repo, self.amenity_repo]
+
+    def init_cache(self, config):
+        """
+        (Re)install the read-through entity caches from the app config.
+
+        Args:
+            config (dict): Reads ENTITY_CACHE_TTL and ENTITY_CACHE_SIZES,
+                the latter mapping table names to cache capacities.
+        """
+        ttl = config.get('ENTITY_CACHE_TTL', 60)
+        sizes = config.get('ENTITY_CACHE_SIZES') or {}
+        for repo in self._repositories():
+            if isinstance(repo, CachedRepository):
+                continue
+            capacity = sizes.get(repo.model.__tablename__, 0)
+            repo.cache = EntityCache(capacity, ttl) if capacity else None
+
+    def get_cache_stats(self):
+        """
+        Report hit/miss statistics of the entity caches.
+
+        Returns:
+            dict: Stats per table name, None where caching is disabled.
+        """
+        return {repo.model.__tablename__:
+                repo.cache.stats() if repo.cache is not None else None
+                for repo in self._repositories()}
+
+    def init_write_behind(self, config, engine, instance_path):
+        """
+        (Re)install the write-behind repositories from the app config.
+
+        The listed tables are served from memory and their writes return
+        once journaled; a background thread persists them.
+
+        Args:
+            config (dict): Reads WRITE_BEHIND_TABLES, WRITE_BEHIND_DIR
+                (relative to the instance folder), WRITE_BEHIND_BATCH_SIZE,
+                WRITE_BEHIND_INTERVAL and WRITE_BEHIND_FSYNC.
+            engine (Engine): Primary database engine.
+            instance_path (str): Instance folder of the application.
+
+        Raises:
+            ValueError: If a listed table does not support write-behind.
+        """
+        if self.write_behind is not None:
+            self.write_behind.close()
+            self.write_behind = None
+        if isinstance(self.review_repo, CachedRepository):
+            self.review_repo = self.review_repo.backend
+
+        tables = set(config.get('WRITE_BEHIND_TABLES') or ())
+        unsupported = tables - set(WRITE_BEHIND_SUPPORTED)
+        if unsupported:
+            raise ValueError(
+                f"Write-behind is not supported for: {', '.join(sorted(unsupported))}")
+        if not tables:
+            return
+        directory = os.path.join(instance_path, config.get('WRITE_BEHIND_DIR', 'write-behind'))
+        self.write_behind = WriteBehindQueue(
+            directory, engine, [Review.__table__],
+            batch_size=config.get('WRITE_BEHIND_BATCH_SIZE', 500),
+            interval=config.get('WRITE_BEHIND_INTERVAL', 0.05),
+            fsync=config.get('WRITE_BEHIND_FSYNC', True)).recover().start()
+        self.review_repo = CachedReviewRepository(self.review_repo, self.write_behind)
+
+    def get_write_behind_stats(self):
+        """
+        Report the counters of the write-behind queue.
 
+        Returns:
+            dict or None: Pending, flushed and rejected record counts, or
+                None when no table is written behind.
+        """
+        if self.write_behind is None:
+            return None
+        return self.write_behind.stats()
+
+    @UnitOfWork()
     def create_user(self, user_data):
         """
         Create and store a new User.
@@ -47,6 +153,9 @@ class HBnBFacade:
 
         Returns:
             User: The newly created User object.
+
+        Raises:
+            ValueError: If the email is already registered (in any case).
         """
         user = User(
             first_name=user_data['first_name'],
@@ -56,6 +165,13 @@ class HBnBFacade:
         )
         user.hash_password(user_data['password'])
         self.user_repo.add(user)
+        try:
+            # The unique lower(email) index rejects duplicates atomically
+            flush()
+        except IntegrityError as error:
+            if violates_unique(error, User.__table__, 'ux_users_email_lower'):
+                raise ValueError("Email already registered")
+            raise
         return user
 
 
@@ -81,7 +197,7 @@ class HBnBFacade:
         Returns:
             User or None: The User matching the email or None.
         """
-        return self.user_repo.get_by_attribute('email', email)
+        return self.user_repo.get_user_by_email(email)
 
     def get_all_users(self):
         """
@@ -92,6 +208,20 @@ class HBnBFacade:
         """
         return self.user_repo.get_all()
 
+    def get_users_page(self, limit, cursor=None):
+        """
+        Retrieve one page of users using keyset pagination.
+
+        Args:
+            limit (int): Maximum number of users to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of User objects, next cursor or None).
+        """
+        return self.user_repo.get_page(limit, cursor)
+
+    @UnitOfWork()
     def update_user(self, user_id, new_data):
         """
         Update an existing User's attributes.
@@ -102,6 +232,9 @@ class HBnBFacade:
 
         Returns:
             User or None: Updated User or None if not found.
+
+        Raises:
+            ValueError: If the new email belongs to another user.
         """
         user = self.user_repo.get(user_id)
         if not user:
@@ -115,9 +248,16 @@ class HBnBFacade:
                 else:
                     setattr(user, key, value)
 
-        db.session.commit()
-        return user
+        self.user_repo.invalidate(user_id)
+        try:
+            flush()
+        except IntegrityError as error:
+            if violates_unique(error, User.__table__, 'ux_users_email_lower'):
+                raise ValueError("Email already in use")
+            raise
+        return flush_and_refresh(user)
 
+    @UnitOfWork()
     def create_amenity(self, amenity_data):
         """
         Create and store a new Amenity.
@@ -130,7 +270,31 @@ class HBnBFacade:
         """
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
-        return amenity
+        return flush_and_refresh(amenity)
+
+    @UnitOfWork()
+    def create_amenities(self, amenities_data):
+        """
+        Create several Amenities and store the valid ones in one transaction.
+
+        Args:
+            amenities_data (list): One attribute dict per Amenity.
+
+        Returns:
+            list: One (Amenity, None) or (None, error message) pair per item.
+
+        Raises:
+            ValueError: If the batch is too large or violates a constraint.
+        """
+        self._check_batch(amenities_data)
+        results = []
+        for amenity_data in amenities_data:
+            try:
+                results.append((Amenity(**amenity_data), None))
+            except (TypeError, ValueError) as e:
+                results.append((None, str(e)))
+        self._add_batch(self.amenity_repo, results)
+        return results
 
     def get_amenity(self, amenity_id):
         """
@@ -153,6 +317,33 @@ class HBnBFacade:
         """
         return self.amenity_repo.get_all()
 
+    def get_amenities_page(self, limit, cursor=None):
+        """
+        Retrieve one page of amenities using keyset pagination.
+
+        Args:
+            limit (int): Maximum number of amenities to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of Amenity objects, next cursor or None).
+        """
+        return self.amenity_repo.get_page(limit, cursor)
+
+    def get_amenity_rows(self, limit=None, cursor=None):
+        """
+        Retrieve amenities as plain dicts (id and name) without ORM objects.
+
+        Args:
+            limit (int, optional): Page size; None returns every amenity.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of dicts, next cursor or None).
+        """
+        return self.amenity_repo.get_all_rows(['id', 'name'], limit, cursor)
+
+    @UnitOfWork()
     def update_amenity(self, amenity_id, amenity_data):
         """
         Update an existing Amenity's attributes.
@@ -170,9 +361,10 @@ class HBnBFacade:
         for key, value in amenity_data.items():
             if hasattr(amenity, key):
                 setattr(amenity, key, value)
-        db.session.commit()
-        return amenity
+        self.amenity_repo.invalidate(amenity_id)
+        return flush_and_refresh(amenity)
 
+    @UnitOfWork()
     def create_place(self, place_data):
         """
         Create a new place.
@@ -204,7 +396,73 @@ class HBnBFacade:
                 place.add_amenity(amenity)
 
         self.place_repo.add(place)
-        return place
+        return flush_and_refresh(place)
+
+    @UnitOfWork()
+    def create_places(self, places_data, owner_id):
+        """
+        Create several places for one owner in a single transaction.
+
+        Amenities are looked up by name once for the whole batch; missing
+        ones are created and shared between the places that list them.
+
+        Args:
+            places_data (list): One place dict per item (owner_id is ignored).
+            owner_id (str): ID of the user owning every place.
+
+        Returns:
+            list: One (Place, None) or (None, error message) pair per item.
+
+        Raises:
+            ValueError: If the owner is not found, the batch is too large
+                or it violates a constraint.
+        """
+        self._check_batch(places_data)
+        owner = self.get_user(owner_id)
+        if not owner:
+            raise ValueError("Owner not found")
+
+        names = [name for data in places_data if isinstance(data, dict)
+                 for name in data.get('amenities') or []
+                 if isinstance(name, str)]
+        amenities = self.amenity_repo.get_amenities_by_names(names)
+
+        results = []
+        for place_data in places_data:
+            try:
+                place_data = dict(place_data)
+                place_data.pop('owner_id', None)
+                place_amenities = []
+                for name in place_data.pop('amenities', None) or []:
+                    if name not in amenities:
+                        amenities[name] = Amenity(name=name)
+                    place_amenities.append(amenities[name])
+                place = Place(owner=owner, **place_data)
+                for amenity in place_amenities:
+                    place.add_amenity(amenity)
+                results.append((place, None))
+            except (TypeError, ValueError) as e:
+                results.append((None, str(e)))
+        self._add_batch(self.place_repo, results)
+        return results
+
+    @staticmethod
+    def _check_batch(items):
+        """Reject batches that are not lists or exceed MAX_BATCH_SIZE."""
+        if not isinstance(items, list):
+            raise ValueError("Batch payload must be a list")
+        if len(items) > MAX_BATCH_SIZE:
+            raise ValueError(
+                f"Batch cannot contain more than {MAX_BATCH_SIZE} items")
+
+    @staticmethod
+    def _add_batch(repo, results):
+        """Store the valid objects of a batch with one commit."""
+        try:
+            repo.add_many([obj for obj, error in results if obj is not None])
+        except IntegrityError:
+            raise ValueError(
+                "Batch violates a database constraint; nothing was saved")
 
     def get_place(self, place_id):
         """
@@ -218,6 +476,30 @@ class HBnBFacade:
         """
         return self.place_repo.get(place_id)
 
+    def place_exists(self, place_id):
+        """
+        Check whether a Place exists, without loading it.
+
+        Args:
+            place_id (str): ID of the place.
+
+        Returns:
+            bool: True if the place exists.
+        """
+        return self.place_repo.exists(place_id)
+
+    def get_place_details(self, place_id):
+        """
+        Retrieve a Place by ID with its owner and amenities loaded.
+
+        Args:
+            place_id (str): ID of the place to retrieve.
+
+        Returns:
+            Place or None: The Place or None if not found.
+        """
+        return self.place_repo.get(place_id, load=self.place_repo.detail_load)
+
     def get_all_places(self):
         """
         Retrieve all stored places.
@@ -227,6 +509,204 @@ class HBnBFacade:
         """
         return self.place_repo.get_all()
 
+    def get_places_page(self, limit, cursor=None):
+        """
+        Retrieve one page of places using keyset pagination.
+
+        Args:
+            limit (int): Maximum number of places to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of Place objects, next cursor or None).
+        """
+        return self.place_repo.get_page(limit, cursor)
+
+    def _with_amenities(self, rows):
+        """Attach their amenity rows to place rows."""
+        amenities = self.place_repo.get_amenity_rows(row['id'] for row in rows)
+        for row in rows:
+            row['amenities'] = amenities[row['id']]
+        return rows
+
+    def get_place_rows(self, limit=None, cursor=None, include_description=False):
+        """
+        Retrieve places as plain dicts, with their amenities, without ORM objects.
+
+        Args:
+            limit (int, optional): Page size; None returns every place.
+            cursor (str, optional): Cursor returned with the previous page.
+            include_description (bool): Also read the description column.
+
+        Returns:
+            tuple: (list of dicts shaped like Place.to_dict, next cursor or None).
+        """
+        columns = None
+        if include_description:
+            columns = [column.name for column in Place.__table__.columns]
+        rows, next_cursor = self.place_repo.get_all_rows(columns, limit, cursor)
+        return self._with_amenities(rows), next_cursor
+
+    def search_place_rows(self, min_price=None, max_price=None, amenities=(),
+                          owner_id=None, sort='created_at', order='asc',
+                          limit=20, cursor=None, include_description=False):
+        """
+        Search places with filters composed in the database, one page at a time.
+
+        With PLACE_COLUMNS enabled, the price and owner filters are first
+        evaluated on the in-process column index. When they leave at most
+        MAX_SEARCH_CANDIDATES places, the database only checks the
+        amenities of those places and sorts them.
+
+        Args:
+            min_price (float, optional): Lowest accepted price.
+            max_price (float, optional): Highest accepted price.
+            amenities (iterable): IDs or names of amenities a place must
+                all have.
+            owner_id (str, optional): ID of the owner.
+            sort (str): 'created_at', 'price' or 'rating'.
+            order (str): 'asc' or 'desc'.
+            limit (int): Page size.
+            cursor (str, optional): Cursor returned with the previous page.
+            include_description (bool): Also read the description column.
+
+        Returns:
+            tuple: (list of dicts shaped like Place.to_dict, next cursor or None).
+
+        Raises:
+            ValueError: If the price range, sort, order or cursor is invalid.
+        """
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("min_price must not exceed max_price")
+        amenities = list(dict.fromkeys(amenities))
+        amenity_ids = self.amenity_repo.resolve_ids(amenities)
+        if len(amenity_ids) < len(amenities):
+            # No place has an amenity that does not exist
+            return [], None
+        place_ids = None
+        if place_columns.enabled and (
+                min_price is not None or max_price is not None or owner_id is not None):
+            candidates = place_columns.query(min_price, max_price, None, owner_id,
+                                             MAX_SEARCH_CANDIDATES + 1)
+            if not candidates:
+                return [], None
+            if len(candidates) <= MAX_SEARCH_CANDIDATES:
+                place_ids = candidates
+                min_price = max_price = owner_id = None
+        columns = None
+        if include_description:
+            columns = [column.name for column in Place.__table__.columns]
+        rows, next_cursor = self.place_repo.search(
+            min_price, max_price, amenity_ids.values(), owner_id,
+            sort, order, limit, cursor, columns, place_ids)
+        return self._with_amenities(rows), next_cursor
+
+    def nearby_place_rows(self, lat, lng, radius_km, limit=None, cursor=None,
+                          include_description=False):
+        """
+        Retrieve the places within a distance of a point, nearest first.
+
+        Args:
+            lat (float): Latitude of the center.
+            lng (float): Longitude of the center.
+            radius_km (float): Search radius in km.
+            limit (int, optional): Page size; None returns every match.
+            cursor (str, optional): Cursor returned with the previous page.
+            include_description (bool): Also read the description column.
+
+        Returns:
+            tuple: (list of place dicts with a 'distance_km', next cursor or None).
+
+        Raises:
+            ValueError: If the center, radius or cursor is invalid.
+        """
+        columns = None
+        if include_description:
+            columns = [column.name for column in Place.__table__.columns]
+        rows, next_cursor = self.place_repo.nearby(lat, lng, radius_km, limit, cursor, columns)
+        return self._with_amenities(rows), next_cursor
+
+    def bbox_place_rows(self, south, west, north, east, limit=None, cursor=None,
+                        include_description=False):
+        """
+        Retrieve the places inside a bounding box (e.g. a map viewport).
+
+        Args:
+            south (float): Southern edge latitude.
+            west (float): Western edge longitude (greater than `east` when
+                the box crosses the antimeridian).
+            north (float): Northern edge latitude.
+            east (float): Eastern edge longitude.
+            limit (int, optional): Page size; None returns every match.
+            cursor (str, optional): Cursor returned with the previous page.
+            include_description (bool): Also read the description column.
+
+        Returns:
+            tuple: (list of place dicts, next cursor or None).
+
+        Raises:
+            ValueError: If the box or cursor is invalid.
+        """
+        columns = None
+        if include_description:
+            columns = [column.name for column in Place.__table__.columns]
+        rows, next_cursor = self.place_repo.within_bbox(
+            south, west, north, east, limit, cursor, columns)
+        return self._with_amenities(rows), next_cursor
+
+    def nearest_place_rows(self, lat, lng, k=20, include_description=False):
+        """
+        Retrieve the k places nearest to a point, whatever their distance.
+
+        Served from the in-process KD-tree (PLACE_KNN); the rows are then
+        read by ID.
+
+        Args:
+            lat (float): Latitude of the point.
+            lng (float): Longitude of the point.
+            k (int): Number of places.
+            include_description (bool): Also read the description column.
+
+        Returns:
+            list: Place dicts with a 'distance_km', nearest first.
+
+        Raises:
+            ValueError: If the point or k is invalid.
+            RuntimeError: If PLACE_KNN is disabled.
+        """
+        nearest = place_knn.nearest(lat, lng, k)
+        columns = None
+        if include_description:
+            columns = [column.name for column in Place.__table__.columns]
+        rows = self.place_repo.get_rows((place_id for place_id, _ in nearest), columns)
+        # Places deleted by another process since the index was loaded are skipped
+        result = [{**rows[place_id], 'distance_km': distance}
+                  for place_id, distance in nearest if place_id in rows]
+        return self._with_amenities(result)
+
+    def filter_place_ids(self, min_price=None, max_price=None, bbox=None,
+                         owner_id=None, limit=None):
+        """
+        Retrieve the IDs of the places matching price, area and owner filters.
+
+        Served from the in-process column index (PLACE_COLUMNS).
+
+        Args:
+            min_price (float, optional): Lowest accepted price.
+            max_price (float, optional): Highest accepted price.
+            bbox (tuple, optional): (south, west, north, east) in degrees.
+            owner_id (str, optional): ID of the owner.
+            limit (int, optional): Maximum number of IDs returned.
+
+        Returns:
+            list: IDs of the matching places.
+
+        Raises:
+            RuntimeError: If PLACE_COLUMNS is disabled.
+        """
+        return place_columns.query(min_price, max_price, bbox, owner_id, limit)
+
+    @UnitOfWork()
     def update_place(self, place_id, place_data):
         """
         Update an existing Place's attributes.
@@ -238,7 +718,8 @@ class HBnBFacade:
         Returns:
             Place or None: Updated Place or None if not found.
         """
-        place = self.place_repo.get(place_id)
+        # Amenities are replaced below and serialized by the caller
+        place = self.place_repo.get(place_id, load={'amenities': 'selectin'})
         if not place:
             return None
 
@@ -263,9 +744,10 @@ class HBnBFacade:
             if hasattr(place, key) and key != 'amenities':
                 setattr(place, key, value)
 
-        db.session.commit()
-        return place
+        self.place_repo.invalidate(place_id)
+        return flush_and_refresh(place)
 
+    @UnitOfWork()
     def create_review(self, review_data):
         """
         Create and store a new Review linked to User and Place.
@@ -277,7 +759,8 @@ class HBnBFacade:
             Review: The newly created Review.
 
         Raises:
-            ValueError: If specified user or place is not found.
+            ValueError: If specified user or place is not found, or the
+                user already reviewed the place.
         """
         user_id = review_data.pop('user_id')
         place_id = review_data.pop('place_id')
@@ -288,7 +771,14 @@ class HBnBFacade:
         if not place:
             raise ValueError("Place not found")
         review = Review(user=user, place=place, **review_data)
-        self.review_repo.add(review)
+        try:
+            self.review_repo.add(review)
+            # The unique (user_id, place_id) constraint rejects duplicates
+            flush()
+        except IntegrityError as error:
+            if violates_unique(error, Review.__table__, 'unique_review'):
+                raise ValueError("You have already reviewed this place.")
+            raise
         return review
 
     def get_review(self, review_id):
@@ -312,6 +802,32 @@ class HBnBFacade:
         """
         return self.review_repo.get_all()
 
+    def get_reviews_page(self, limit, cursor=None):
+        """
+        Retrieve one page of reviews using keyset pagination.
+
+        Args:
+            limit (int): Maximum number of reviews to return.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of Review objects, next cursor or None).
+        """
+        return self.review_repo.get_page(limit, cursor)
+
+    def get_review_rows(self, limit=None, cursor=None):
+        """
+        Retrieve reviews as plain dicts without ORM objects.
+
+        Args:
+            limit (int, optional): Page size; None returns every review.
+            cursor (str, optional): Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of dicts, next cursor or None).
+        """
+        return self.review_repo.get_all_rows(None, limit, cursor)
+
     def get_reviews_by_place(self, place_id):
         """
         Retrieve all reviews for a specific place.
@@ -322,10 +838,25 @@ class HBnBFacade:
         Returns:
             list: Reviews linked to the given place.
         """
-        all_review = self.review_repo.get_all()
-        return [review for review in all_review
-                if review.place.id == place_id]
+        reviews, _ = self.review_repo.get_by_place(place_id)
+        return reviews
 
+    def get_place_reviews_page(self, place_id, limit, cursor=None, order='asc'):
+        """
+        Retrieve one page of the reviews of a place, ordered by date.
+
+        Args:
+            place_id (str): ID of the place.
+            limit (int or None): Maximum number of reviews; None for all.
+            cursor (str, optional): Cursor returned with the previous page.
+            order (str): 'asc' (oldest first) or 'desc' (newest first).
+
+        Returns:
+            tuple: (list of Review objects, next cursor or None).
+        """
+        return self.review_repo.get_by_place(place_id, limit, cursor, order)
+
+    @UnitOfWork()
     def update_review(self, review_id, review_data):
         """
         Update an existing Review's attributes.
@@ -337,15 +868,13 @@ class HBnBFacade:
         Returns:
             Review or None: Updated Review or None if not found.
         """
-        review = self.review_repo.get(review_id)
-        if not review:
+        # One UPDATE, matching nothing when the review does not exist
+        if not self.review_repo.update_where({'id': review_id}, {
+                key: value for key, value in review_data.items() if hasattr(Review, key)}):
             return None
-        for key, value in review_data.items():
-            if hasattr(review, key):
-                setattr(review, key, value)
-        db.session.commit()
-        return review
+        return self.review_repo.get(review_id)
 
+    @UnitOfWork()
     def delete_review(self, review_id):
         """
         Delete a Review by its ID.
@@ -356,15 +885,8 @@ class HBnBFacade:
         Returns:
             bool: True if deleted, False if not found.
         """
-        if not self.review_repo.get(review_id):
-            return False
-        self.review_repo.delete(review_id)
-        return True
+        return self.review_repo.delete_where({'id': review_id}) > 0
 
     def get_review_by_user_and_place(self, user_id, place_id):
         """Get review by user and place to check for duplicates."""
-        reviews = self.get_all_reviews()
-        for review in reviews:
-            if review.user_id == user_id and review.place_id == place_id:
-                return review
-        return None
+        return self.review_repo.get_by_user_and_place(user_id, place_id)
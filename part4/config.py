@@ -9,6 +9,10 @@ Each class sets specific settings like DEBUG mode or secret keys.
 Classes:
     - Config: Base configuration class with default settings.
     - DevelopmentConfig: Configuration for development environment.
+    - TestingConfig: Configuration for running tests.
+    - ProductionConfig: Configuration for production, with a tuned
+      SQLite storage profile (WAL, pragmas, pool sized to workers).
+    - ReplicaConfig: Development setup with a local read replica.
 
 Dictionary:
     - config: A mapping of configuration names to their corresponding classes,
@@ -25,6 +29,46 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'default_jwt_secret_key')
     DEBUG = False
     TESTING = False
+    # When True, relationships not eager-loaded by the query raise on access
+    # instead of lazy-loading (catches N+1 queries)
+    STRICT_LOADING = False
+    # Read-through entity cache: entry lifetime (seconds) and capacity per
+    # table; a capacity of 0 disables the cache for that table
+    ENTITY_CACHE_TTL = 60
+    ENTITY_CACHE_SIZES = {
+        'users': 1024,
+        'places': 4096,
+        'amenities': 256,
+        'reviews': 1024
+    }
+    # Seconds between copies of the primary onto a local SQLite read
+    # replica (SQLALCHEMY_BINDS['replica']); 0 disables the sync thread
+    REPLICA_SYNC_INTERVAL = 0
+    # Database of the asyncio facade; None reuses SQLALCHEMY_DATABASE_URI
+    # with its async driver (aiosqlite for SQLite)
+    ASYNC_DATABASE_URI = None
+    # Keep price, coordinates and owner of every place in NumPy arrays for
+    # vectorized filtering (requires numpy); the arrays follow this
+    # process's commits, and are reloaded every
+    # PLACE_COLUMNS_REFRESH_INTERVAL seconds when it is positive
+    PLACE_COLUMNS = False
+    PLACE_COLUMNS_REFRESH_INTERVAL = 0
+    # Keep a KD-tree of place coordinates for k-nearest-place queries
+    # (requires numpy); it follows this process's commits like the column
+    # index, and is reloaded every PLACE_KNN_REFRESH_INTERVAL seconds
+    # when it is positive
+    PLACE_KNN = False
+    PLACE_KNN_REFRESH_INTERVAL = 0
+    # Tables served from memory whose writes return once journaled in
+    # WRITE_BEHIND_DIR (under the instance folder) and reach the database
+    # in background batches (see app.persistence.write_behind); only
+    # 'reviews' is supported. Without fsync, an OS crash may lose the
+    # last acknowledged writes
+    WRITE_BEHIND_TABLES = ()
+    WRITE_BEHIND_DIR = 'write-behind'
+    WRITE_BEHIND_BATCH_SIZE = 500
+    WRITE_BEHIND_INTERVAL = 0.05
+    WRITE_BEHIND_FSYNC = True
 
 class DevelopmentConfig(Config):
     """Configuration for development environment."""
@@ -32,17 +76,50 @@ class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+class ReplicaConfig(DevelopmentConfig):
+    """Development with reads served from a second SQLite file."""
+    SQLALCHEMY_BINDS = {'replica': 'sqlite:///development-replica.db'}
+    REPLICA_SYNC_INTERVAL = 5
+
 class TestingConfig(Config):
     """Configuration for testing environment."""
     TESTING = True
     DEBUG = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    STRICT_LOADING = True
 
 class ProductionConfig(Config):
     """Configuration for production environment."""
     DEBUG = False
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///production.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Threads serving requests; each holds at most one pooled connection
+    WORKER_THREADS = int(os.getenv('WORKER_THREADS', '8'))
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': WORKER_THREADS,
+        'max_overflow': 0,
+        'pool_timeout': 30,
+        'connect_args': {'check_same_thread': False}
+    }
+
+    # Run on every new connection (see app.persistence.sqlite). WAL lets
+    # readers proceed while a write is in progress; busy_timeout makes a
+    # writer wait for the lock instead of failing with "database is locked"
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+        'temp_store': 'MEMORY',
+        'cache_size': -64000,
+        'mmap_size': 268435456
+    }
 
 config = {
     'development': DevelopmentConfig,
+    'replica': ReplicaConfig,
     'testing': TestingConfig,
     'production': ProductionConfig,
     'default': DevelopmentConfig
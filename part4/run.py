@@ -1,9 +1,15 @@
 from app import create_app
 from app.extensions import db
+from app.persistence.migrations import upgrade
+from app.persistence.replica import REPLICA_BIND, sync_replica
 
 app = create_app("config.DevelopmentConfig")
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        # Applies pending schema migrations; a no-op when already current
+        upgrade()
+        if REPLICA_BIND in db.engines:
+            # Start the replica from the migrated schema and current data
+            sync_replica(db.engines)
     app.run(debug=True)
@@ -1,8 +1,11 @@
 PRAGMA foreign_keys = ON;
 
+-- IDs are UUIDs stored as their 16 bytes (X'...' literals, see
+-- part3/tools/gen_uuid.py --sql); the API shows them in text form.
+
 -- Table users
 CREATE TABLE IF NOT EXISTS users (
-    id CHAR(36) PRIMARY KEY NOT NULL,
+    id BLOB PRIMARY KEY NOT NULL,
     first_name VARCHAR(255) NOT NULL,
     last_name VARCHAR(255) NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
@@ -14,13 +17,13 @@ CREATE TABLE IF NOT EXISTS users (
 
 -- Table places
 CREATE TABLE IF NOT EXISTS places (
-    id CHAR(36) PRIMARY KEY NOT NULL,
+    id BLOB PRIMARY KEY NOT NULL,
     title VARCHAR(255) NOT NULL,
     description TEXT,
     price DECIMAL(10, 2) NOT NULL CHECK(price >= 0),
     latitude FLOAT NOT NULL,
     longitude FLOAT NOT NULL,
-    owner_id CHAR(36) NOT NULL,
+    owner_id BLOB NOT NULL,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE
@@ -28,11 +31,11 @@ CREATE TABLE IF NOT EXISTS places (
 
 -- Table reviews
 CREATE TABLE IF NOT EXISTS reviews (
-    id CHAR(36) PRIMARY KEY NOT NULL,
+    id BLOB PRIMARY KEY NOT NULL,
     text TEXT NOT NULL,
     rating INT CHECK (rating BETWEEN 1 AND 5),
-    user_id CHAR(36) NOT NULL,
-    place_id CHAR(36) NOT NULL,
+    user_id BLOB NOT NULL,
+    place_id BLOB NOT NULL,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id)  REFERENCES users(id)   ON DELETE CASCADE,
@@ -42,7 +45,7 @@ CREATE TABLE IF NOT EXISTS reviews (
 
 -- Table amenities
 CREATE TABLE IF NOT EXISTS amenities (
-    id CHAR(36) PRIMARY KEY NOT NULL,
+    id BLOB PRIMARY KEY NOT NULL,
     name VARCHAR(255) UNIQUE NOT NULL,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
@@ -50,8 +53,8 @@ CREATE TABLE IF NOT EXISTS amenities (
 
 -- Table place_amenity (many-to-many)
 CREATE TABLE IF NOT EXISTS place_amenity (
-    place_id CHAR(36)   NOT NULL,
-    amenity_id CHAR(36) NOT NULL,
+    place_id BLOB   NOT NULL,
+    amenity_id BLOB NOT NULL,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY (place_id, amenity_id),
@@ -59,11 +62,51 @@ CREATE TABLE IF NOT EXISTS place_amenity (
     FOREIGN KEY (amenity_id) REFERENCES amenities(id) ON DELETE CASCADE
 );
 
+-- Keyset pagination indexes (ORDER BY created_at, id)
+CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_places_created_at_id ON places (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_reviews_created_at_id ON reviews (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_amenities_created_at_id ON amenities (created_at, id);
+
+-- Foreign key, filter and sort indexes
+CREATE INDEX IF NOT EXISTS ix_places_owner_id ON places (owner_id);
+CREATE INDEX IF NOT EXISTS ix_places_price_id ON places (price, id);
+CREATE INDEX IF NOT EXISTS ix_places_updated_at ON places (updated_at);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_users_email_lower ON users (lower(email));
+CREATE INDEX IF NOT EXISTS ix_reviews_place_id_created_at ON reviews (place_id, created_at, id);
+
+-- Spatial index of place coordinates, kept in sync by triggers; the R*Tree
+-- is keyed through places_rtree_keys, whose INTEGER PRIMARY KEY VACUUM keeps
+CREATE VIRTUAL TABLE IF NOT EXISTS places_rtree USING rtree(id, min_lat, max_lat, min_lng, max_lng);
+CREATE TABLE IF NOT EXISTS places_rtree_keys (
+    rtree_id INTEGER PRIMARY KEY,
+    place_id BLOB NOT NULL UNIQUE
+);
+CREATE TRIGGER IF NOT EXISTS places_rtree_insert AFTER INSERT ON places BEGIN
+    INSERT INTO places_rtree_keys (place_id) VALUES (new.id);
+    INSERT INTO places_rtree VALUES (
+        (SELECT rtree_id FROM places_rtree_keys WHERE place_id = new.id),
+        new.latitude, new.latitude, new.longitude, new.longitude);
+END;
+CREATE TRIGGER IF NOT EXISTS places_rtree_update AFTER UPDATE OF latitude, longitude ON places BEGIN
+    UPDATE places_rtree SET min_lat = new.latitude, max_lat = new.latitude,
+        min_lng = new.longitude, max_lng = new.longitude
+    WHERE id = (SELECT rtree_id FROM places_rtree_keys WHERE place_id = new.id);
+END;
+CREATE TRIGGER IF NOT EXISTS places_rtree_update_id AFTER UPDATE OF id ON places BEGIN
+    UPDATE places_rtree_keys SET place_id = new.id WHERE place_id = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS places_rtree_delete AFTER DELETE ON places BEGIN
+    DELETE FROM places_rtree
+    WHERE id = (SELECT rtree_id FROM places_rtree_keys WHERE place_id = old.id);
+    DELETE FROM places_rtree_keys WHERE place_id = old.id;
+END;
+
 -- Insert admin user (ignore si déjà présent)
 INSERT OR IGNORE INTO users (
     id, email, first_name, last_name, password, is_admin
 ) VALUES (
-    '36c9050e-ddd3-4c3b-9731-9f487208bbc1',
+    X'36c9050eddd34c3b97319f487208bbc1',
     'admin@hbnb.io',
     'Admin',
     'HBnB',
@@ -73,7 +116,7 @@ INSERT OR IGNORE INTO users (
 
 -- Insert initial amenities (ignore si déjà présents)
 INSERT OR IGNORE INTO amenities (id, name) VALUES
-    ('26de0779-5dfb-4f77-916d-ed6728e88edd', 'WiFi'),
-    ('3493beb7-a2aa-4dd2-95e2-be9b1cca3b06', 'Swimming Pool'),
-    ('3b23dec0-54f2-4a9f-bfb0-49a215961d72', 'Air Conditioning');
+    (X'26de07795dfb4f77916ded6728e88edd', 'WiFi'),
+    (X'3493beb7a2aa4dd295e2be9b1cca3b06', 'Swimming Pool'),
+    (X'3b23dec054f24a9fbfb049a215961d72', 'Air Conditioning');
 
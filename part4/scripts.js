@@ -21,16 +21,11 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
-    // Filtre prix sur index.html
+    // Filtre prix sur index.html : la recherche est faite par l'API
     const priceFilter = document.getElementById('price-filter');
     if (priceFilter) {
-        priceFilter.addEventListener('change', (event) => {
-            const maxPrice = event.target.value;
-            let filtered = loadedPlaces;
-            if (maxPrice !== "All") {
-                filtered = loadedPlaces.filter(place => place.price <= Number(maxPrice));
-            }
-            displayPlaces(filtered);
+        priceFilter.addEventListener('change', () => {
+            fetchPlaces(getCookie('token'));
         });
     }
 });
@@ -76,17 +71,25 @@ function getCookie(name) {
     return null;
 }
 
-let loadedPlaces = [];
+const PAGE_SIZE = 20;
+// Curseur de la page suivante (en-tête X-Next-Cursor), null à la dernière page
+let nextCursor = null;
 
-async function fetchPlaces(token) {
+async function fetchPlaces(token, cursor = null) {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    const priceFilter = document.getElementById('price-filter');
+    if (priceFilter && priceFilter.value !== "All") {
+        params.set('max_price', priceFilter.value);
+    }
+    if (cursor) params.set('cursor', cursor);
     try {
-        const response = await fetch('http://localhost:5000/api/v1/places/', {
+        const response = await fetch(`http://localhost:5000/api/v1/places/search?${params}`, {
             headers: token ? { "Authorization": `Bearer ${token}` } : {}
         });
         if (response.ok) {
             const places = await response.json();
-            loadedPlaces = places;
-            displayPlaces(places);
+            nextCursor = response.headers.get('X-Next-Cursor');
+            displayPlaces(places, Boolean(cursor));
         } else {
             document.getElementById('places-list').innerHTML = "<p>Erreur lors du chargement des lieux.</p>";
         }
@@ -95,10 +98,12 @@ async function fetchPlaces(token) {
     }
 }
 
-function displayPlaces(places) {
+function displayPlaces(places, append = false) {
     const placesList = document.getElementById('places-list');
     if (!placesList) return;
-    placesList.innerHTML = '';
+    if (!append) placesList.innerHTML = '';
+    const oldButton = document.getElementById('load-more');
+    if (oldButton) oldButton.remove();
     places.forEach(place => {
         const card = document.createElement('div');
         card.className = 'place-card';
@@ -109,12 +114,21 @@ function displayPlaces(places) {
         placesList.appendChild(card);
     });
     // (Ré)active les écouteurs sur les nouveaux boutons générés dynamiquement
-    document.querySelectorAll('.details-button').forEach(btn => {
-        btn.addEventListener('click', function() {
+    placesList.querySelectorAll('.details-button').forEach(btn => {
+        btn.onclick = function() {
             const id = this.getAttribute('data-id');
             window.location.href = `place.html?id=${id}`;
-        });
+        };
     });
+    // Page suivante à la demande
+    if (nextCursor) {
+        const loadMore = document.createElement('button');
+        loadMore.id = 'load-more';
+        loadMore.className = 'details-button';
+        loadMore.textContent = 'Load more';
+        loadMore.onclick = () => fetchPlaces(getCookie('token'), nextCursor);
+        placesList.appendChild(loadMore);
+    }
 }
 
 // DETAILS (place.html)
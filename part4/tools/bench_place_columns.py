@@ -0,0 +1,109 @@
+"""
+Filtering benchmark for the NumPy place column index.
+
+Inserts N places into a temporary SQLite database, then times the same
+price range + bounding box filter answered by SQL and by
+PlaceColumns.query().
+
+Usage (from part4/):
+    python -m tools.bench_place_columns [--places 1000000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import insert, select
+from app import create_app
+from app.extensions import db, place_columns
+from app.models.place import Place
+from app.models.user import User
+
+
+class BenchConfig:
+    SECRET_KEY = 'bench'
+    JWT_SECRET_KEY = 'bench'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    PLACE_COLUMNS = True
+
+
+def fill(places):
+    """Insert one owner per 100 places and `places` random places."""
+    now = datetime.utcnow()
+    owners = [str(uuid.uuid4()) for _ in range(max(1, places // 100))]
+    db.session.execute(insert(User), [
+        {'id': owner, 'first_name': 'Bench', 'last_name': 'Owner',
+         'email': f'{owner}@example.com', 'password': 'x', 'is_admin': False,
+         'created_at': now, 'updated_at': now}
+        for owner in owners])
+    rng = random.Random(0)
+    batch = []
+    for i in range(places):
+        batch.append({'id': str(uuid.uuid4()), 'title': f'Place {i}',
+                      'description': '', 'price': rng.uniform(10, 500),
+                      'latitude': rng.uniform(-90, 90),
+                      'longitude': rng.uniform(-180, 180),
+                      'owner_id': owners[i % len(owners)],
+                      'created_at': now, 'updated_at': now})
+        if len(batch) == 10000:
+            db.session.execute(insert(Place), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(Place), batch)
+    db.session.commit()
+
+
+def timed(function, repeat):
+    """Best wall time of `repeat` calls, and the last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(prefix='hbnb-bench-', suffix='.db')
+    os.close(fd)
+    BenchConfig.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+    try:
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            fill(args.places)
+            print(f"inserted {args.places} places in {time.perf_counter() - start:.1f}s")
+
+            start = time.perf_counter()
+            place_columns.refresh()
+            print(f"loaded the columns in {time.perf_counter() - start:.2f}s")
+
+            bbox = (35.0, -10.0, 60.0, 30.0)
+            stmt = select(Place.id).where(
+                Place.price.between(80, 120),
+                Place.latitude.between(bbox[0], bbox[2]),
+                Place.longitude.between(bbox[1], bbox[3]))
+            sql, expected = timed(lambda: db.session.scalars(stmt).all(), args.repeat)
+            columns, found = timed(lambda: place_columns.query(80, 120, bbox),
+                                   args.repeat)
+            assert sorted(found) == sorted(expected)
+            print(f"{len(found)} matches")
+            print(f"sql:     {sql * 1000:8.2f} ms")
+            print(f"columns: {columns * 1000:8.2f} ms ({sql / columns:.0f}x)")
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
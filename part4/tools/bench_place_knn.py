@@ -0,0 +1,103 @@
+"""
+k-nearest-place benchmark for the KD-tree place index.
+
+Inserts N places into a temporary SQLite database, loads PlaceKNN, then
+times k-nearest queries at random points against a vectorized
+brute-force scan of every place, before and after a batch of committed
+writes (served from the delta until the next rebuild).
+
+Usage (from part4/):
+    python -m tools.bench_place_knn [--places 1000000] [--queries 1000] [--k 20]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from app import create_app
+from app.extensions import db, place_knn
+from app.persistence.place_knn import unit_vectors
+from app.services import facade
+from tools.bench_place_columns import fill
+
+
+class BenchConfig:
+    SECRET_KEY = 'bench'
+    JWT_SECRET_KEY = 'bench'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    PLACE_KNN = True
+
+
+def latencies(points, k):
+    """Per-query wall times of place_knn.nearest over `points`, in ms."""
+    times = []
+    for lat, lng in points:
+        start = time.perf_counter()
+        place_knn.nearest(lat, lng, k)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def report(label, times):
+    print(f"{label}: median {np.median(times):.3f} ms, "
+          f"p99 {np.percentile(times, 99):.3f} ms, max {times.max():.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--writes', type=int, default=4000)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(prefix='hbnb-bench-', suffix='.db')
+    os.close(fd)
+    BenchConfig.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+    try:
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            fill(args.places)
+            print(f"inserted {args.places} places in {time.perf_counter() - start:.1f}s")
+
+            start = time.perf_counter()
+            place_knn.refresh()
+            print(f"built the KD-tree in {time.perf_counter() - start:.2f}s")
+
+            rng = random.Random(1)
+            points = [(rng.uniform(-90, 90), rng.uniform(-180, 180))
+                      for _ in range(args.queries)]
+            report(f"kd-tree, k={args.k}", latencies(points, args.k))
+
+            # Brute force: one distance per place for each query
+            tree = place_knn._tree
+            start = time.perf_counter()
+            for lat, lng in points[:20]:
+                offsets = tree.points - unit_vectors([lat], [lng])[0]
+                distances = np.einsum('ij,ij->i', offsets, offsets)
+                expected = np.argpartition(distances, args.k - 1)[:args.k]
+                found = {place_id for place_id, _ in place_knn.nearest(lat, lng, args.k)}
+                assert found == {tree.ids[position] for position in expected}
+            brute = (time.perf_counter() - start) * 1000 / 20
+            print(f"brute force: {brute:.1f} ms per query (checked equal)")
+
+            # Committed moves, kept in the delta until the next rebuild
+            start = time.perf_counter()
+            for place_id in rng.sample(tree.ids, args.writes):
+                facade.place_repo.update_where({'id': place_id}, {
+                    'latitude': rng.uniform(-90, 90), 'longitude': rng.uniform(-180, 180)})
+            print(f"committed {args.writes} moves in {time.perf_counter() - start:.2f}s "
+                  f"(delta {len(place_knn._delta_ids)})")
+            report(f"kd-tree + delta, k={args.k}", latencies(points, args.k))
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Write throughput benchmark for the sharded place repository.
+
+Concurrent writer threads insert places, one transaction each, through
+ShardedRepository over 1 shard and over N shards (temporary SQLite
+files, synchronous=FULL so that every commit pays for its fsync).
+
+Usage (from part4/):
+    python -m tools.bench_sharding [--places 4000] [--threads 8] [--shards 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.rows import detached_instance
+from app.persistence.sharded_repository import ShardedRepository
+from app.persistence.sharding import SHARD_PRAGMAS, ShardSet
+
+
+def run(shard_count, places, threads, directory):
+    """Insert `places` places with `threads` writers; return places/s."""
+    uris = {f's{i}': f"sqlite:///{os.path.join(directory, f'{shard_count}-{i}.db')}"
+            for i in range(shard_count)}
+    shards = ShardSet(uris, dict(SHARD_PRAGMAS, synchronous='FULL'))
+    shards.create_all()
+    repo = ShardedRepository(Place, shards)
+    owner = detached_instance(User, {'id': str(uuid.uuid4())})
+
+    def write(i):
+        repo.add(Place(f'Place {i}', '', 100, 45.0, 5.0, owner))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(write, range(places)))
+    elapsed = time.perf_counter() - start
+    shards.dispose()
+    return places / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=4000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--shards', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        single = run(1, args.places, args.threads, directory)
+        sharded = run(args.shards, args.places, args.threads, directory)
+    print(f"{args.threads} writers, {args.places} places")
+    print(f"  1 shard:  {single:8.0f} places/s")
+    print(f"  {args.shards} shards: {sharded:8.0f} places/s ({sharded / single:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Strict loading check of the read endpoints.
+
+Builds the application with TestingConfig, where STRICT_LOADING makes
+any relationship the query did not eager-load raise instead of lazy
+loading, fills its in-memory database through the API, then requests
+every list and detail endpoint twice as an admin (cold, then with the
+entity cache warm). Exits with status 1 if any request fails with a 5xx
+or raises.
+
+Usage (from part4/):
+    python -m tools.check_strict_loading
+"""
+
+import argparse
+import sys
+from app import create_app
+from app.extensions import db, place_columns, place_knn
+from app.models.user import User
+from app.services import facade
+from config import TestingConfig
+
+
+class CheckConfig(TestingConfig):
+    # Serve the search and nearest endpoints from the in-memory indexes too
+    PLACE_COLUMNS = True
+    PLACE_KNN = True
+
+
+def seed(client, places):
+    """
+    Create an admin, two users, amenities, `places` places and their reviews.
+
+    Returns:
+        tuple: Identifiers used in the endpoint paths, and the admin's
+            Authorization header.
+    """
+    with client.application.app_context():
+        db.session.add(User('Ada', 'Admin', 'admin@example.com', 'password', True))
+        db.session.commit()
+
+    def login(email):
+        response = client.post('/api/v1/auth/login',
+                               json={'email': email, 'password': 'password'})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    def created(response):
+        assert response.status_code == 201, (response.status_code, response.get_json())
+        return response.get_json()['id']
+
+    users = [created(client.post('/api/v1/users/', json={
+        'first_name': 'User', 'last_name': str(i), 'email': f'user{i}@example.com',
+        'password': 'password'})) for i in range(2)]
+    owner, guest = login('user0@example.com'), login('user1@example.com')
+    amenity = created(client.post('/api/v1/amenities/', json={'name': 'Pool'}))
+    place_ids = [created(client.post('/api/v1/places/', json={
+        'title': f'Place {i}', 'description': 'A place', 'price': 50 + i,
+        'latitude': 48.85 + i / 100, 'longitude': 2.35, 'amenities': ['WiFi', 'Pool']},
+        headers=owner)) for i in range(places)]
+    review = None
+    for place in place_ids:
+        review = created(client.post('/api/v1/reviews/', json={
+            'text': 'Nice', 'rating': 4, 'place_id': place}, headers=guest))
+    with client.application.app_context():
+        place_columns.refresh()
+        place_knn.refresh()
+    # Objects rebuilt from the cache lazy-load freely: start the reads cold
+    facade.init_cache(client.application.config)
+    ids = {'user': users[0], 'amenity': amenity, 'place': place_ids[0], 'review': review}
+    return ids, login('admin@example.com')
+
+
+def endpoints(ids):
+    """GET paths covering every list and detail endpoint."""
+    return [
+        '/api/v1/users/',
+        f"/api/v1/users/{ids['user']}",
+        '/api/v1/amenities/',
+        '/api/v1/amenities/?limit=2',
+        f"/api/v1/amenities/{ids['amenity']}",
+        '/api/v1/places/',
+        '/api/v1/places/?limit=2&include=description',
+        f"/api/v1/places/{ids['place']}",
+        '/api/v1/places/search?min_price=50&max_price=60&amenities=Pool',
+        f"/api/v1/places/search?owner_id={ids['user']}&sort=rating",
+        '/api/v1/places/nearby?lat=48.85&lng=2.35&radius_km=10',
+        '/api/v1/places/nearest?lat=48.85&lng=2.35&k=3',
+        '/api/v1/places/bbox?south=48&west=2&north=49&east=3',
+        '/api/v1/reviews/',
+        f"/api/v1/reviews/{ids['review']}",
+        f"/api/v1/reviews/places/{ids['place']}/reviews",
+        f"/api/v1/reviews/places/{ids['place']}/reviews?limit=2&order=desc",
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app(CheckConfig)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    ids, admin = seed(client, args.places)
+
+    failures = []
+    for path in endpoints(ids) * 2:
+        try:
+            status = client.get(path, headers=admin).status_code
+        except Exception as e:
+            failures.append(f"{path}: {type(e).__name__}: {e}")
+            continue
+        if status >= 500:
+            failures.append(f"{path}: {status}")
+        print(f"{status} {path}")
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
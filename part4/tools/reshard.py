@@ -0,0 +1,51 @@
+"""
+Move places, with their reviews and amenity links, to a new shard layout.
+
+Shards are given as NAME=URL pairs; a shard keeping the same name and
+URL in the new layout keeps the places it still owns. The run can be
+interrupted and started again.
+
+Usage (from part4/):
+    python -m tools.reshard --source s0=sqlite:///shard0.db s1=sqlite:///shard1.db \
+                            --target s0=sqlite:///shard0.db s1=sqlite:///shard1.db \
+                                     s2=sqlite:///shard2.db
+"""
+
+import argparse
+import logging
+import time
+from app.persistence.sharding import ShardSet, reshard
+
+
+def shard_uris(pairs):
+    """Parse NAME=URL arguments into a {name: url} dict."""
+    uris = {}
+    for pair in pairs:
+        name, sep, uri = pair.partition('=')
+        if not sep or not name or not uri:
+            raise argparse.ArgumentTypeError(f"Expected NAME=URL, got {pair!r}")
+        uris[name] = uri
+    return uris
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--source', nargs='+', required=True, metavar='NAME=URL')
+    parser.add_argument('--target', nargs='+', required=True, metavar='NAME=URL')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    source = ShardSet(shard_uris(args.source))
+    target = ShardSet(shard_uris(args.target))
+    start = time.perf_counter()
+    try:
+        moved = reshard(source, target, args.batch_size)
+    finally:
+        source.dispose()
+        target.dispose()
+    print(f"moved {moved} places in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()